@@ -4,14 +4,21 @@
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import padding
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+import os
+
+# The size in bytes of the nonce stored at the front of every AES-GCM record
+GCM_NONCE_SIZE = 12
 
 # Function to encrypt using AES in CBC mode
-# @parameter data: The text to decrypt
+# @parameter data: The text or bytes to encrypt
 # @parameter key: the key to decrypt the ciphertext
 # @parameter iv: The initialization vector
 def encrypt_AES_CBC(data, key, iv):
+    if isinstance(data, str):
+        data = data.encode('utf-8')
     padder = padding.PKCS7(128).padder()  
-    padded_data = padder.update(data.encode('utf-8'))  
+    padded_data = padder.update(data)  
     padded_data += padder.finalize()
     cipher = Cipher(algorithms.AES(key), modes.CBC(iv), backend=default_backend())  
     encryptor = cipher.encryptor()  
@@ -22,11 +29,94 @@ def encrypt_AES_CBC(data, key, iv):
 # @parameter ciphertext: The ciphertext to decrypt
 # @parameter key: the key to decrypt the ciphertext
 # @parameter iv: The initialization vector
-def decrypt_AES_CBC(ciphertext, key, iv):
+# @parameter decode: Whether to return text (default) or the raw bytes
+def decrypt_AES_CBC(ciphertext, key, iv, decode = True):
     decryptor = Cipher(algorithms.AES(key), modes.CBC(iv), backend=default_backend()).decryptor()  
     decrypted_data = decryptor.update(ciphertext) + decryptor.finalize() 
 
     unpadder = padding.PKCS7(128).unpadder()  
     unpadded_data = unpadder.update(decrypted_data)  
     unpadded_data += unpadder.finalize()
-    return unpadded_data.decode('utf-8')  
\ No newline at end of file
+    if not decode:
+        return unpadded_data
+    return unpadded_data.decode('utf-8')
+
+# Function to encrypt a single record using AES in GCM mode
+# A fresh nonce is drawn for every record and stored in front of the ciphertext,
+# so each record can be decrypted on its own
+# @parameter data: The text or bytes to encrypt
+# @parameter key: the key to encrypt the data
+def encrypt_AES_GCM(data, key):
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    nonce = os.urandom(GCM_NONCE_SIZE)
+    return nonce + AESGCM(key).encrypt(nonce, data, None)
+
+# Function to decrypt a single record encrypted with encrypt_AES_GCM
+# @parameter record: The nonce followed by the ciphertext
+# @parameter key: the key to decrypt the ciphertext
+def decrypt_AES_GCM(record, key):
+    return AESGCM(key).decrypt(record[:GCM_NONCE_SIZE], record[GCM_NONCE_SIZE:], None)
+
+# Function to decrypt many independent AES-GCM records with one cipher built for the key
+# The results are returned in the same order as the records
+# @parameter records: The records to decrypt
+# @parameter key: the key to decrypt the ciphertext
+def decrypt_AES_GCM_many(records, key):
+    return AESCipher(key).decrypt_many(records)
+
+# A cipher bound to one key (and IV for CBC mode) that builds the algorithm, mode and
+# backend objects once and reuses them for every record it handles
+class AESCipher:
+    # Constructs an AESCipher object.
+    #
+    #  @param key: The key used for every record (16, 24, or 32 bytes)
+    #  @param iv: The initialization vector for CBC mode (16 bytes; not used by GCM)
+    #  @param mode: The cipher mode, either 'gcm' or 'cbc' (String; default is 'gcm')
+    #
+    #  @require: mode is 'gcm', or mode is 'cbc' and an IV is given
+    def __init__(self, key, iv = None, mode = 'gcm'):
+        assert mode in ('gcm', 'cbc'), "The cipher mode must be either gcm or cbc."
+        assert mode == 'gcm' or iv is not None, "CBC mode needs an initialization vector."
+        self._mode = mode
+        if mode == 'gcm':
+            self._aead = AESGCM(key)
+        else:
+            self._cipher = Cipher(algorithms.AES(key), modes.CBC(iv), backend = default_backend())
+
+    # Encrypts a single record
+    # @parameter data: The text or bytes to encrypt
+    def encrypt(self, data):
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        if self._mode == 'gcm':
+            nonce = os.urandom(GCM_NONCE_SIZE)
+            return nonce + self._aead.encrypt(nonce, data, None)
+        # PKCS7 padding to the 16 byte block size
+        padLength = 16 - len(data) % 16
+        encryptor = self._cipher.encryptor()
+        return encryptor.update(data + bytes([padLength]) * padLength) + encryptor.finalize()
+
+    # Decrypts a single record and returns the plaintext bytes
+    # @parameter record: The record to decrypt
+    def decrypt(self, record):
+        if self._mode == 'gcm':
+            return self._aead.decrypt(record[:GCM_NONCE_SIZE], record[GCM_NONCE_SIZE:], None)
+        decryptor = self._cipher.decryptor()
+        padded = decryptor.update(record) + decryptor.finalize()
+        padLength = padded[-1]
+        if padLength < 1 or padLength > 16 or padded[-padLength:] != bytes([padLength]) * padLength:
+            raise ValueError("Invalid padding bytes.")
+        return padded[:-padLength]
+
+    # Encrypts a list of records in one call
+    # @parameter records: The text or bytes records to encrypt
+    def encrypt_many(self, records):
+        return [self.encrypt(data) for data in records]
+
+    # Decrypts a list of records in one call, in order
+    # Records of a transaction log are small enough that the time goes to Python calls that
+    # hold the GIL, so one loop over the cached cipher is faster than a pool of threads
+    # @parameter records: The records to decrypt
+    def decrypt_many(self, records):
+        return [self.decrypt(record) for record in records]
@@ -0,0 +1,233 @@
+"""
+This module defines the AccountTable and AccountRow classes.
+@author: Hunter Peacock, Boden Kahn, and Anna Pitt
+@date: December 14, 2024
+
+A class to represent a columnar snapshot of many accounts for analytics and batch jobs.
+Account numbers, Client numbers, account type codes, balances in cents (int64),
+overdraft counts and the state of each account's Client are held in parallel NumPy
+arrays, so bulk queries run as vectorized scans instead of Python loops over
+Client.getClientAccounts(). Each row can be viewed through an AccountRow, a read-only
+proxy with the accessors of CheckingAccount and SavingsAccount that reads the arrays
+directly instead of copying the row out.
+"""
+
+# Import statements
+import numpy as np
+from bankAccount import BankAccount
+
+class AccountTable:
+    # The codes stored for each account type
+    _TYPE_CODES = {'checking': 0, 'savings': 1}
+    _TYPE_NAMES = ('checking', 'savings')
+
+    # Constructs an empty AccountTable object.
+    #
+    #  @param capacity: The number of rows allocated up front (int; default is 1024)
+    #
+    #  @require: capacity is an int >= 1
+    #
+    #  @ensure AccountTable object successfully created
+    def __init__(self, capacity = 1024):
+        # Assert statements for preconditions
+        assert isinstance(capacity, int) and capacity >= 1, "The capacity must be an integer >= 1."
+
+        self._size = 0
+        self._accountNums = np.zeros(capacity, dtype = np.int64)
+        self._clientNums = np.zeros(capacity, dtype = np.int64)
+        self._typeCodes = np.zeros(capacity, dtype = np.int8)
+        self._balances = np.zeros(capacity, dtype = np.int64)  # Balances in cents
+        self._overdrawnCounts = np.zeros(capacity, dtype = np.int16)
+        self._stateCodes = np.zeros(capacity, dtype = np.int16)
+        self._states = [None]  # The state of each state code; code 0 is an unknown state
+        self._stateCodeOf = {None: 0}
+        self._accounts = []  # The account each row was taken from
+
+    # Builds a table holding every account of a set of Clients
+    #
+    #  @param clients: The Clients whose accounts are added (iterable of Client)
+    #
+    #  @return: The new table (AccountTable)
+    @classmethod
+    def fromClients(cls, clients):
+        table = cls()
+        for client in clients:
+            for account in client.getClientAccounts():
+                table.addAccount(account, client.getState())
+        return table
+
+    # Returns the number of rows in the table
+    #
+    #  @return: The number of accounts held (int)
+    def __len__(self):
+        return self._size
+
+    # Adds a row holding an account's current state
+    #
+    #  @param account: The account to add (BankAccount)
+    #  @param state: The state of the account's Client (String; default is None, unknown)
+    #
+    #  @require: account is a BankAccount
+    #
+    #  @return: The position of the new row (int)
+    def addAccount(self, account, state = None):
+        assert isinstance(account, BankAccount), "The account must be a Bank Account."
+        if self._size == len(self._balances):
+            self._grow()
+        row = self._size
+        if state not in self._stateCodeOf:
+            self._stateCodeOf[state] = len(self._states)
+            self._states.append(state)
+        self._accountNums[row] = account.getAccountNumber()
+        self._clientNums[row] = account._clientNum
+        self._typeCodes[row] = AccountTable._TYPE_CODES[account.getAccountType()]
+        self._stateCodes[row] = self._stateCodeOf[state]
+        self._accounts.append(account)
+        self._size += 1
+        self._readAccount(row)
+        return row
+
+    # Copies the current balance and overdraft count of every account back into the table
+    def refresh(self):
+        for row in range(self._size):
+            self._readAccount(row)
+
+    # Returns a proxy that reads one row of the table
+    #
+    #  @param row: The position of the row (int)
+    #
+    #  @require: row is a position in the table
+    #
+    #  @return: The proxy of the row (AccountRow)
+    def getRow(self, row):
+        assert isinstance(row, int) and 0 <= row < self._size, "The row is not in the table."
+        return AccountRow(self, row)
+
+    # Accessor/getter to retrieve the balances of every row
+    #
+    #  @return: A read-only view of the balances in cents (numpy.ndarray)
+    def getBalances(self):
+        view = self._balances[:self._size]
+        view.flags.writeable = False
+        return view
+
+    # Totals the balances held by the accounts of each state
+    #
+    #  @return: The total balance of each state's accounts, None for accounts without a state (dict)
+    def totalBalanceByState(self):
+        totals = np.zeros(len(self._states), dtype = np.int64)
+        np.add.at(totals, self._stateCodes[:self._size], self._balances[:self._size])
+        counts = np.bincount(self._stateCodes[:self._size], minlength = len(self._states))
+        return {state: int(totals[code]) / 100 for code, state in enumerate(self._states) if counts[code] > 0}
+
+    # Finds the savings accounts whose balance is negative
+    #
+    #  @return: The proxies of the overdrawn savings accounts, in table order (list of AccountRow)
+    def findNegativeSavings(self):
+        mask = (self._typeCodes[:self._size] == AccountTable._TYPE_CODES['savings']) & (self._balances[:self._size] < 0)
+        return [AccountRow(self, row) for row in np.flatnonzero(mask).tolist()]
+
+    # Finds the accounts with the largest balances
+    #
+    #  @param count: The number of accounts to return (int)
+    #
+    #  @require: count is an int >= 0
+    #
+    #  @return: The proxies of the accounts, largest balance first (list of AccountRow)
+    def topBalances(self, count):
+        assert isinstance(count, int) and count >= 0, "The count must be an integer >= 0."
+        balances = self._balances[:self._size]
+        count = min(count, self._size)
+        if count == 0:
+            return []
+        rows = np.argpartition(balances, self._size - count)[self._size - count:]
+        rows = rows[np.argsort(balances[rows], kind = "stable")[::-1]]
+        return [AccountRow(self, row) for row in rows.tolist()]
+
+    # A private helper method that copies an account's balance and overdraft count into its row
+    #
+    #  @param row: The position of the row (int)
+    def _readAccount(self, row):
+        account = self._accounts[row]
+        self._balances[row] = account.getBalanceCents()
+        # Only savings accounts are ever overdrawn
+        self._overdrawnCounts[row] = account.getOverdrawnCount() if account.getAccountType() == 'savings' else 0
+
+    # A private helper method that doubles the capacity of every column
+    def _grow(self):
+        for name in ("_accountNums", "_clientNums", "_typeCodes", "_balances", "_overdrawnCounts", "_stateCodes"):
+            column = getattr(self, name)
+            grown = np.zeros(len(column) * 2, dtype = column.dtype)
+            grown[:len(column)] = column
+            setattr(self, name, grown)
+
+class AccountRow:
+
+    # Constructs an AccountRow object. Rows are handed out by AccountTable.getRow and the
+    # table's queries
+    #
+    #  @param table: The table that holds the row (AccountTable)
+    #  @param row: The position of the row (int)
+    def __init__(self, table, row):
+        self._table = table
+        self._row = row
+
+    # Accessor/getter to retrieve the position of the row in its table
+    #
+    #  @return: The position of the row (int)
+    def getRowNumber(self):
+        return self._row
+
+    # Accessor/getter to retrieve the account number
+    #
+    #  @return: The account number (int)
+    def getAccountNumber(self):
+        return int(self._table._accountNums[self._row])
+
+    # Accessor/getter to retrieve the Client number
+    #
+    #  @return: The Client number (int)
+    def getClientNumber(self):
+        return int(self._table._clientNums[self._row])
+
+    # Accessor/getter to retrieve the account type
+    #
+    #  @return: 'checking' or 'savings' (String)
+    def getAccountType(self):
+        return AccountTable._TYPE_NAMES[self._table._typeCodes[self._row]]
+
+    # Accessor/getter to retrieve the balance
+    #
+    #  @return: The balance of the account (float)
+    def getBalance(self):
+        return int(self._table._balances[self._row]) / 100
+
+    # Accessor/getter to retrieve the number of times the account has been overdrawn
+    #
+    #  @return: The overdraft count, always 0 for checking accounts (int)
+    def getOverdrawnCount(self):
+        return int(self._table._overdrawnCounts[self._row])
+
+    # Accessor/getter to retrieve the interest rate of the account's type
+    #
+    #  @return: The interest rate (float)
+    def getInterestRate(self):
+        return BankAccount._intRates[self.getAccountType()]
+
+    # Accessor/getter to retrieve the state of the account's Client
+    #
+    #  @return: The state abbreviation, or None if it is unknown (String)
+    def getState(self):
+        return self._table._states[self._table._stateCodes[self._row]]
+
+    # Accessor/getter to retrieve the account the row was taken from
+    #
+    #  @return: The account (BankAccount)
+    def getAccount(self):
+        return self._table._accounts[self._row]
+
+    # Returns a String representation of the row
+    #
+    #  @return: The account number, type and balance (String)
+    def __repr__(self):
+        return f"AccountRow({self.getAccountNumber()}, '{self.getAccountType()}', {self.getBalance():.2f})"
@@ -0,0 +1,122 @@
+"""
+This module defines the BackgroundWriter class.
+@author: Hunter Peacock, Boden Kahn, and Anna Pitt
+@date: December 10, 2024
+
+A class to represent an asynchronous persistence service for transaction logs.
+Account operations put their write tasks on a bounded queue and return right away; a
+dedicated writer thread drains the queue in order. When the queue is full, producers
+either block until there is room or fail fast, depending on how the writer was built.
+"""
+
+# Import statements
+import queue
+import threading
+import time
+
+class BackgroundWriter:
+
+    # Constructs a BackgroundWriter object and starts its writer thread.
+    #
+    #  @param maxQueue: The maximum number of tasks waiting to be written (int; default is 1024)
+    #  @param block: Whether producers wait for room when the queue is full (bool; default is True)
+    #  @param timeout: The maximum number of seconds a blocked producer waits (number; default is None, no limit)
+    #
+    #  @require: maxQueue is an int >= 1
+    #  @require: timeout is None or a number >= 0
+    #
+    #  @ensure BackgroundWriter object successfully created and running
+    def __init__(self, maxQueue = 1024, block = True, timeout = None):
+        # Assert statements for preconditions
+        assert isinstance(maxQueue, int) and maxQueue >= 1, "The queue size must be an integer >= 1."
+        assert timeout is None or (isinstance(timeout, (int, float)) and timeout >= 0), "The timeout must be >= 0."
+
+        self._queue = queue.Queue(maxQueue)
+        self._block = block
+        self._timeout = timeout
+        self._closed = False
+        self._error = None  # The first error raised by a task, reported by flush()
+        self._lock = threading.Lock()
+
+        # Counters exposed as metrics
+        self._written = 0
+        self._rejected = 0
+        self._maxDepth = 0
+        self._lastLag = 0.0
+
+        self._thread = threading.Thread(target = self._run, name = "background-writer", daemon = True)
+        self._thread.start()
+
+    # Accessor/getter to retrieve the number of tasks waiting in the queue
+    #
+    #  @return: The current queue depth (int)
+    def getQueueDepth(self):
+        return self._queue.qsize()
+
+    # Accessor/getter to retrieve how long the most recently written task waited in the queue
+    #
+    #  @return: The lag of the last written task in milliseconds (float)
+    def getLag(self):
+        return self._lastLag
+
+    # Returns the writer's metrics
+    #
+    #  @return: The queue depth, its high-water mark, the last lag in milliseconds, and the
+    #           number of written and rejected tasks (dict)
+    def getStats(self):
+        with self._lock:
+            return {"depth": self._queue.qsize(), "maxDepth": self._maxDepth, "lag": self._lastLag,
+                    "written": self._written, "rejected": self._rejected}
+
+    # Queues a write task. Tasks run on the writer thread in the order they were submitted
+    #
+    #  @param function: The function that performs the write
+    #  @param args: The arguments passed to the function
+    #
+    #  @require: the writer has not been closed
+    #
+    #  @raise queue.Full: if the queue is full and the writer fails fast, or the timeout passes
+    def submit(self, function, *args):
+        assert not self._closed, "Cannot submit to a closed background writer."
+        try:
+            self._queue.put((function, args, time.monotonic()), self._block, self._timeout)
+        except queue.Full:
+            with self._lock:
+                self._rejected += 1
+            raise
+        with self._lock:
+            self._maxDepth = max(self._maxDepth, self._queue.qsize())
+
+    # Blocks until every queued task has been written, then reports any write error
+    def flush(self):
+        self._queue.join()
+        error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    # Writes every queued task and stops the writer thread
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+        self.flush()
+
+    # The writer thread: runs queued tasks in order until it is stopped
+    def _run(self):
+        while True:
+            task = self._queue.get()
+            if task is None:
+                self._queue.task_done()
+                return
+            function, args, enqueued = task
+            try:
+                function(*args)
+            except Exception as exc:
+                if self._error is None:
+                    self._error = exc
+            with self._lock:
+                self._written += 1
+                self._lastLag = (time.monotonic() - enqueued) * 1000
+            self._queue.task_done()
@@ -8,21 +8,58 @@ A class to represent the data elements and methods required to implement a Bank
 
 # Import statements
 from abc import abstractmethod
+import queue
+from groupCommit import GroupCommitter
+from backgroundWriter import BackgroundWriter
+from storageLayout import StorageLayout
+from storage import TransactionStore
+from fileStore import FileStore
+from transferJournal import TransferJournal
+from transactionHistory import TransactionHistory
+from AES_CBC import AESCipher
+from cryptography.exceptions import InvalidTag
+from transactionRecord import encodeTransaction, decodeTransaction, unpackRecord, dateToDay, FLAG_POSTED, FLAG_CREDIT
+from transaction import Transaction
+from money import Cents, isAmount, toCents, toDollars
+import os
 
 class BankAccount:
     # A private class variable that holds the interest rates in decimal form 
     _intRates = {'checking': 0.015, 'savings': 0.04}
+    # Private class variables that hold the default flush policy for transaction logs
+    # (records buffered before a write, and milliseconds a record may stay buffered)
+    _flushEvery = 1
+    _flushInterval = 0
+    # Private class variables that hold the default segment policy (bytes an active log file
+    # may reach before it is sealed, None for no rotation, and how sealed segments are compressed)
+    _segmentSize = None
+    _segmentCodec = 'zlib'
+    # A private class variable that holds the shared group committer (None when group commit is off)
+    _groupCommitter = None
+    # A private class variable that holds the shared background writer (None when writes are synchronous)
+    _backgroundWriter = None
+    # A private class variable that holds the number of records written between checkpoints
+    _checkpointEvery = 100
+    # A private class variable that holds the layout new accounts keep their logs in
+    # (None keeps one log file per account in the working directory)
+    _storageLayout = None
+    # A private class variable that holds the backend new accounts keep their records in
+    # (None gives each account a FileStore of its own log files)
+    _transactionStore = None
+    # A private class variable that holds the open journal of transfer intents (None until
+    # the first transfer)
+    _transferJournal = None
 
     # Constructs a BankAccount object.
     #
     #  @param accountNum: The account number of the Bank Account (int; received from Client)
     #  @param clientNum: The Client number of the Bank Account (int; received from Client)
-    #  @param balanceIn: The starting balance of the Bank Account (Floating point; default is $0)
+    #  @param balanceIn: The starting balance of the Bank Account (Floating point or Cents; default is $0)
     #  @param account_type: The account type of the Bank Account (String; default is 'checking')
     #
     #  @require: accountNum is an int type that is >= 1000
     #  @require: clientNum is an int type that is >= 100
-    #  @require: balanceIn is a floating-point type and is positive
+    #  @require: balanceIn is a floating-point type or Cents and is positive
     #  @require: account_type must be either 'checking' or 'savings'    
     #
     #  @ensure BankAccount object successfully created    
@@ -31,7 +68,7 @@ class BankAccount:
         # Assert statements for preconditions
         assert isinstance(accountNum, int), "The account number must be an integer value."
         assert isinstance(clientNum, int), "The client number must be an integer value."
-        assert isinstance(balanceIn, float), "The balance must be a floating-point value."
+        assert isAmount(balanceIn), "The balance must be a floating-point value."
         assert accountNum >= 1000, "The account number must be >= 1000."
         assert clientNum >= 100, "The client number must be >= 100."
         assert balanceIn >= 0.0, "The balance must be a positive value." 
@@ -40,12 +77,24 @@ class BankAccount:
         # Sets the instance variables
         self._accountNum = accountNum
         # Updates the next account value
-        self._accountTransactions = []  # Container to store all transactions on an account
-        self._balance = balanceIn
+        self._accountTransactions = TransactionHistory()  # Container to store all transactions on an account
+        self._cents = toCents(balanceIn) # The balance, held as an integer number of cents
         self._accountType = account_type
         self._accountNum = accountNum
         self._clientNum = clientNum
         self._nextTransaction = 100 # A private class variable that hold the number of the next transaction
+        self._layout = BankAccount._storageLayout # Where the account's logs are kept
+        # The backend the account's records are kept in: the shared backend if one is set,
+        # otherwise a FileStore of the account's log files, created on first use
+        self._store = BankAccount._transactionStore
+        self._ownsStore = self._store is None # Whether the store is the account's own and closed with it
+        self._storeOpened = False # Whether the account has started or reopened its records in the store
+        # Records are encrypted with AES-GCM and a per-record nonce; 'cbc' reads logs that
+        # were written with the account-wide initialization vector
+        self._cipherMode = 'gcm'
+        self._cipher = None # The cipher bound to the account's key, created on first use
+        self._resume = False # Whether the account reopens an existing log instead of starting one
+        self._sinceCheckpoint = 0 # The number of records written since the last checkpoint
 
     @abstractmethod
     # Deposits money into the bank account if the transaction is valid and records the transaction
@@ -101,7 +150,23 @@ class BankAccount:
     #  @return: The balance associated with the Bank Account (floating-point)    
     # Anna 
     def getBalance(self):
-        return self._balance
+        return toDollars(self._cents)
+
+    # Accessor/getter to retrieve the exact balance of an account
+    #
+    #  @return: The balance in cents (Cents)
+    def getBalanceCents(self):
+        return Cents(self._cents)
+
+    # The balance in dollars, read and set through the balance in cents. A float set here
+    # is rounded to the nearest cent
+    @property
+    def _balance(self):
+        return toDollars(self._cents)
+
+    @_balance.setter
+    def _balance(self, balance):
+        self._cents = toCents(balance)
 
     # Accessor/getter to retrieve the transaction number
     #
@@ -147,19 +212,466 @@ class BankAccount:
         # Returns the full amount of transactions as a String
         return(transList)
    
-    @abstractmethod
-    # Write all bank account transactions to a local file
+    # Sets the flush policy used by the account's transaction log
+    #
+    #  @param flushEvery: The number of records to buffer before writing them out (int)
+    #  @param flushInterval: The maximum number of milliseconds a record may stay buffered (int; 0 is no limit)
+    #
+    #  @require: flushEvery is an int >= 1
+    #  @require: flushInterval is a number >= 0
+    #  @require: the account does not keep its records in a shared log
+    def setFlushPolicy(self, flushEvery = 1, flushInterval = 0):
+        assert isinstance(flushEvery, int) and flushEvery >= 1, "The flush count must be an integer >= 1."
+        assert isinstance(flushInterval, (int, float)) and flushInterval >= 0, "The flush interval must be >= 0."
+        assert self._layout is None, "The flush policy of a shared log is set by its storage layout."
+        self._flushEvery = flushEvery
+        self._flushInterval = flushInterval
+        # The account's files are reopened with the new policy on next use
+        self.close()
+
+    # Sets the segment policy used by the account's transaction log. Once the active file
+    # reaches segmentSize bytes it is sealed, its records are compressed and encrypted as
+    # one block, and the block is moved to the archive directory. A shared log is rotated
+    # for its whole shard instead, and each account's records in its sealed segments are
+    # compressed and encrypted with the cipher of that account
+    #
+    #  @param segmentSize: The number of bytes the active file may reach (int; default is None, no rotation)
+    #  @param codec: The compression used for sealed segments, 'zlib' or 'lzma' (String; default is 'zlib')
+    #
+    #  @require: segmentSize is None or an int >= 1
+    #  @require: codec is 'zlib' or 'lzma'
+    def setSegmentPolicy(self, segmentSize = None, codec = 'zlib'):
+        assert segmentSize is None or (isinstance(segmentSize, int) and segmentSize >= 1), "The segment size must be an integer >= 1."
+        assert codec in ('zlib', 'lzma'), "The codec must be 'zlib' or 'lzma'."
+        if self._layout is not None:
+            self._layout.setSegmentPolicy(self._clientNum, segmentSize, codec)
+            return
+        self._segmentSize = segmentSize
+        self._segmentCodec = codec
+        # The account's files are reopened with the new policy on next use
+        self.close()
+
+    # Returns the name of the file that holds the account's transaction log
+    #
+    #  @return: The name of the transaction log file (String)
+    def _getLogFileName(self):
+        if self._layout is not None:
+            return self._layout.getLogFileName(self._clientNum)
+        return f"{self._accountType}-{self._clientNum}-{self._accountNum}.txt"
+
+    # Returns the name of the file that holds the account's checkpoints
     #
-    # Abstract method to be implemented in subclasses     
-    def _writeTransaction(self):
+    #  @return: The name of the checkpoint file (String)
+    def _getCheckpointFileName(self):
+        if self._layout is not None:
+            return self._layout.getCheckpointFileName(self._clientNum)
+        return self._getLogFileName() + ".ckpt"
+
+    # Returns the key the account's records are framed with in a shared log
+    #
+    #  @return: The record key, or None if the account has a log of its own (String)
+    def _getRecordKey(self):
+        if self._layout is None:
+            return None
+        return self._getAccountKey()
+
+    # Returns the key that names the account in shared logs and in the transfer journal
+    #
+    #  @return: The account type, Client number and account number (String)
+    def _getAccountKey(self):
+        return f"{self._accountType}-{self._clientNum}-{self._accountNum}"
+
+    # Creates the FileStore that keeps the account's records in log files, either files of
+    # its own or the shared logs of its shard
+    #
+    #  @return: The account's file store (FileStore)
+    def _openFileStore(self):
+        fileName = self._getLogFileName()
+        if self._layout is None:
+            return FileStore(fileName, self._getCipher(), flushEvery = self._flushEvery,
+                             flushInterval = self._flushInterval, segmentSize = self._segmentSize,
+                             codec = self._segmentCodec)
+        key = self._getRecordKey()
+        return FileStore(fileName, self._getCipher(), self._getCheckpointFileName(),
+                         self._layout.getIndexFileName(self._clientNum), self._layout, key)
+
+    # Determines whether the account has records to read from
+    #
+    #  @return: True if the account has written to or reopened its records, False if not
+    def _hasLog(self):
+        return self._resume or self._storeOpened
+
+    # Returns the key that identifies the account in a storage backend
+    #
+    #  @return: The Client number, account type and account number (tuple)
+    def _getStoreKey(self):
+        return (self._clientNum, self._accountType, self._accountNum)
+
+    # Returns the account's storage backend, creating the account's FileStore when no shared
+    # backend is set. On first use a new account removes anything stored under its key,
+    # since those records were encrypted with another key, and saves its opening state;
+    # an account built with an existing key reopens its records
+    #
+    #  @return: The storage backend of the account (TransactionStore)
+    def _getStore(self):
+        if self._store is None:
+            self._store = self._openFileStore()
+        if not self._storeOpened:
+            if not self._resume:
+                self._store.resetAccount(self._getStoreKey())
+                # The store is only marked opened once its opening state is queued, so an
+                # account whose checkpoint was rejected starts over on its next write
+                _runWrite(self._store.saveState, self._getStoreKey(), self._getState())
+            self._storeOpened = True
+        return self._store
+
+    # Writes any queued or buffered transactions to the account's storage backend
+    def flush(self):
+        if BankAccount._backgroundWriter is not None:
+            BankAccount._backgroundWriter.flush()
+        if self._storeOpened and self._store is not None:
+            self._store.flush()
+
+    # Flushes and closes the account's own log files. A shared storage backend stays open
+    # for the other accounts
+    def close(self):
+        if self._ownsStore and self._store is not None:
+            self.flush()
+            self._store.close()
+            self._store = None
+
+    # Accessor/getter for the overdraft count saved in checkpoints
+    # Accounts without overdrafts always report 0
+    #
+    #  @return: The number of times the account has been overdrawn (int)
+    def _getCheckpointCount(self):
+        return 0
+
+    # Mutator/setter for the overdraft count restored from a checkpoint
+    #
+    #  @param count: The overdraft count saved in the checkpoint (int)
+    def _setCheckpointCount(self, count):
         pass
 
-    @abstractmethod
-    # Read all bank account transactions from a local file
+    # Returns the state saved in a checkpoint
+    #
+    #  @return: The balance, next transaction number and overdraft count (tuple)
+    def _getState(self):
+        return (self._cents, self._nextTransaction, self._getCheckpointCount())
+
+    # Saves a checkpoint of the account's balance, next transaction number and overdraft
+    # count in its storage backend
+    def checkpoint(self):
+        store = self._getStore()
+        # With a background writer the state is saved once earlier records are written
+        _runWrite(store.saveState, self._getStoreKey(), self._getState())
+        self._sinceCheckpoint = 0
+
+    # Rebuilds the account's balance, next transaction number and overdraft count from the
+    # newest valid checkpoint, then replays only the records logged after it
+    #
+    #  @return: The number of records replayed (int)
+    def recover(self):
+        store = self._getStore()
+        self.flush()
+        state = store.loadState(self._getStoreKey())
+        assert state is not None, "The account has no saved state to recover from."
+        balance, self._nextTransaction, count = state
+        self._cents = int(balance)
+        self._setCheckpointCount(count)
+
+        replayed = 0
+        for data in store.iterDataFrom(self._getStoreKey(), self._getCipher(), self._nextTransaction):
+            tNumber, tType, cents, day, flags = unpackRecord(data)
+            self._replayRecord(tType, cents, flags)
+            self._nextTransaction = tNumber + 1
+            replayed += 1
+        self._sinceCheckpoint = replayed
+        return replayed + self._completeTransfers()
+
+    # Applies the balance change of a logged record during recovery
+    # Interest and transfer records are informational unless they are posted: older logs
+    # record the credit or debit they describe as its own deposit or withdrawal record. A
+    # posted interest or transfer record is the only record of its credit or debit
+    #
+    #  @param tType: The type of the record (String)
+    #  @param cents: The amount of the record in cents (int)
+    #  @param flags: The flags of the record (int)
+    def _replayRecord(self, tType, cents, flags):
+        if tType == 'deposit' or (flags & FLAG_POSTED and flags & FLAG_CREDIT):
+            self._applyDeposit(cents)
+        elif tType in ('withdrawal', 'penalty') or flags & FLAG_POSTED:
+            self._cents -= cents
+
+    # Adds a deposit to the balance
+    #
+    #  @param cents: The amount deposited in cents (int)
+    def _applyDeposit(self, cents):
+        self._cents += cents
+
+    # Credits interest to the account with a single posted interest record, which both
+    # describes the payment and moves the money, so no separate deposit is logged
+    #
+    #  @param cents: The interest paid in cents (int)
+    def _postInterest(self, cents):
+        transaction = Transaction("interest", self.getNextTransactionNum(), Cents(cents))
+        self._writeTransaction(transaction, flags = FLAG_POSTED | FLAG_CREDIT)
+        # add interest to list of transactions
+        self._accountTransactions.append(transaction)
+        self._applyDeposit(cents)
+
+    # Moves money to another account as one atomic transfer. A write-ahead intent holding
+    # the encrypted record of both legs is forced to the transfer journal first; once it
+    # is durable the transfer is committed, and each leg is logged and applied as a posted
+    # transfer record. The intent is marked complete after both logs are synced. If a
+    # fail-fast background writer rejects the legs, the intent is marked complete at once
+    # and neither account changes. An overdraft fee the transfer charges is part of the
+    # intent and is logged right after the debit; the caller applies it
+    # Callers check that the account may give up the amount
+    #
+    #  @param amount: The amount being transferred (float or Cents)
+    #  @param otherAccount: The account the money goes to (BankAccount)
+    #  @param penalty: The overdraft fee charged to this account, numbered after the debit
+    #                  (Transaction; default is None, no fee)
+    #
+    #  @require: otherAccount is a BankAccount other than this one
+    def _postTransfer(self, amount, otherAccount, penalty = None):
+        assert isinstance(otherAccount, BankAccount), "The other account must be a Bank Account."
+        assert otherAccount is not self, "An account cannot transfer money to itself."
+
+        debit = Transaction("transfer", self.getNextTransactionNum(), amount)
+        credit = Transaction("transfer", otherAccount.getNextTransactionNum(), amount, debit.getDate())
+        debitRecord = self._encryptRecord(encodeTransaction(debit, FLAG_POSTED))
+        creditRecord = otherAccount._encryptRecord(encodeTransaction(credit, FLAG_POSTED | FLAG_CREDIT))
+        feeRecord = None if penalty is None else self._encryptRecord(encodeTransaction(penalty))
+        journal = _getTransferJournal(True)
+        intentOffset = journal.begin(self._getAccountKey(), debitRecord, otherAccount._getAccountKey(), creditRecord,
+                                     feeRecord)
+
+        # The transfer is committed; a crash from here on is rolled forward by recover()
+        debits = ((debit, debitRecord),) if penalty is None else ((debit, debitRecord), (penalty, feeRecord))
+        legs = ((self, self._prepareWrite(), debits),
+                (otherAccount, otherAccount._prepareWrite(), ((credit, creditRecord),)))
+        try:
+            # With a background writer both legs are queued as one task
+            _runWrite(_appendTransfer, journal, intentOffset, legs)
+        except queue.Full:
+            journal.complete(intentOffset, self._getAccountKey(), otherAccount._getAccountKey())
+            raise
+        for account, store, records in legs:
+            # A fee is added to the list of transactions when the caller applies it
+            account._accountTransactions.append(records[0][0])
+            for transaction, record in records:
+                account._recordWritten()
+        self._cents -= debit.getCents()
+        otherAccount._applyDeposit(credit.getCents())
+
+    # Rolls forward the committed transfers whose leg of this account never reached its log
+    # An intent that cannot be decrypted belongs to an earlier account with the same key
+    #
+    #  @return: The number of transfer legs logged and applied (int)
+    def _completeTransfers(self):
+        journal = _getTransferJournal(False)
+        if journal is None:
+            return 0
+        completed = []
+        applied = 0
+        for intentOffset, record in journal.getPending(self._getAccountKey()):
+            try:
+                data = self._decryptRecord(record)
+            except (InvalidTag, ValueError):
+                continue
+            tNumber, tType, cents, day, flags = unpackRecord(data)
+            # A leg numbered before the next transaction was logged before the crash
+            if tNumber >= self._nextTransaction:
+                self._nextTransaction = tNumber
+                self._writeTransaction(decodeTransaction(data), record)
+                self._replayRecord(tType, cents, flags)
+                applied += 1
+            if intentOffset not in completed:
+                completed.append(intentOffset)
+        if completed:
+            self.flush()
+            # The legs must survive a crash once their intents are marked complete
+            self._getStore().sync()
+            for intentOffset in completed:
+                journal.complete(intentOffset, self._getAccountKey())
+        return applied
+
+    # Returns the cipher bound to the account's key and cipher mode, building it on first use
     #
-    # Abstract method to be implemented in subclasses     
+    #  @return: The account's cipher (AESCipher)
+    def _getCipher(self):
+        if self._cipher is None:
+            self._cipher = AESCipher(self._key, self._iv, self._cipherMode)
+        return self._cipher
+
+    # Encrypts a record with the account's key and cipher mode
+    #
+    #  @param data: The record to encrypt (bytes)
+    #
+    #  @return: The encrypted record (bytes)
+    def _encryptRecord(self, data):
+        return self._getCipher().encrypt(data)
+
+    # Decrypts a record with the account's key and cipher mode
+    #
+    #  @param record: The encrypted record (bytes)
+    #
+    #  @return: The decrypted record (bytes)
+    def _decryptRecord(self, record):
+        return self._getCipher().decrypt(record)
+
+    # Method to append a transaction made on an account to its storage backend
+    # Data is packed into a binary record and encrypted first
+    #
+    #  @param transaction: The transaction to be written to the file
+    #  @param record: The transaction's encrypted record, if it was already built (bytes; default is None)
+    #  @param flags: The flags the record is packed with (int; default is 0)
+    # Hunter, fixed by Boden
+    def _writeTransaction(self, transaction, record = None, flags = 0):
+        store = self._prepareWrite()
+        # In asynchronous mode the record is encrypted and appended on the writer thread
+        _runWrite(self._appendTransaction, store, transaction, record, flags)
+        self._recordWritten()
+
+    # Appends several transactions made on an account as one write task, so a fail-fast
+    # background writer either accepts every record or rejects them all and the account
+    # does not change
+    #
+    #  @param transactions: The transactions to be written, numbered from the next transaction number (tuple)
+    def _writeTransactionGroup(self, transactions):
+        store = self._prepareWrite()
+        _runWrite(_appendTransactions, self, store, transactions)
+        for transaction in transactions:
+            self._recordWritten()
+
+    # Returns the account's storage backend, first checkpointing the state if enough records
+    # were written since the last checkpoint. The checkpoint comes before the next record,
+    # so it already reflects every earlier record
+    #
+    #  @return: The storage backend of the account (TransactionStore)
+    def _prepareWrite(self):
+        store = self._getStore()
+        if BankAccount._checkpointEvery > 0 and self._sinceCheckpoint >= BankAccount._checkpointEvery:
+            self.checkpoint()
+        return store
+
+    # Counts a record once it has been written or queued. The account is only updated after
+    # its record was accepted, so a record a fail-fast background writer rejects changes nothing
+    def _recordWritten(self):
+        self._sinceCheckpoint += 1
+        self._nextTransaction += 1
+
+    # Encrypts a transaction record and appends it to the account's storage backend
+    #
+    #  @param store: The account's storage backend (TransactionStore)
+    #  @param transaction: The transaction to be written to the file
+    #  @param record: The transaction's encrypted record, if it was already built (bytes; default is None)
+    #  @param flags: The flags the record is packed with (int; default is 0)
+    def _appendTransaction(self, store, transaction, record = None, flags = 0):
+        # Convert transaction to a binary record, then encrypt
+        encrypted_data = record if record is not None else self._encryptRecord(encodeTransaction(transaction, flags))
+        fields = (self._getStoreKey(), transaction.getTNumber(), dateToDay(transaction.getDate()), encrypted_data)
+        # In group-commit mode the call returns only once the record's batch is durable
+        if BankAccount._groupCommitter is not None:
+            BankAccount._groupCommitter.commit(store, *fields)
+        else:
+            store.appendRecord(*fields)
+
+    # Method to read all transactions made on an account from its log file
+    # Data is decrypted first
+    #
+    #  @return: The last transaction in the file (String)
+    # Hunter
     def _readTransactions(self):
-        pass
+        data = None
+        for transaction in self.iter_transactions():
+            data = str(transaction)
+            # process the decrypted data: 
+            print("Decrypted transaction:", data)
+        return data
+
+    # Rewrites every record of the account's log in the binary record format
+    # Logs written in the older text format can be read as they are; this only saves space
+    #
+    #  @require: the account does not keep its records in a shared log
+    def migrateLog(self):
+        assert self._layout is None, "Only a log of the account's own can be migrated."
+        assert self._ownsStore, "Records in a storage backend are always in the binary format."
+        if not self._hasLog():
+            return
+        store = self._getStore()
+        self.flush()
+        # Keeps the flags, which mark posted transfer legs
+        store.migrate(lambda data: encodeTransaction(decodeTransaction(data), unpackRecord(data)[4]))
+        # The older checkpoints were removed with the old offsets, so one is taken at the end of the new log
+        self.checkpoint()
+
+    # Streams the transactions stored in the account's log file, oldest first, without
+    # keeping them in memory or adding them to the account's transaction list
+    # Records before start are skipped without being decrypted, and every AES-GCM record
+    # carries its own nonce, so the stream can start at any record
+    # By default the log is memory-mapped and records are handed to the decryptor as
+    # slices of the mapping instead of being copied out of the file; records of archived
+    # segments come from their decompressed blocks
+    #
+    #  @param start: The position of the first record to return (int; default is 0)
+    #  @param stop: The position to stop before (int; default is None, the end of the log)
+    #  @param mapped: Whether to read through a memory map (bool; default is True)
+    #
+    #  @require: start is an int >= 0
+    #  @require: stop is None or an int >= start
+    #
+    #  @return: A generator of the transactions in the log (Transaction)
+    def iter_transactions(self, start = 0, stop = None, mapped = True):
+        assert isinstance(start, int) and start >= 0, "The start offset must be an integer >= 0."
+        assert stop is None or (isinstance(stop, int) and stop >= start), "The stop offset must be an integer >= start."
+
+        # Nothing has been logged by this account yet
+        if not self._hasLog():
+            return
+        store = self._getStore()
+        self.flush()
+        for data in store.iterData(self._getStoreKey(), self._getCipher(), start, stop, mapped):
+            yield decodeTransaction(data)
+
+    # Finds a transaction in the account's log through the sidecar index
+    #
+    #  @param tNumber: The transaction number to find (int)
+    #
+    #  @require: tNumber is an int
+    #
+    #  @return: The transaction with that number, or None if it is not in the log (Transaction)
+    def getTransaction(self, tNumber):
+        assert isinstance(tNumber, int), "The transaction number must be an integer value."
+        if not self._hasLog():
+            return None
+        store = self._getStore()
+        self.flush()
+        data = store.getData(self._getStoreKey(), self._getCipher(), tNumber)
+        return None if data is None else decodeTransaction(data)
+
+    # Finds the position in the account's log of the first transaction made on or after
+    # a date. The position can be passed to iter_transactions as the start offset
+    #
+    #  @param date: The date to seek to (String "YYYY-MM-DD")
+    #
+    #  @return: The position of the first transaction on or after the date (int)
+    def seekDate(self, date):
+        if not self._hasLog():
+            return 0
+        store = self._getStore()
+        self.flush()
+        return store.findDay(self._getStoreKey(), dateToDay(date))
+
+    # Streams the transactions made on or after a date
+    #
+    #  @param date: The first date to include (String "YYYY-MM-DD")
+    #
+    #  @return: A generator of the transactions on or after the date (Transaction)
+    def iterTransactionsSince(self, date):
+        return self.iter_transactions(self.seekDate(date))
 
     @abstractmethod
     # Returns a String representation of a Bank Account object
@@ -180,3 +692,190 @@ class BankAccount:
         assert(isinstance(other, BankAccount)), "Comparison must be between two BankAccount instances."
         return (self._accountNum == other._accountNum and
                 self._accountType == other._accountType)
+
+# Turns on group commit for every account. Transactions are then acknowledged only after
+# a shared committer has fsynced the batch that holds them
+#
+#  @param batchSize: The maximum number of records committed by one fsync round (int; default is 64)
+#  @param maxLatency: The maximum number of milliseconds a record waits for its batch to fill (int; default is 5)
+#
+#  @return: The group committer now in use (GroupCommitter)
+def enableGroupCommit(batchSize = 64, maxLatency = 5):
+    disableGroupCommit()
+    BankAccount._groupCommitter = GroupCommitter(batchSize, maxLatency)
+    return BankAccount._groupCommitter
+
+# Turns off group commit after every queued record has been committed
+def disableGroupCommit():
+    if BankAccount._groupCommitter is not None:
+        BankAccount._groupCommitter.close()
+        BankAccount._groupCommitter = None
+
+# Turns on asynchronous persistence for every account. Account operations then queue
+# their records for a background writer thread instead of writing them on the caller
+#
+#  @param maxQueue: The maximum number of records waiting to be written (int; default is 1024)
+#  @param block: Whether operations wait for room when the queue is full (bool; default is True)
+#  @param timeout: The maximum number of seconds an operation waits for room (number; default is None)
+#
+#  @return: The background writer now in use (BackgroundWriter)
+def enableBackgroundWriter(maxQueue = 1024, block = True, timeout = None):
+    disableBackgroundWriter()
+    BankAccount._backgroundWriter = BackgroundWriter(maxQueue, block, timeout)
+    return BankAccount._backgroundWriter
+
+# Turns off asynchronous persistence after every queued record has been written
+def disableBackgroundWriter():
+    if BankAccount._backgroundWriter is not None:
+        BankAccount._backgroundWriter.close()
+        BankAccount._backgroundWriter = None
+
+# Keeps the logs of every account created afterwards under a data root, with all the
+# accounts of a Client, or of a shard of Clients, sharing one log instead of one file per account
+#
+#  @param dataRoot: The directory that holds every shard (String)
+#  @param shardSize: The number of consecutive Client numbers sharing one log (int; default is 1)
+#  @param flushEvery: The number of records a shared log buffers before writing them out (int; default is 1)
+#  @param flushInterval: The maximum number of milliseconds a record may stay buffered (int; default is 0)
+#  @param segmentSize: The number of bytes the active file of a shared log may reach before it is sealed
+#                      and archived (int; default is None, no rotation)
+#  @param codec: The compression used for sealed segments, 'zlib' or 'lzma' (String; default is 'zlib')
+#
+#  @return: The storage layout now in use (StorageLayout)
+def enableSharedStorage(dataRoot, shardSize = 1, flushEvery = 1, flushInterval = 0, segmentSize = None, codec = 'zlib'):
+    disableSharedStorage()
+    BankAccount._storageLayout = StorageLayout(dataRoot, shardSize, flushEvery, flushInterval, segmentSize, codec)
+    return BankAccount._storageLayout
+
+# Goes back to one log file per account in the working directory for accounts created
+# afterwards, and closes the shared logs. Accounts kept in them should be closed first
+def disableSharedStorage():
+    if BankAccount._storageLayout is not None:
+        BankAccount._storageLayout.close()
+        BankAccount._storageLayout = None
+
+# Keeps the records and saved state of every account created afterwards in a storage
+# backend instead of log files
+#
+#  @param store: The storage backend to use (TransactionStore)
+#
+#  @require: store is an instance of a TransactionStore subclass
+#
+#  @return: The storage backend now in use (TransactionStore)
+def enableTransactionStore(store):
+    assert isinstance(store, TransactionStore), "The store must implement TransactionStore."
+    disableTransactionStore()
+    BankAccount._transactionStore = store
+    return store
+
+# Goes back to log files for accounts created afterwards, and closes the storage backend
+def disableTransactionStore():
+    if BankAccount._transactionStore is not None:
+        if BankAccount._backgroundWriter is not None:
+            BankAccount._backgroundWriter.flush()
+        BankAccount._transactionStore.close()
+        BankAccount._transactionStore = None
+
+# Returns the journal transfers are recorded in, opening it on first use. The journal is
+# kept under the data root of the shared storage layout, or in the working directory
+#
+#  @param create: Whether a journal that does not exist yet should be created (bool)
+#
+#  @return: The transfer journal, or None if it does not exist and was not created (TransferJournal)
+def _getTransferJournal(create):
+    layout = BankAccount._storageLayout
+    fileName = os.path.abspath(os.path.join(layout.getDataRoot() if layout is not None else "", "transfers.log"))
+    journal = BankAccount._transferJournal
+    if journal is None or journal.getFileName() != fileName:
+        if not create and not os.path.exists(fileName):
+            return None
+        if journal is not None:
+            journal.close()
+        os.makedirs(os.path.dirname(fileName), exist_ok = True)
+        journal = BankAccount._transferJournal = TransferJournal(fileName)
+    return journal
+
+# A private helper function that runs a write task, queueing it on the background writer
+# when one is set
+#
+#  @param function: The function that performs the write
+#  @param args: The arguments passed to the function
+#
+#  @raise queue.Full: if a fail-fast background writer has no room for the task
+def _runWrite(function, *args):
+    if BankAccount._backgroundWriter is not None:
+        BankAccount._backgroundWriter.submit(function, *args)
+    else:
+        function(*args)
+
+# A private helper function that appends several transactions of one account in order
+#
+#  @param account: The account the transactions were made on (BankAccount)
+#  @param store: The account's storage backend (TransactionStore)
+#  @param transactions: The transactions to append (tuple)
+def _appendTransactions(account, store, transactions):
+    for transaction in transactions:
+        account._appendTransaction(store, transaction)
+
+# A private helper function that appends both legs of a transfer and then marks it complete
+#
+#  @param journal: The journal that holds the transfer's intent (TransferJournal)
+#  @param intentOffset: The journal offset of the intent (int)
+#  @param legs: The account, storage backend, and transactions and encrypted records of each leg (tuple)
+def _appendTransfer(journal, intentOffset, legs):
+    for account, store, records in legs:
+        for transaction, record in records:
+            account._appendTransaction(store, transaction, record)
+    _completeTransfer(journal, intentOffset, *(leg[0] for leg in legs))
+
+# Marks both legs of a transfer complete once they are forced to their accounts' logs
+#
+#  @param journal: The journal that holds the transfer's intent (TransferJournal)
+#  @param intentOffset: The journal offset of the intent (int)
+#  @param accounts: The two accounts of the transfer (BankAccount)
+def _completeTransfer(journal, intentOffset, *accounts):
+    for account in accounts:
+        if account._storeOpened and account._store is not None:
+            account._store.sync()
+    journal.complete(intentOffset, *(account._getAccountKey() for account in accounts))
+
+# Logs transactions for many accounts at once. Each record is encrypted by its account,
+# then the records are added with one bulk append per storage backend and written out
+# together instead of one write per record. The caller applies the balance changes afterwards
+#
+#  @param entries: The account, transaction and record flags of each record, with the
+#                  transactions numbered from each account's next transaction number (iterable of tuples)
+def writeTransactions(entries):
+    entries = list(entries)
+    # The counters of each account, restored if a fail-fast background writer rejects the batch
+    saved = [(account, account._sinceCheckpoint, account._nextTransaction) for account, transaction, flags in entries]
+    batches = {}  # The store of each batch and its records, by the id of the store
+    try:
+        for account, transaction, flags in entries:
+            # Checkpoints the state before the record, as _writeTransaction does
+            store = account._prepareWrite()
+            record = account._encryptRecord(encodeTransaction(transaction, flags))
+            entry = (account._getStoreKey(), transaction.getTNumber(), dateToDay(transaction.getDate()), record)
+            batches.setdefault(id(store), (store, []))[1].append(entry)
+            account._recordWritten()
+        # In asynchronous mode the batches are written on the writer thread
+        _runWrite(_appendBatches, list(batches.values()))
+    except queue.Full:
+        for account, sinceCheckpoint, nextTransaction in reversed(saved):
+            account._sinceCheckpoint = sinceCheckpoint
+            account._nextTransaction = nextTransaction
+        raise
+
+# A private helper function that adds each batch of records with one call, then writes out
+# every store once, so the batches of the accounts of a shared log are written together.
+# Each store is forced to disk once when group commit is on
+#
+#  @param batches: The store of each batch and its records (list of tuples)
+def _appendBatches(batches):
+    for store, entries in batches:
+        store.appendRecords(entries)
+    for store, entries in batches:
+        if BankAccount._groupCommitter is not None:
+            store.sync()
+        else:
+            store.flush()
@@ -0,0 +1,50 @@
+"""
+This module benchmarks the record encryption helpers in AES_CBC.
+@author: Hunter Peacock and Boden Kahn
+@date: December 9, 2024
+
+Compares the original per-call functions, which build a new cipher for every record,
+against an AESCipher bound to the key and its batch entry points.
+Run with: python benchmark_AES_CBC.py [number of records]
+"""
+
+# Import statements
+import os
+import sys
+import time
+from AES_CBC import (encrypt_AES_CBC, decrypt_AES_CBC, encrypt_AES_GCM, decrypt_AES_GCM, AESCipher)
+
+# Times a function and prints the records handled per second
+#
+#  @param label: The name printed for the measurement (String)
+#  @param function: The function to time, called with no arguments
+#  @param count: The number of records the function handles (int)
+def timeIt(label, function, count):
+    start = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40}{elapsed * 1000:10.1f} ms{count / elapsed:14,.0f} records/s")
+
+def main(count):
+    key = os.urandom(32)
+    iv = os.urandom(16)
+    # A record is about the size of one encoded transaction
+    records = [os.urandom(19) for index in range(count)]
+    cbc = AESCipher(key, iv, 'cbc')
+    gcm = AESCipher(key)
+
+    print(f"Encrypting and decrypting {count:,} records")
+    cbcData = [encrypt_AES_CBC(data, key, iv) for data in records]
+    gcmData = [encrypt_AES_GCM(data, key) for data in records]
+
+    timeIt("encrypt_AES_CBC per call", lambda: [encrypt_AES_CBC(data, key, iv) for data in records], count)
+    timeIt("AESCipher('cbc').encrypt_many", lambda: cbc.encrypt_many(records), count)
+    timeIt("decrypt_AES_CBC per call", lambda: [decrypt_AES_CBC(data, key, iv, decode = False) for data in cbcData], count)
+    timeIt("AESCipher('cbc').decrypt_many", lambda: cbc.decrypt_many(cbcData), count)
+    timeIt("encrypt_AES_GCM per call", lambda: [encrypt_AES_GCM(data, key) for data in records], count)
+    timeIt("AESCipher('gcm').encrypt_many", lambda: gcm.encrypt_many(records), count)
+    timeIt("decrypt_AES_GCM per call", lambda: [decrypt_AES_GCM(data, key) for data in gcmData], count)
+    timeIt("AESCipher('gcm').decrypt_many", lambda: gcm.decrypt_many(gcmData), count)
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
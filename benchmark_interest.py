@@ -0,0 +1,128 @@
+"""
+This module benchmarks the batch interest engine.
+@author: Hunter Peacock and Boden Kahn
+@date: December 14, 2024
+
+Compares a Python loop over every account against the vectorized interest calculation
+for a large number of in-memory accounts, then compares calling calcInterest() on each
+account against one runInterest() call when the interest records are persisted to shared
+logs and to the SQLite store. Every run works inside a temporary directory.
+Run with: python benchmark_interest.py [number of accounts] [number of persisted accounts]
+"""
+
+# Import statements
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+from bankAccount import (BankAccount, enableTransactionStore, disableTransactionStore, enableSharedStorage,
+                         disableSharedStorage)
+from checkingAccount import CheckingAccount
+from savingsAccount import SavingsAccount
+from interestEngine import computeInterest, runInterest
+from sqliteStorage import SQLiteStore
+from money import interestCents
+
+# Times a function and prints the accounts handled per second
+#
+#  @param label: The name printed for the measurement (String)
+#  @param function: The function to time, called with no arguments
+#  @param count: The number of accounts the function handles (int)
+def timeIt(label, function, count):
+    start = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<44}{elapsed * 1000:10.1f} ms{count / elapsed:14,.0f} accounts/s")
+
+# Builds accounts alternating between checking and savings
+#
+#  @param count: The number of accounts (int)
+#
+#  @return: The accounts (list)
+def makeAccounts(count):
+    accounts = []
+    for number in range(count):
+        accountType = CheckingAccount if number % 2 == 0 else SavingsAccount
+        accounts.append(accountType(1000 + number, 100 + number // 4, 100.0 + number % 1000))
+    return accounts
+
+# Calculates every account's interest one account at a time
+#
+#  @param accounts: The accounts (list)
+#
+#  @return: The interest of each account (list)
+def loopInterest(accounts):
+    return [interestCents(account._cents, BankAccount._intRates[account.getAccountType()])
+            for account in accounts if account._cents > 0]
+
+# Calculates every account's interest with one array operation per account type
+#
+#  @param accounts: The accounts (list)
+#
+#  @return: The interest of each account (list of numpy.ndarray)
+def vectorInterest(accounts):
+    results = []
+    for accountType in ("checking", "savings"):
+        group = [account for account in accounts if account.getAccountType() == accountType]
+        balances = np.fromiter((account._cents for account in group), np.int64, len(group))
+        results.append(computeInterest(balances, BankAccount._intRates[accountType]))
+    return results
+
+# Pays interest to every account with calcInterest()
+#
+#  @param accounts: The accounts (list)
+def calcAll(accounts):
+    for account in accounts:
+        account.calcInterest()
+    for account in accounts:
+        account.flush()
+
+# Opens each account's store before the run, so only interest records are timed
+#
+#  @param accounts: The accounts (list)
+def openAll(accounts):
+    for account in accounts:
+        account._getStore()
+    accounts[0].flush()
+
+# Times calcInterest() on each account against one runInterest() call on fresh accounts
+#
+#  @param label: The name of the backend (String)
+#  @param persisted: The number of accounts (int)
+def comparePosting(label, persisted):
+    accounts = makeAccounts(persisted)
+    openAll(accounts)
+    timeIt(f"{label}: calcInterest() per account", lambda: calcAll(accounts), persisted)
+    accounts = makeAccounts(persisted)
+    openAll(accounts)
+    timeIt(f"{label}: runInterest() batch", lambda: runInterest(accounts), persisted)
+    for account in accounts:
+        account.close()
+
+def main(count, persisted):
+    print(f"Calculating interest for {count:,} accounts")
+    accounts = makeAccounts(count)
+    timeIt("Python loop", lambda: loopInterest(accounts), count)
+    timeIt("NumPy arrays (including gathering)", lambda: vectorInterest(accounts), count)
+    balances = np.fromiter((account._cents for account in accounts), np.int64, count)
+    timeIt("NumPy arrays (balances already gathered)", lambda: computeInterest(balances, 0.04), count)
+    del accounts
+
+    print(f"Posting interest for {persisted:,} accounts")
+    oldDir = os.getcwd()
+    with tempfile.TemporaryDirectory() as tempDir:
+        os.chdir(tempDir)
+        try:
+            enableSharedStorage("data", shardSize = 1000)
+            comparePosting("shared logs", persisted)
+            disableSharedStorage()
+            enableTransactionStore(SQLiteStore("bank.db"))
+            comparePosting("SQLite", persisted)
+            disableTransactionStore()
+        finally:
+            os.chdir(oldDir)
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 10_000)
@@ -0,0 +1,87 @@
+"""
+This module benchmarks the storage backends of BankAccount.
+@author: Hunter Peacock and Boden Kahn
+@date: December 11, 2024
+
+Compares the encrypted log files against the SQLite store for writing transactions,
+streaming every account's history back, and looking transactions up by number.
+Every run works inside a temporary directory.
+Run with: python benchmark_storage.py [number of transactions] [number of accounts]
+"""
+
+# Import statements
+import os
+import sys
+import tempfile
+import time
+from bankAccount import enableTransactionStore, disableTransactionStore
+from checkingAccount import CheckingAccount
+from sqliteStorage import SQLiteStore
+
+# Times a function and prints the operations handled per second
+#
+#  @param label: The name printed for the measurement (String)
+#  @param function: The function to time, called with no arguments
+#  @param count: The number of operations the function handles (int)
+def timeIt(label, function, count):
+    start = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40}{elapsed * 1000:10.1f} ms{count / elapsed:14,.0f} ops/s")
+
+# Writes transactions spread over a set of accounts
+#
+#  @param accounts: The accounts to write to (list)
+#  @param count: The total number of transactions (int)
+def writeAll(accounts, count):
+    for number in range(count):
+        accounts[number % len(accounts)].deposit(1.0)
+    for account in accounts:
+        account.flush()
+
+# Streams back the history of every account
+#
+#  @param accounts: The accounts to read (list)
+def readAll(accounts):
+    for account in accounts:
+        for transaction in account.iter_transactions():
+            pass
+
+# Looks up every transaction of every account by number
+#
+#  @param accounts: The accounts to read (list)
+def lookupAll(accounts):
+    for account in accounts:
+        for tNumber in range(100, account.getNextTransactionNum()):
+            account.getTransaction(tNumber)
+
+# Runs the measurements against one backend
+#
+#  @param label: The name of the backend (String)
+#  @param count: The total number of transactions (int)
+#  @param accountCount: The number of accounts (int)
+def runBackend(label, count, accountCount):
+    accounts = [CheckingAccount(1000 + number, 100, 0.0) for number in range(accountCount)]
+    timeIt(f"{label} write", lambda: writeAll(accounts, count), count)
+    timeIt(f"{label} stream history", lambda: readAll(accounts), count)
+    timeIt(f"{label} lookup by number", lambda: lookupAll(accounts), count)
+    for account in accounts:
+        account.close()
+
+def main(count, accountCount):
+    print(f"Storing {count:,} transactions over {accountCount:,} accounts")
+    oldDir = os.getcwd()
+    with tempfile.TemporaryDirectory() as tempDir:
+        os.chdir(tempDir)
+        try:
+            runBackend("log files", count, accountCount)
+            store = enableTransactionStore(SQLiteStore("bank.db"))
+            runBackend("SQLite", count, accountCount)
+            print("SQLite connection pool:", store.getPool().getStats())
+            disableTransactionStore()
+        finally:
+            os.chdir(oldDir)
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 100)
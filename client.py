@@ -14,8 +14,13 @@ from bankAccount import BankAccount
 from password import Password
 from checkingAccount import CheckingAccount
 from savingsAccount import SavingsAccount
+from passwordKdf import getKdf, isKdfAvailable, encodeHashRecord, decodeHashRecord
+from sessionStore import SessionStore
 import os
-import hashlib
+import time
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 
 # Hunter
 class Client:
@@ -26,6 +31,13 @@ class Client:
    PASS_MAX_LEN = 16
    INVALID_Char = {"/", "\\", "<", ">", "|", " "}  #Use a set, not a list   
    clientCounter = 100 # client number set to monotonically increase
+   HASH_ITERATIONS = 100_000 # The iteration count (cost) new password hashes are derived with
+   HASH_ALGO = 'sha256' # The hash algorithm or key derivation function new password hashes are derived with
+   MIN_ITERATIONS = 10_000 # The lowest iteration count calibration may choose
+   _lock = threading.Lock() # Guards clientCounter and the hash executor across threads
+   _hashExecutor = None # The executor password hashes are derived on, created on first use
+   _ownsHashExecutor = False # Whether the executor was created here and is shut down here
+   _sessionStore = None # The store of signed session tokens, created on first use
    
    # Constructs a Client object.
    #
@@ -40,8 +52,12 @@ class Client:
    #  @require phoneNumber is an instance of the PhoneNumber class
    #  @require accountType is in the type list supplied
    #
+   #  @param _hashRecord: The salt, iterations, algorithm and hash already derived for the password, as a
+   #                     tuple or an encoded record (tuple or String; default is None, hash inline)
+   #
    #  @ensure Client object successfully created   
-   def __init__(self, name: Name, address: Address, phoneNumber: PhoneNumber, accountType: str, password: Password):
+   def __init__(self, name: Name, address: Address, phoneNumber: PhoneNumber, accountType: str, password: Password,
+                _hashRecord = None):
       
       # Assert statements
       assert isinstance(name, Name), "The name must be of the Name type."
@@ -50,8 +66,9 @@ class Client:
       assert accountType in ['checking', 'savings'], "The account type must be either checking or savings."
       assert isinstance(password, Password), "The password must be of the Password type."
       
-      self._clientNumber = Client.clientCounter
-      Client.clientCounter += 1 # monotonically increase client number with each new instance of a client
+      with Client._lock:
+         self._clientNumber = Client.clientCounter
+         Client.clientCounter += 1 # monotonically increase client number with each new instance of a client
 
       self._name = name 
       self._address = address
@@ -63,8 +80,15 @@ class Client:
       # Initializes the list of bank accounts as empty
       self._bankAccounts = []
             
-      # Initializes the client's hashed password and salt value
-      self._createSecureHash(password)
+      # Initializes the client's hashed password and salt value. The record is held as one
+      # tuple, so a check never sees the salt of one hash with the value of another
+      self._hashLock = threading.Lock()
+      if _hashRecord is None:
+         self._createSecureHash(password)
+      else:
+         if isinstance(_hashRecord, str):
+            _hashRecord = decodeHashRecord(_hashRecord)
+         self._hashRecord = tuple(_hashRecord)
       
       # Creates an empty (balance = 0) banking account instance of the account type passed in
       if accountType == 'checking':
@@ -86,19 +110,27 @@ class Client:
       assert isinstance(password, Password), "The password must be of the Password type."
       
       # Hashes the password based on the salt value, pepper value, hash algorithm,
-      # and number of iterations to go through
-      self._salt = os.urandom(16)      
-      self._iterations = 100_000
-      self._hash_algo = 'sha256'
-      hash_value = hashlib.pbkdf2_hmac(
-           self._hash_algo,
-           password._password.encode('utf-8') + Client.PEPPER.encode('utf-8'),  
-           self._salt,
-           self._iterations
-       ) 
-      
-      # Stores the hash
-      self._hash = hash_value
+      # and number of iterations to go through, and stores the hash
+      hashRecord = _newHashRecord(password._password, Client.HASH_ITERATIONS, Client.HASH_ALGO)
+      with self._hashLock:
+         self._hashRecord = hashRecord
+
+   # Accessors/getters to retrieve the fields of the stored hash record
+   @property
+   def _salt(self):
+      return self._hashRecord[0]
+
+   @property
+   def _iterations(self):
+      return self._hashRecord[1]
+
+   @property
+   def _hash_algo(self):
+      return self._hashRecord[2]
+
+   @property
+   def _hash(self):
+      return self._hashRecord[3]
    
    # A private method to check an entered password against the stored hash
    #
@@ -106,24 +138,151 @@ class Client:
    # We did not use the Password class here due to it containing assertion errors
    def _checkPasswordMatch(self, password):
       #Assertions to check password type, length, and syntax
-      if not isinstance(password, str):
-         return False
-      if len(password) < Client.PASS_MIN_LEN or len(password) > Client.PASS_MAX_LEN:
+      if not self._checkPasswordReqs(password):
          return False
-      if not _checkSyntax(password):
+      # The record is read once, so the whole check uses the same hash
+      salt, iterations, hashAlgo, storedHash = hashRecord = self._hashRecord
+      # A hash derived by a key derivation function that is turned off never matches
+      if not isKdfAvailable(hashAlgo):
          return False
 
       # Compute the hash from password entered   
-      passswordHash = hashlib.pbkdf2_hmac(
-          self._hash_algo, 
-          password.encode('utf-8') + Client.PEPPER.encode('utf-8'),  
-          self._salt,
-          self._iterations
-      )
+      passswordHash = _derivePasswordHash(password, salt, iterations, hashAlgo)
         
-      # Compare the computed hash and the stored hash and return the result
-      return (passswordHash == self._hash)   
+      # Compare the computed hash and the stored hash
+      if passswordHash != storedHash:
+         return False
+
+      # The password is known to be right, so a hash derived with outdated parameters is replaced
+      if _needsRehash(hashRecord):
+         self._replaceHashRecord(hashRecord, _newHashRecord(password, Client.HASH_ITERATIONS, Client.HASH_ALGO))
+      return True
+
+   # Accessor/getter to retrieve the versioned record of the password hash, which can be
+   # passed back to the constructor
+   #
+   # @return: The encoded salt, iterations, algorithm and hash (String)
+   def getHashRecord(self):
+      return encodeHashRecord(self._hashRecord)
+
+   # A private method to store a rehashed password, but only if the stored record is still the
+   # one the password was checked against. A password changed while the rehash was derived is kept
+   #
+   # @param verified: The record the password was checked against (tuple)
+   # @param hashRecord: The salt, iterations, hash algorithm and hash of the rehash (tuple)
+   #
+   # @return: True if the rehash was stored, False if the record had changed (bool)
+   def _replaceHashRecord(self, verified, hashRecord):
+      with self._hashLock:
+         if self._hashRecord is not verified:
+            return False
+         self._hashRecord = hashRecord
+         return True
+
+   # Constructs a Client with its password hashed on the hash executor, so the event loop
+   # awaiting it keeps serving other Clients while the hash is derived
+   #
+   #  @param name, address, phoneNumber, accountType, password: As for the constructor
+   #
+   #  @require password is of the Password type
+   #
+   #  @return: The new Client (Client)
+   @classmethod
+   async def createAsync(cls, name: Name, address: Address, phoneNumber: PhoneNumber, accountType: str,
+                         password: Password):
+      assert isinstance(password, Password), "The password must be of the Password type."
+      hashRecord = await asyncio.wrap_future(_submitHashRecord(password._password))
+      return cls(name, address, phoneNumber, accountType, password, _hashRecord = hashRecord)
+
+   # Starts constructing a Client with its password hashed on the hash executor
+   #
+   #  @param name, address, phoneNumber, accountType, password: As for the constructor
+   #
+   #  @require password is of the Password type
+   #
+   #  @return: A future that resolves to the new Client, or to the constructor's error (Future)
+   @classmethod
+   def submitCreate(cls, name: Name, address: Address, phoneNumber: PhoneNumber, accountType: str,
+                    password: Password):
+      assert isinstance(password, Password), "The password must be of the Password type."
+      return _chain(_submitHashRecord(password._password),
+                    lambda hashRecord: cls(name, address, phoneNumber, accountType, password, _hashRecord = hashRecord))
+
+   # Checks an entered password against the stored hash without blocking the event loop
+   #
+   #  @param password: The password to check (String)
+   #
+   #  @return: True if the password matches, False if not (bool)
+   async def checkPasswordAsync(self, password):
+      return await asyncio.wrap_future(self.submitPasswordCheck(password))
+
+   # Starts checking an entered password against the stored hash on the hash executor
+   #
+   #  @param password: The password to check (String)
+   #
+   #  @return: A future that resolves to True if the password matches, False if not (Future)
+   def submitPasswordCheck(self, password):
+      hashRecord = self._hashRecord
+      salt, iterations, hashAlgo, storedHash = hashRecord
+      if not self._checkPasswordReqs(password) or not isKdfAvailable(hashAlgo):
+         result = Future()
+         result.set_result(False)
+         return result
+      hashFuture = _getHashExecutor().submit(_derivePasswordHash, password, salt, iterations, hashAlgo)
+      return _chain(hashFuture, lambda passwordHash: self._finishPasswordCheck(password, passwordHash, hashRecord))
+
+   # A private method that compares a hash derived on the hash executor with the record it was
+   # derived from, starting a rehash on the executor when the password matches but its parameters
+   # are outdated. The rehash only replaces that same record
+   #
+   # @param password: The password that was checked (String)
+   # @param passwordHash: The hash derived from it (bytes)
+   # @param hashRecord: The record the hash was derived from (tuple)
+   #
+   # @return: True if the password matches, False if not (bool)
+   def _finishPasswordCheck(self, password, passwordHash, hashRecord):
+      if passwordHash != hashRecord[3]:
+         return False
+      if _needsRehash(hashRecord):
+         _chain(_submitHashRecord(password), lambda newRecord: self._replaceHashRecord(hashRecord, newRecord))
+      return True
    
+   # Checks a password once and starts a session, so later operations can present the
+   # token instead of paying for another password hash. This is the only operation that
+   # checks the password; privileged operations check the session instead
+   #
+   # @param password: The password to check (String)
+   #
+   # @return: The signed session token, or None if the password does not match (String)
+   def authenticate(self, password):
+      if not self._checkPasswordMatch(password):
+         return None
+      return _getSessionStore().issue(self._clientNumber)
+
+   # Checks that a session token was issued to this Client and is still live
+   #
+   # @param token: The token to check (String)
+   #
+   # @return: True if the session is valid, False if not (bool)
+   def checkSession(self, token):
+      return _getSessionStore().validate(token, self._clientNumber)
+
+   # Ends the session named by a token
+   #
+   # @param token: The token of the session (String)
+   #
+   # @return: True if a session of this Client was ended, False if not (bool)
+   def endSession(self, token):
+      return self.checkSession(token) and _getSessionStore().revoke(token)
+
+   # A private method that checks the session a privileged operation is requested with
+   #
+   # @param token: The session token of the Client (String)
+   #
+   # @require token names a live session of this Client
+   def _requireSession(self, token):
+      assert self.checkSession(token), "The session is not valid; the Client must authenticate again."
+
    # A private method to check if an entered password is valid/meets the requirements
    #
    # @param password: The string passed in containing the password to check
@@ -141,22 +300,14 @@ class Client:
       return True
    
    # A method to allow the user to change their password. The user must first
-   # enter their old password, then enter a valid new password twice.
-   def changePassword(self):
-      # Initializes a boolean to keep track of whether the passwords match or not
-      matchingPass = False
-      
-      # Loops while the client's password and entered password are different
-      # The client will be re-prompted to enter their password if it is entered incorrectly
-      while not matchingPass:
-         # Prompts the user to enter their old password
-         userPass = input("Enter your current password: ")
-         
-         # Determines if the passwords match or not
-         matchingPass = self._checkPasswordMatch(userPass)
-         
-         if not matchingPass:
-            print("Incorrect password! Please try again.")
+   # authenticate with their old password, then enter a valid new password twice.
+   #
+   # @param token: The session token authenticate() issued to the Client (String)
+   #
+   # @require token names a live session of this Client
+   def changePassword(self, token):
+      # The current password was checked when the session was started
+      self._requireSession(token)
          
       # Initializes a boolean to keep track of whether the password has been updated or not
       updated = False
@@ -184,6 +335,10 @@ class Client:
                # the new instance variables
                self._createSecureHash(password)
                
+               # Ends every session started with the old password
+               if Client._sessionStore is not None:
+                  Client._sessionStore.revokeClient(self._clientNumber)
+               
                # Ends the user loop
                updated = True
                
@@ -200,13 +355,16 @@ class Client:
 
    # Opens a new client bank account
    #
+   #  @param token: The session token of the Client (String)
    #  @param account: The new account to be added to the Client (BankAccount)
    #
+   #  @require token names a live session of this Client
    #  @require accountType is in the type list supplied
    #   
    #  @return account: the account that was created
    # Anna
-   def openBankAccount(self, accountType, balanceIn = 0.0):
+   def openBankAccount(self, token, accountType, balanceIn = 0.0):
+      self._requireSession(token)
       assert accountType in ['checking', 'savings'], "The account type must be either checking or savings."
       
       # Creates either a new checking or savings account
@@ -222,14 +380,17 @@ class Client:
 
     # Closes a client's already existing bank account
    #
+   #  @param token: The session token of the Client (String)
    #  @param account: The account to be deleted from the Client (BankAccount object)
    #
+   #  @require token names a live session of this Client
    #  @require The account passed in must be a valid BankAccount type (checking or savings)
    #  @require The list of bank accounts must be greater than 1 to close an account   
    #  @require BankAccount object associated with the account number must already be stored in the client account
    # Anna
-   def closeBankAccount(self, account: BankAccount):
+   def closeBankAccount(self, token, account: BankAccount):
       # Assert statements
+      self._requireSession(token)
       assert isinstance(account, BankAccount), "Must pass in a valid bank account to delete."
       assert account in self._bankAccounts, "The bank account must exist in the client's account list."
       assert len(self._bankAccounts) > 1, "Cannot delete a client's only account."
@@ -364,6 +525,197 @@ class Client:
       # Compare immutable variables
       return (self._clientNumber == other._clientNumber)
 
+# Derives the hash of a password and the pepper. Kept at module level so that a process pool
+# can run it
+#
+#  @param password: The password to hash (String)
+#  @param salt: The salt value (bytes)
+#  @param iterations: The number of iterations to go through, or the cost of the function (int)
+#  @param hashAlgo: The name of the hash algorithm or key derivation function (String)
+#
+#  @return: The hash (bytes)
+def _derivePasswordHash(password, salt, iterations, hashAlgo):
+   return getKdf(hashAlgo).derive(password.encode('utf-8') + Client.PEPPER.encode('utf-8'), salt, iterations)
+
+# Checks if a hash record was derived with outdated parameters
+#
+#  @param hashRecord: The salt, iterations, hash algorithm and hash (tuple)
+#
+#  @return: True if the iteration count or hash algorithm differs from the current ones, False if not (bool)
+def _needsRehash(hashRecord):
+   return (hashRecord[1], hashRecord[2]) != (Client.HASH_ITERATIONS, Client.HASH_ALGO)
+
+# Hashes a password with a new salt value. The parameters are passed in rather than read from
+# the class, since a worker process may not see parameters set after it started
+#
+#  @param password: The password to hash (String)
+#  @param iterations: The number of iterations to go through (int)
+#  @param hashAlgo: The name of the hash algorithm (String)
+#
+#  @return: The salt, iterations, hash algorithm and hash (tuple)
+def _newHashRecord(password, iterations, hashAlgo):
+   salt = os.urandom(16)
+   return (salt, iterations, hashAlgo, _derivePasswordHash(password, salt, iterations, hashAlgo))
+
+# Hashes a Password with a new salt value, giving a record that can be passed to the Client
+# constructor. Kept at module level so that a process pool can run it; pass the parameters in
+# when it runs in a worker process, which may not see parameters set after it started
+#
+#  @param password: The password to hash (Password)
+#  @param iterations: The number of iterations to go through (int; default is None, Client.HASH_ITERATIONS)
+#  @param hashAlgo: The name of the hash algorithm (String; default is None, Client.HASH_ALGO)
+#
+#  @require: password is of the Password type
+#
+#  @return: The salt, iterations, hash algorithm and hash (tuple)
+def hashPassword(password, iterations = None, hashAlgo = None):
+   assert isinstance(password, Password), "The password must be of the Password type."
+   return _newHashRecord(password._password, Client.HASH_ITERATIONS if iterations is None else iterations,
+                         Client.HASH_ALGO if hashAlgo is None else hashAlgo)
+
+# Hashes a password with a new salt value and the current parameters on the hash executor
+#
+#  @param password: The password to hash (String)
+#
+#  @return: A future that resolves to the salt, iterations, hash algorithm and hash (Future)
+def _submitHashRecord(password):
+   return _getHashExecutor().submit(_newHashRecord, password, Client.HASH_ITERATIONS, Client.HASH_ALGO)
+
+# Measures this host and picks the iteration count whose password hash takes a target time
+#
+#  @param targetMs: The time one hash should take in milliseconds (int or float; default is 100)
+#  @param hashAlgo: The name of the hash algorithm or key derivation function to measure (String; default is 'sha256')
+#  @param sampleIterations: The iteration count of each timed sample (int; default is None, a fifth of the
+#                           function's default cost)
+#
+#  @require: targetMs > 0 and sampleIterations is None or an int >= 1
+#
+#  @return: The iteration count, rounded to one the function accepts and at least Client.MIN_ITERATIONS (int)
+def calibrateHashCost(targetMs = 100, hashAlgo = 'sha256', sampleIterations = None):
+   assert isinstance(targetMs, (int, float)) and targetMs > 0, "The target time must be a positive number."
+   assert sampleIterations is None or (isinstance(sampleIterations, int) and sampleIterations >= 1), \
+      "The sample iterations must be an integer >= 1."
+   kdf = getKdf(hashAlgo)
+   if sampleIterations is None:
+      sampleIterations = kdf.roundCost(kdf.getDefaultCost() / 5)
+   salt = os.urandom(16)
+   # The fastest of a few samples is the least disturbed by other work on the host
+   best = None
+   for sample in range(3):
+      start = time.perf_counter()
+      _derivePasswordHash("Calibrate1!", salt, sampleIterations, hashAlgo)
+      elapsed = time.perf_counter() - start
+      best = elapsed if best is None else min(best, elapsed)
+   iterations = kdf.roundCost(sampleIterations * (targetMs / 1000) / max(best, 1e-9))
+   return max(kdf.roundCost(Client.MIN_ITERATIONS), iterations)
+
+# Sets the parameters new password hashes are derived with. Clients whose hash was derived
+# with other parameters are rehashed the next time they log in successfully
+#
+#  @param iterations: The iteration count, or the cost of the function (int)
+#  @param hashAlgo: The name of the hash algorithm or key derivation function (String; default is 'sha256')
+#
+#  @require: iterations is an int >= 1 and hashAlgo names an available key derivation function
+def setHashParameters(iterations, hashAlgo = 'sha256'):
+   assert isinstance(iterations, int) and iterations >= 1, "The iteration count must be an integer >= 1."
+   assert isKdfAvailable(hashAlgo), "The hash algorithm must name an available key derivation function."
+   Client.HASH_ITERATIONS = iterations
+   Client.HASH_ALGO = hashAlgo
+
+# Selects the key derivation function new password hashes are derived with: the name of a
+# hashlib algorithm for PBKDF2, 'scrypt', or 'insecure-fast' once a test configuration enables it
+#
+#  @param hashAlgo: The name of the key derivation function (String)
+#  @param cost: The cost of each hash (int; default is None, the function's default cost)
+#
+#  @require: hashAlgo names an available key derivation function
+def useKdf(hashAlgo, cost = None):
+   assert isKdfAvailable(hashAlgo), "The hash algorithm must name an available key derivation function."
+   setHashParameters(getKdf(hashAlgo).getDefaultCost() if cost is None else cost, hashAlgo)
+
+# Returns the executor password hashes are derived on, starting a dedicated thread pool if
+# none was enabled. hashlib releases the GIL while it derives a hash, so the threads run in parallel
+#
+#  @return: The hash executor (concurrent.futures.Executor)
+def _getHashExecutor():
+   with Client._lock:
+      if Client._hashExecutor is None:
+         Client._hashExecutor = ThreadPoolExecutor(max_workers = min(4, os.cpu_count() or 1),
+                                                   thread_name_prefix = "password-hash")
+         Client._ownsHashExecutor = True
+      return Client._hashExecutor
+
+# Derives the password hashes of Clients on a given executor, e.g. a ProcessPoolExecutor
+#
+#  @param executor: The executor to use (concurrent.futures.Executor; default is None, a dedicated thread pool)
+#  @param workers: The number of threads of the dedicated thread pool (int; default is 4)
+#
+#  @require: workers is an int >= 1
+#
+#  @return: The hash executor now in use (concurrent.futures.Executor)
+def enableHashExecutor(executor = None, workers = 4):
+   assert isinstance(workers, int) and workers >= 1, "The number of workers must be an integer >= 1."
+   disableHashExecutor()
+   with Client._lock:
+      Client._ownsHashExecutor = executor is None
+      if executor is None:
+         executor = ThreadPoolExecutor(max_workers = workers, thread_name_prefix = "password-hash")
+      Client._hashExecutor = executor
+      return executor
+
+# Stops using the hash executor once its queued hashes are derived. An executor passed to
+# enableHashExecutor is left running for its owner to shut down
+def disableHashExecutor():
+   with Client._lock:
+      executor, owned = Client._hashExecutor, Client._ownsHashExecutor
+      Client._hashExecutor = None
+      Client._ownsHashExecutor = False
+   if executor is not None and owned:
+      executor.shutdown(wait = True)
+
+# Returns the store of session tokens, starting one with a random server key if none was enabled
+#
+#  @return: The session store (SessionStore)
+def _getSessionStore():
+   with Client._lock:
+      if Client._sessionStore is None:
+         Client._sessionStore = SessionStore()
+      return Client._sessionStore
+
+# Issues the session tokens of Clients from a new store
+#
+#  @param serverKey: The key tokens are signed with (bytes; default is None, a random key)
+#  @param ttl: The number of seconds a session lasts (int or float; default is 900)
+#  @param maxSessions: The largest number of sessions held at once (int; default is 10,000)
+#
+#  @return: The session store now in use (SessionStore)
+def enableSessions(serverKey = None, ttl = 900, maxSessions = 10_000):
+   store = SessionStore(serverKey, ttl, maxSessions)
+   with Client._lock:
+      Client._sessionStore = store
+   return store
+
+# Drops the session store, which ends every session
+def disableSessions():
+   with Client._lock:
+      Client._sessionStore = None
+
+# A private helper function that resolves a new future with a function of another's result
+#
+#  @param future: The future to wait for (Future)
+#  @param function: The function applied to its result
+#
+#  @return: A future resolving to the function's result, or to either one's error (Future)
+def _chain(future, function):
+   result = Future()
+   def done(finished):
+      try:
+         result.set_result(function(finished.result()))
+      except BaseException as error:
+         result.set_exception(error)
+   future.add_done_callback(done)
+   return result
+
 # A private helper function to check the password for prohibited characters
 #
 #  @param password: The password to check for invalid characters (String)
@@ -0,0 +1,233 @@
+"""
+This module defines the ConnectionPool class.
+@author: Hunter Peacock, Boden Kahn, and Anna Pitt
+@date: December 12, 2024
+
+A class to represent a bounded pool of database connections shared by worker threads.
+A thread is handed back the connection it used last whenever that connection is idle,
+so its statement cache stays warm. A connection that sat idle is health-checked before
+it is handed out, and connections idle for longer than the idle timeout are closed.
+Wait time and utilization counters are kept for tuning the pool size.
+"""
+
+# Import statements
+import contextlib
+import threading
+import time
+
+class ConnectionPool:
+
+    # Constructs a ConnectionPool object. Connections are opened on demand
+    #
+    #  @param connect: The function that opens a new connection
+    #  @param maxSize: The maximum number of open connections (int; default is 8)
+    #  @param idleTimeout: The number of seconds an idle connection is kept open (number; default is 60)
+    #  @param checkAfter: The number of idle seconds after which a connection is health-checked (number; default is 1)
+    #  @param healthCheck: The function that tells whether a connection still works (default is None, run "SELECT 1")
+    #  @param acquireTimeout: The maximum number of seconds to wait for a connection (number; default is None, no limit)
+    #
+    #  @require: maxSize is an int >= 1
+    #  @require: idleTimeout and checkAfter are numbers >= 0
+    #  @require: acquireTimeout is None or a number >= 0
+    #
+    #  @ensure ConnectionPool object successfully created
+    def __init__(self, connect, maxSize = 8, idleTimeout = 60, checkAfter = 1, healthCheck = None, acquireTimeout = None):
+        # Assert statements for preconditions
+        assert isinstance(maxSize, int) and maxSize >= 1, "The pool size must be an integer >= 1."
+        assert isinstance(idleTimeout, (int, float)) and idleTimeout >= 0, "The idle timeout must be >= 0."
+        assert isinstance(checkAfter, (int, float)) and checkAfter >= 0, "The health check interval must be >= 0."
+        assert acquireTimeout is None or (isinstance(acquireTimeout, (int, float)) and acquireTimeout >= 0), "The acquire timeout must be >= 0."
+
+        self._connect = connect
+        self._maxSize = maxSize
+        self._idleTimeout = idleTimeout
+        self._checkAfter = checkAfter
+        self._healthCheck = healthCheck if healthCheck is not None else _selectOne
+        self._acquireTimeout = acquireTimeout
+        self._idle = []  # (connection, time it was released) pairs, most recently released last
+        self._size = 0  # The number of open connections, idle or in use
+        self._closed = False
+        self._condition = threading.Condition()
+        self._local = threading.local()  # The connection each thread used last
+
+        # Counters exposed for tuning
+        self._acquired = 0
+        self._waited = 0
+        self._waitTime = 0.0
+        self._maxWait = 0.0
+        self._created = 0
+        self._evicted = 0
+        self._failedChecks = 0
+        self._affinityHits = 0
+
+    # Accessor/getter to retrieve the maximum number of open connections
+    #
+    #  @return: The pool size (int)
+    def getMaxSize(self):
+        return self._maxSize
+
+    # Returns the pool's counters
+    #
+    #  @return: The open, idle and in-use connection counts, the utilization (in use / pool size),
+    #           the number of checkouts, how many of them waited, their total and longest wait in
+    #           milliseconds, and the connections created, evicted and failing a health check (dict)
+    def getStats(self):
+        with self._condition:
+            inUse = self._size - len(self._idle)
+            return {"size": self._size, "idle": len(self._idle), "inUse": inUse,
+                    "utilization": inUse / self._maxSize, "acquired": self._acquired,
+                    "waited": self._waited, "waitTime": self._waitTime * 1000, "maxWait": self._maxWait * 1000,
+                    "created": self._created, "evicted": self._evicted, "failedChecks": self._failedChecks,
+                    "affinityHits": self._affinityHits}
+
+    # Checks a connection out of the pool, waiting if every connection is in use
+    #
+    #  @require: the pool has not been closed
+    #
+    #  @raise TimeoutError: if no connection frees up within the acquire timeout
+    #
+    #  @return: A working connection reserved for the caller
+    def acquire(self):
+        start = time.monotonic()
+        blocked = False
+        with self._condition:
+            while True:
+                assert not self._closed, "Cannot acquire from a closed connection pool."
+                self._evictIdle()
+                entry = self._takeIdle()
+                if entry is not None:
+                    connection, since = entry
+                    if time.monotonic() - since < self._checkAfter or self._check(connection):
+                        break
+                    continue
+                if self._size < self._maxSize:
+                    # Reserves the slot, then opens the connection outside the lock
+                    self._size += 1
+                    connection = None
+                    break
+                remaining = None
+                if self._acquireTimeout is not None:
+                    remaining = self._acquireTimeout - (time.monotonic() - start)
+                    if remaining <= 0:
+                        raise TimeoutError("No database connection became free in time.")
+                blocked = True
+                self._condition.wait(remaining)
+
+        if connection is None:
+            try:
+                connection = self._connect()
+            except Exception:
+                with self._condition:
+                    self._size -= 1
+                    self._condition.notify()
+                raise
+            with self._condition:
+                self._created += 1
+
+        waited = time.monotonic() - start
+        with self._condition:
+            self._acquired += 1
+            if blocked:
+                self._waited += 1
+            self._waitTime += waited
+            self._maxWait = max(self._maxWait, waited)
+        self._local.connection = connection
+        return connection
+
+    # Returns a connection to the pool
+    #
+    #  @param connection: A connection checked out with acquire()
+    def release(self, connection):
+        with self._condition:
+            if self._closed:
+                self._size -= 1
+                connection.close()
+                return
+            self._idle.append((connection, time.monotonic()))
+            self._condition.notify()
+
+    # Drops a connection that is broken instead of returning it to the pool
+    #
+    #  @param connection: A connection checked out with acquire()
+    def discard(self, connection):
+        with self._condition:
+            self._size -= 1
+            self._condition.notify()
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    # Checks a connection out for the length of a with block
+    #
+    #  @return: A context manager that yields a connection and returns it to the pool
+    @contextlib.contextmanager
+    def connection(self):
+        connection = self.acquire()
+        try:
+            yield connection
+        finally:
+            self.release(connection)
+
+    # Closes every idle connection; connections still in use are closed when released
+    def close(self):
+        with self._condition:
+            self._closed = True
+            for connection, since in self._idle:
+                connection.close()
+            self._size -= len(self._idle)
+            self._idle = []
+            self._condition.notify_all()
+
+    # A private helper method that takes an idle connection, preferring the one the
+    # calling thread used last. Called with the lock held
+    #
+    #  @return: The (connection, release time) pair, or None if no connection is idle
+    def _takeIdle(self):
+        if not self._idle:
+            return None
+        preferred = getattr(self._local, "connection", None)
+        for position in range(len(self._idle) - 1, -1, -1):
+            if self._idle[position][0] is preferred:
+                self._affinityHits += 1
+                return self._idle.pop(position)
+        return self._idle.pop()
+
+    # A private helper method that health-checks a connection taken from the idle list,
+    # dropping it if it fails. Called with the lock held
+    #
+    #  @param connection: The connection to check
+    #
+    #  @return: True if the connection works, False if it was dropped
+    def _check(self, connection):
+        try:
+            if self._healthCheck(connection):
+                return True
+        except Exception:
+            pass
+        self._failedChecks += 1
+        self._size -= 1
+        try:
+            connection.close()
+        except Exception:
+            pass
+        return False
+
+    # A private helper method that closes connections idle for longer than the idle
+    # timeout. Called with the lock held
+    def _evictIdle(self):
+        cutoff = time.monotonic() - self._idleTimeout
+        while self._idle and self._idle[0][1] < cutoff:
+            connection, since = self._idle.pop(0)
+            connection.close()
+            self._size -= 1
+            self._evicted += 1
+
+# A private helper function that checks a database connection with a trivial query
+#
+#  @param connection: The connection to check
+#
+#  @return: True if the query ran
+def _selectOne(connection):
+    connection.execute("SELECT 1").fetchone()
+    return True
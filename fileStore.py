@@ -0,0 +1,497 @@
+"""
+This module defines the FileStore class.
+@author: Hunter Peacock, Boden Kahn, and Anna Pitt
+@date: December 19, 2024
+
+A class to represent a TransactionStore kept in encrypted log files, which is where an
+account keeps its records unless another backend is enabled. A FileStore holds the
+records of one account: its transaction log, the sidecar index of the log and a log of
+encrypted checkpoints of the account's state. The log is either a file of the account's
+own or the log it shares with the other accounts of its shard of a StorageLayout, where
+every frame carries the key of its account. Checkpoints are encrypted, and sealed
+segments are decrypted, compressed and encrypted again as one block, so the store is
+given the cipher of its account. In a shared log, the layout archives sealed segments
+with the ciphers of their accounts and prunes the shard's checkpoint log.
+Lookups are kept cheap: the index is only checked against the log again once either has
+changed, and the segment a lookup reads stays open for the next one.
+"""
+
+# Import statements
+import os
+from bisect import bisect_left
+from collections import deque
+from cryptography.exceptions import InvalidTag
+from storage import TransactionStore, decryptRecords
+from transactionLog import (TransactionLog, readRecords, readFrames, readRecordAt, readRecordFrom, mapRecords,
+                            readManifest, getLogSize, getArchivePath, removeSegments)
+from logIndex import LogIndex
+from storageLayout import readSharedArchive
+from transactionRecord import unpackRecord, encodeCheckpoint, decodeCheckpoint, packSegment, unpackSegment
+
+class FileStore(TransactionStore):
+    # The number of checkpoints saved between prunings of a checkpoint log of the account's
+    # own, and the number of newest checkpoints a pruning keeps
+    _PRUNE_EVERY = 64
+    _KEEP_CHECKPOINTS = 2
+
+    # Constructs a FileStore object. The files are opened on first use
+    #
+    #  @param fileName: The name of the file that holds the transaction log (String)
+    #  @param cipher: The cipher of the account (AESCipher)
+    #  @param checkpointFileName: The name of the checkpoint log (String; default is None, the log's name with ".ckpt")
+    #  @param indexFileName: The name of the sidecar index, or of the shard index of a shared log
+    #                       (String; default is None, the log's name with ".idx")
+    #  @param layout: The layout a shared log is opened through (StorageLayout; default is None, a log of its own)
+    #  @param recordKey: The key the account's records are framed with in a shared log (String; default is None)
+    #  @param flushEvery: The number of records to buffer before writing them out (int; default is 1)
+    #  @param flushInterval: The maximum number of milliseconds a record may stay buffered (int; default is 0, no limit)
+    #  @param segmentSize: The number of bytes the active file may reach before it is sealed (int; default is None, no rotation)
+    #  @param codec: The compression used for sealed segments, 'zlib' or 'lzma' (String; default is 'zlib')
+    #
+    #  @require: fileName is a non-empty String
+    #  @require: layout is None, or recordKey is a String
+    #
+    #  @ensure FileStore object successfully created
+    def __init__(self, fileName, cipher, checkpointFileName = None, indexFileName = None, layout = None,
+                 recordKey = None, flushEvery = 1, flushInterval = 0, segmentSize = None, codec = 'zlib'):
+        # Assert statements for preconditions
+        assert isinstance(fileName, str) and len(fileName) > 0, "The file name must be a non-empty String."
+        assert layout is None or isinstance(recordKey, str), "A shared log needs the key of the account's records."
+
+        self._fileName = fileName
+        self._cipher = cipher
+        self._checkpointFileName = fileName + ".ckpt" if checkpointFileName is None else checkpointFileName
+        self._indexFileName = fileName + ".idx" if indexFileName is None else indexFileName
+        self._layout = layout
+        self._recordKey = recordKey
+        self._flushEvery = flushEvery
+        self._flushInterval = flushInterval
+        self._segmentSize = segmentSize
+        self._codec = codec
+        self._log = None  # The open transaction log
+        self._index = None  # The sidecar index of the account's records, opened with the log
+        self._checkpointLog = None  # The log of encrypted checkpoints of the account's own, opened with the log
+        self._archiveCache = None  # The path and records of the archived segment read last
+        self._checkedAt = None  # The log end offset and index length when the index was last checked
+        self._sealedSegments = None  # The active file's base offset and the sealed segments listed with it
+        self._reader = None  # The path, base offset and open file of the segment read last by a lookup
+        self._recentCheckpoints = deque(maxlen = FileStore._KEEP_CHECKPOINTS)  # The offsets of the newest checkpoints saved
+        self._sincePrune = 0  # The number of checkpoints saved since the checkpoint log was opened or pruned
+
+    # Accessor/getter to retrieve the name of the transaction log file
+    #
+    #  @return: The name of the log file (String)
+    def getFileName(self):
+        return self._fileName
+
+    # Returns the open transaction log, opening the log, index and checkpoint files on first use
+    #
+    #  @return: The transaction log (TransactionLog)
+    def getLog(self):
+        if self._log is None:
+            self._open(truncate = False)
+        return self._log
+
+    # A private helper method that opens the transaction log together with its sidecar index
+    # and checkpoints. A shared log is never emptied: a new account only owns the records
+    # appended after its index was started
+    #
+    #  @param truncate: Whether existing log, index and checkpoint files should be emptied (bool)
+    def _open(self, truncate):
+        self._recentCheckpoints.clear()
+        self._sincePrune = 0
+        if self._layout is None:
+            self._checkpointLog = TransactionLog(self._checkpointFileName, truncate = truncate)
+            self._index = LogIndex(self._indexFileName, truncate)
+            self._log = TransactionLog(self._fileName, self._flushEvery, self._flushInterval, truncate, self._index,
+                                       self._segmentSize, self._archiveSegment)
+            return
+        self._log = self._layout.openLog(self._fileName, segmented = True)
+        self._layout.openLog(self._checkpointFileName)
+        self._layout.addCipher(self._recordKey, self._cipher)
+        shardIndex = self._layout.openIndex(self._indexFileName)
+        self._index = shardIndex.getAccountIndex(self._recordKey, truncate, self._log.getEndOffset() if truncate else 0)
+
+    # Returns the sidecar index of the log. Records appended after the last indexed one are
+    # added by scanning only the tail of the log; an index that cannot be trusted is emptied
+    # first, so it is rebuilt with one linear scan. The check is skipped while neither the
+    # log nor the index has changed since the last one
+    #
+    #  @return: The index of the account's records (LogIndex, or AccountIndex in a shared log)
+    def getIndex(self):
+        log = self.getLog()
+        self.flush()
+        index = self._index
+        # The records of other accounts in a shared log never need indexing
+        state = (None if self._layout is not None else log.getEndOffset(), len(index))
+        if state == self._checkedAt:
+            return index
+        if not index.isValid() or index.getEndOffset() > getLogSize(self._fileName):
+            index.rebuild([])
+        # A shared log can still hold records of an earlier account with the same key
+        for offset, size, data in self._readPlainFrames(index.getEndOffset(), self._layout is not None):
+            tNumber, tType, cents, day, flags = unpackRecord(data)
+            index.add(tNumber, day, offset, size)
+        index.flush()
+        self._checkedAt = (state[0], len(index))
+        return index
+
+    # A FileStore holds the records of one account, so the account key is not needed to find them
+    def appendRecord(self, account, tNumber, day, data):
+        self.getLog().append(data, tNumber, day, self._index, self._recordKey)
+
+    # Buffers the whole batch, so the batches of every account of a shared log are written
+    # together when the stores are flushed
+    def appendRecords(self, records):
+        log = self.getLog()
+        log.appendMany(((data, tNumber, day, self._index, self._recordKey) for account, tNumber, day, data in records),
+                       flush = False)
+
+    # Records of compressed archives were decrypted when they were archived, so they are
+    # encrypted again; iterData returns them as they are
+    def iterRecords(self, account, start = 0, stop = None):
+        offset, count = self._locate(start, stop)
+        if offset is not None:
+            yield from self._iterSegments(offset, count)
+
+    def iterRecordsFrom(self, account, tNumber):
+        index = self.getIndex()
+        position = index.findFrom(tNumber)
+        if position >= len(index):
+            return
+        numbers = (index.getEntry(entry)[0] for entry in range(position, len(index)))
+        yield from zip(numbers, self._iterSegments(index.getEntry(position)[2], len(index) - position))
+
+    def getRecord(self, account, tNumber):
+        index = self.getIndex()
+        position = index.findTransaction(tNumber)
+        if position is None:
+            return None
+        return self._readAt(index.getEntry(position)[2])
+
+    def findDay(self, account, day):
+        return self.getIndex().findDay(day)
+
+    # Reads through a memory map of the active file unless mapped is False; records of
+    # compressed archives come from their decompressed blocks
+    def iterData(self, account, cipher, start = 0, stop = None, mapped = True):
+        offset, count = self._locate(start, stop)
+        if offset is not None:
+            yield from self._iterSegments(offset, count, cipher, mapped)
+
+    def iterDataFrom(self, account, cipher, tNumber):
+        index = self.getIndex()
+        position = index.findFrom(tNumber)
+        if position < len(index):
+            yield from self._iterSegments(index.getEntry(position)[2], len(index) - position, cipher)
+
+    def getData(self, account, cipher, tNumber):
+        index = self.getIndex()
+        position = index.findTransaction(tNumber)
+        if position is None:
+            return None
+        return self._readAt(index.getEntry(position)[2], cipher)
+
+    # Encrypts a checkpoint of the state and appends it, taking the current end of the log
+    # as the offset the state is valid at. The index records where the newest checkpoint
+    # is, and the checkpoint log is pruned every so often: by the store for a log of the
+    # account's own, and by the layout for the log shared by a shard
+    def saveState(self, account, state):
+        data = self._cipher.encrypt(encodeCheckpoint(*state, self.getLog().getEndOffset()))
+        if self._layout is not None:
+            self._layout.appendCheckpoint(self._checkpointFileName, self._indexFileName, self._recordKey, data)
+            return
+        offset = self._checkpointLog.append(data)
+        self._index.setCheckpointOffset(offset)
+        self._recentCheckpoints.append(offset)
+        self._sincePrune += 1
+        if self._sincePrune >= FileStore._PRUNE_EVERY:
+            self._pruneCheckpoints()
+
+    # Returns the state of the newest checkpoint that decrypts and fits the log. Only the
+    # checkpoints from the one recorded in the index on are read; if none of them can be
+    # used, for instance after a crash cut the log short, every checkpoint is tried
+    def loadState(self, account):
+        self.getLog()
+        logSize = getLogSize(self._fileName)
+        pointer = self._index.getCheckpointOffset()
+        state = None if pointer is None else self._newestState(pointer, logSize)
+        if state is None and pointer != 0:
+            state = self._newestState(0, logSize)
+        return state
+
+    # Empties the account's files; in a shared log, the account's index starts again at the
+    # end of the log
+    def resetAccount(self, account):
+        self.close()
+        self._archiveCache = None
+        self._open(truncate = True)
+
+    # Writes any buffered records and checkpoints to their files
+    def flush(self):
+        if self._log is not None:
+            self._log.flush()
+            self._getCheckpointLog().flush()
+
+    # Writes out any buffered records and forces the transaction log to stable storage
+    def sync(self):
+        if self._log is not None:
+            self._getCheckpointLog().flush()
+            self._log.sync()
+
+    # Flushes and closes the account's files. Shared logs stay open for the other accounts
+    # of the shard
+    def close(self):
+        self._checkedAt = None
+        self._sealedSegments = None
+        if self._reader is not None:
+            self._reader[2].close()
+            self._reader = None
+        if self._log is None:
+            return
+        self.flush()
+        if self._layout is None:
+            self._log.close()
+            self._checkpointLog.close()
+        else:
+            self._index.close()
+        self._log = None
+        self._checkpointLog = None
+        self._index = None
+
+    # Rewrites every record of the log as one file, converting each record on the way. The
+    # offsets change, so the index is emptied to be rebuilt on the next lookup and the older
+    # checkpoints are removed
+    #
+    #  @param convert: Returns the new form of a decrypted record (function)
+    #
+    #  @require: the log is a file of the account's own
+    def migrate(self, convert):
+        assert self._layout is None, "Only a log of the account's own can be migrated."
+        self.getLog()
+        self.flush()
+        newLog = TransactionLog(self._fileName + ".new", truncate = True)
+        for offset, size, data in self._readPlainFrames():
+            newLog.append(self._cipher.encrypt(convert(data)))
+        newLog.close()
+        self.close()
+        os.replace(self._fileName + ".new", self._fileName)
+        # The rewritten log is one file again
+        removeSegments(self._fileName)
+        self._archiveCache = None
+        self._open(truncate = False)
+        self._index.rebuild([])
+        self._checkpointLog.close()
+        self._checkpointLog = TransactionLog(self._checkpointFileName, truncate = True)
+        self._index.setCheckpointOffset(None)
+
+    # A private helper method that returns the open checkpoint log. A shared checkpoint log
+    # is looked up through the layout each time, as pruning replaces it
+    #
+    #  @return: The checkpoint log (TransactionLog)
+    def _getCheckpointLog(self):
+        if self._layout is None:
+            return self._checkpointLog
+        return self._layout.openLog(self._checkpointFileName)
+
+    # A private helper method that finds the newest checkpoint that can be used, among the
+    # checkpoints from an offset of the checkpoint log on
+    #
+    #  @param offset: The checkpoint log offset to read from (int)
+    #  @param logSize: The size of the transaction log (int)
+    #
+    #  @return: The balance, next transaction number and overdraft count, or None if no
+    #           checkpoint decrypts and fits the log (tuple)
+    def _newestState(self, offset, logSize):
+        try:
+            records = [data for frameOffset, size, data in readFrames(self._checkpointFileName, offset, self._recordKey)]
+        except ValueError:
+            # The offset is no longer the start of a frame
+            return None
+        # Walks back from the newest checkpoint to the first one that decrypts and fits the log
+        for record in reversed(records):
+            try:
+                state = decodeCheckpoint(self._cipher.decrypt(record))
+            except (InvalidTag, ValueError, AssertionError):
+                # A torn or corrupted checkpoint is skipped
+                continue
+            if state[3] <= logSize:
+                return state[:3]
+        return None
+
+    # A private helper method that rewrites the checkpoint log with only its newest
+    # checkpoints, replacing the old file in one rename
+    def _pruneCheckpoints(self):
+        self._checkpointLog.flush()
+        records = [readRecordAt(self._checkpointFileName, offset) for offset in self._recentCheckpoints]
+        newLog = TransactionLog(self._checkpointFileName + ".new", truncate = True)
+        offsets = [newLog.append(record) for record in records]
+        newLog.sync()
+        newLog.close()
+        self._checkpointLog.close()
+        os.replace(self._checkpointFileName + ".new", self._checkpointFileName)
+        self._checkpointLog = TransactionLog(self._checkpointFileName)
+        self._recentCheckpoints.extend(offsets)
+        self._sincePrune = 0
+        self._index.setCheckpointOffset(offsets[-1])
+
+    # A private helper method that finds where a range of positions starts in the log
+    #
+    #  @param start: The position of the first record (int)
+    #  @param stop: The position to stop before (int or None for the last record)
+    #
+    #  @return: The log offset of the first record, or None if there is none, and the number
+    #           of records in the range, or None for every record after it (tuple)
+    def _locate(self, start, stop):
+        index = self.getIndex()
+        if start >= len(index):
+            return (None, 0)
+        return (index.getEntry(start)[2], None if stop is None else stop - start)
+
+    # Archives a sealed segment of the log. The records are decrypted, compressed together
+    # and encrypted again as one block, since encrypted records do not compress
+    #
+    #  @param sealedFileName: The name of the sealed segment file (String)
+    #  @param base: The log offset of the first byte of the segment (int)
+    #
+    #  @return: The path of the archive and the codec it was compressed with (tuple)
+    def _archiveSegment(self, sealedFileName, base):
+        frames = ((base + offset, size, self._cipher.decrypt(record))
+                  for offset, size, record in readFrames(sealedFileName))
+        path = getArchivePath(self._fileName, base, self._codec)
+        with open(path + ".new", "wb") as outfile:
+            outfile.write(self._cipher.encrypt(packSegment(frames, self._codec)))
+            outfile.flush()
+            os.fsync(outfile.fileno())
+        os.replace(path + ".new", path)
+        return (path, self._codec)
+
+    # A private helper method that reads the records of an archived segment, keeping the
+    # last segment read in memory. The archive of a shared segment holds the blocks of
+    # every account of the shard, and only the account's own are read
+    #
+    #  @param path: The path of the archive (String)
+    #  @param codec: The codec the archive was compressed with (String)
+    #
+    #  @return: The (log offset, framed size, decrypted record) of each record (list)
+    def _readArchive(self, path, codec):
+        if self._archiveCache is None or self._archiveCache[0] != path:
+            if self._layout is not None:
+                frames = readSharedArchive(path, codec, self._recordKey, self._cipher)
+            else:
+                with open(path, "rb") as infile:
+                    frames = unpackSegment(self._cipher.decrypt(infile.read()), codec)
+            self._archiveCache = (path, frames, [frame[0] for frame in frames])
+        return self._archiveCache[1]
+
+    # A private helper method that reads the account's records from a log offset on, across
+    # the archived segments and the active file
+    #
+    #  @param offset: The log offset of the first record to read (int; default is 0)
+    #  @param skipForeign: Whether records that do not decrypt are skipped (bool; default is False)
+    #
+    #  @return: A generator of the offset, framed size and decrypted data of each record (tuple)
+    def _readPlainFrames(self, offset = 0, skipForeign = False):
+        for base, end, codec, path in self._listSegments():
+            if end <= offset:
+                continue
+            if codec not in (None, 'raw'):
+                yield from (frame for frame in self._readArchive(path, codec) if frame[0] >= offset)
+                continue
+            for frameOffset, size, record in readFrames(path, max(offset - base, 0), self._recordKey):
+                try:
+                    data = self._cipher.decrypt(record)
+                except (InvalidTag, ValueError):
+                    if not skipForeign:
+                        raise
+                    continue
+                yield (base + frameOffset, size, data)
+
+    # A private helper method that reads the account's records from a log offset on, across
+    # the archived segments and the active file
+    #
+    #  @param offset: The log offset of the first record to read (int)
+    #  @param count: The number of records to read (int or None for every record)
+    #  @param cipher: The cipher records are decrypted with (AESCipher; default is None, the
+    #                 records are returned encrypted)
+    #  @param mapped: Whether to read the active file through a memory map (bool; default is True)
+    #
+    #  @return: A generator of the records (bytes)
+    def _iterSegments(self, offset, count, cipher = None, mapped = True):
+        for base, end, codec, path in self._listSegments():
+            if end <= offset:
+                continue
+            if count == 0:
+                return
+            if codec not in (None, 'raw'):
+                # Archived records were decrypted when the segment was unpacked
+                records = (frame[2] for frame in self._readArchive(path, codec) if frame[0] >= offset)
+                if cipher is None:
+                    records = (self._cipher.encrypt(data) for data in records)
+            else:
+                reader = mapRecords if mapped else readRecords
+                records = reader(path, max(offset - base, 0), self._recordKey)
+                if cipher is not None:
+                    records = decryptRecords(cipher, records if count is None else _take(records, count))
+            for record in records:
+                if count is not None:
+                    if count == 0:
+                        break
+                    count -= 1
+                yield record
+
+    # A private helper method that lists the archived segments and the active file of the
+    # log. The manifest is only read again once the log has been rotated
+    #
+    #  @return: The (base offset, end offset, codec, path) of every segment, oldest first (list)
+    def _listSegments(self):
+        log = self.getLog()
+        base = log.getBaseOffset()
+        if self._sealedSegments is None or self._sealedSegments[0] != base:
+            self._sealedSegments = (base, readManifest(self._fileName)[1])
+        return self._sealedSegments[1] + [(base, log.getEndOffset(), None, self._fileName)]
+
+    # A private helper method that returns the segment file a lookup reads, keeping it open
+    # for the next lookup. The active file is opened again once the log has been rotated
+    #
+    #  @param path: The path of the active file or of a raw archive (String)
+    #  @param base: The log offset of the first byte of the segment (int)
+    #
+    #  @return: The segment file, open for reading (file)
+    def _openSegment(self, path, base):
+        if self._reader is None or self._reader[:2] != (path, base):
+            if self._reader is not None:
+                self._reader[2].close()
+            self._reader = (path, base, open(path, "rb"))
+        return self._reader[2]
+
+    # A private helper method that reads the single record at a log offset
+    #
+    #  @param offset: The log offset of the record (int)
+    #  @param cipher: The cipher the record is decrypted with (AESCipher; default is None, encrypted)
+    #
+    #  @return: The record (bytes)
+    def _readAt(self, offset, cipher = None):
+        for base, end, codec, path in self._listSegments():
+            if base <= offset < end:
+                if codec in (None, 'raw'):
+                    record = readRecordFrom(self._openSegment(path, base), offset - base)
+                    return record if cipher is None else cipher.decrypt(record)
+                frames = self._readArchive(path, codec)
+                data = frames[bisect_left(self._archiveCache[2], offset)][2]
+                return self._cipher.encrypt(data) if cipher is None else data
+        raise ValueError("The offset is past the end of the log.")
+
+# A private helper function that stops a stream of records after a number of them, so
+# records past the range are never decrypted
+#
+#  @param records: The records (iterable)
+#  @param count: The number of records to take (int)
+#
+#  @return: A generator of the first count records
+def _take(records, count):
+    for record in records:
+        if count == 0:
+            return
+        count -= 1
+        yield record
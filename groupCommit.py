@@ -0,0 +1,160 @@
+"""
+This module defines the GroupCommitter class.
+@author: Hunter Peacock, Boden Kahn, and Anna Pitt
+@date: December 9, 2024
+
+A class to represent a group-commit durability service for transaction logs and
+storage backends. Writers from any number of accounts and threads enqueue records; a
+single committer thread appends a batch of records, syncs each log or store touched by
+the batch once, and only then acknowledges the writers whose records were in the batch.
+"""
+
+# Import statements
+import threading
+import time
+from storage import TransactionStore
+
+class GroupCommitter:
+
+    # Constructs a GroupCommitter object and starts its committer thread.
+    #
+    #  @param batchSize: The maximum number of records committed by one fsync round (int; default is 64)
+    #  @param maxLatency: The maximum number of milliseconds a record waits for its batch to fill (int; default is 5)
+    #
+    #  @require: batchSize is an int >= 1
+    #  @require: maxLatency is a number >= 0
+    #
+    #  @ensure GroupCommitter object successfully created and running
+    def __init__(self, batchSize = 64, maxLatency = 5):
+        # Assert statements for preconditions
+        assert isinstance(batchSize, int) and batchSize >= 1, "The batch size must be an integer >= 1."
+        assert isinstance(maxLatency, (int, float)) and maxLatency >= 0, "The maximum latency must be >= 0."
+
+        self._batchSize = batchSize
+        self._maxLatency = maxLatency
+        self._queue = []  # Waiting (log, record, ticket, enqueue time) entries
+        self._condition = threading.Condition()
+        self._closed = False
+
+        # Counters exposed for tuning the batch size and latency
+        self._batchCount = 0
+        self._recordCount = 0
+        self._syncCount = 0
+
+        self._thread = threading.Thread(target = self._run, name = "group-committer", daemon = True)
+        self._thread.start()
+
+    # Accessor/getter to retrieve the batch size
+    #
+    #  @return: The maximum number of records per batch (int)
+    def getBatchSize(self):
+        return self._batchSize
+
+    # Accessor/getter to retrieve the maximum commit latency
+    #
+    #  @return: The maximum number of milliseconds a record waits for its batch (number)
+    def getMaxLatency(self):
+        return self._maxLatency
+
+    # Returns the committer's counters
+    #
+    #  @return: The number of batches, records and fsync calls committed so far (dict)
+    def getStats(self):
+        with self._condition:
+            return {"batches": self._batchCount, "records": self._recordCount, "syncs": self._syncCount}
+
+    # Appends a record to a log or store and blocks until the batch holding it is durable
+    #
+    #  @param log: The log or store the record belongs to (TransactionLog or TransactionStore)
+    #  @param record: The record and its fields, as taken by TransactionLog.append or
+    #                 TransactionStore.appendRecord
+    #
+    #  @require: the committer has not been closed
+    def commit(self, log, *record):
+        ticket = _Ticket()
+        with self._condition:
+            assert not self._closed, "Cannot commit to a closed group committer."
+            self._queue.append((log, record, ticket, time.monotonic()))
+            self._condition.notify_all()
+        ticket.wait()
+
+    # Stops the committer thread after every queued record has been committed
+    def close(self):
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
+
+    # The committer thread: waits for a full batch or for the oldest record to reach the
+    # maximum latency, then commits the batch
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._queue and not self._closed:
+                    self._condition.wait()
+                if not self._queue:
+                    return
+                deadline = self._queue[0][3] + self._maxLatency / 1000
+                while len(self._queue) < self._batchSize and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                batch = self._queue[:self._batchSize]
+                del self._queue[:self._batchSize]
+            self._commitBatch(batch)
+
+    # Writes a batch of records and syncs every log or store it touched exactly once. If
+    # a record cannot be appended, the batch stops there: that record and the ones after
+    # it get the error, and the records already appended are acknowledged once their logs
+    # have been synced
+    #
+    #  @param batch: The (log, (record, fields...), ticket, enqueue time) entries to commit (list)
+    def _commitBatch(self, batch):
+        logs = []
+        appended = 0
+        error = None
+        try:
+            for log, record, ticket, enqueued in batch:
+                if isinstance(log, TransactionStore):
+                    log.appendRecord(*record)
+                else:
+                    log.append(*record)
+                if log not in logs:
+                    logs.append(log)
+                appended += 1
+        except Exception as exc:
+            error = exc
+        syncError = None
+        try:
+            for log in logs:
+                log.sync()
+        except Exception as exc:
+            syncError = exc
+
+        with self._condition:
+            self._batchCount += 1
+            self._recordCount += appended
+            self._syncCount += len(logs)
+        for position, (log, record, ticket, enqueued) in enumerate(batch):
+            ticket.release(syncError if position < appended else error)
+
+# A private helper class that lets a writer wait for its batch to become durable
+class _Ticket:
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._error = None
+
+    # Acknowledges the writer, passing along any error raised while committing
+    def release(self, error):
+        self._error = error
+        self._event.set()
+
+    # Blocks until the record is durable, raising the commit error if there was one
+    def wait(self):
+        self._event.wait()
+        if self._error is not None:
+            raise self._error
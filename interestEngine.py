@@ -0,0 +1,61 @@
+"""
+This module defines the batch interest engine.
+@author: Hunter Peacock, Boden Kahn, and Anna Pitt
+@date: December 14, 2024
+
+Functions to pay end-of-period interest to every account of the bank in one run.
+The balances in cents of all accounts of a type are gathered into an int64 NumPy array
+and the type's rate from BankAccount._intRates is applied to the whole array at once,
+rounding each payment to the nearest cent as calcInterest() does. Each credited
+account gets one posted interest record, and the records are written with
+bankAccount.writeTransactions, one bulk append per log or storage backend.
+Accounts without a positive balance earn no interest, as with calcInterest().
+"""
+
+# Import statements
+import numpy as np
+from bankAccount import BankAccount, writeTransactions
+from transaction import Transaction
+from money import Cents
+from transactionRecord import FLAG_POSTED, FLAG_CREDIT
+
+# Calculates the interest earned on an array of balances
+#
+#  @param balances: The balances of the accounts in cents (array-like of int)
+#  @param rate: The interest rate in decimal form (float)
+#
+#  @return: The interest in cents earned by each account, 0 for balances that are not positive (numpy.ndarray of int64)
+def computeInterest(balances, rate):
+    balances = np.asarray(balances, dtype = np.int64)
+    return np.where(balances > 0, np.rint(balances * rate), 0).astype(np.int64)
+
+# Pays interest to every account with a positive balance
+#
+#  @param accounts: The accounts to pay interest to, e.g. every account of every Client (iterable of BankAccount)
+#  @param date: The date of the interest transactions (String "YYYY-MM-DD"; default is None, today)
+#
+#  @require: no account appears more than once
+#
+#  @return: The number of accounts credited (int)
+def runInterest(accounts, date = None):
+    byType = {}
+    for account in accounts:
+        byType.setdefault(account.getAccountType(), []).append(account)
+    assert sum(len(group) for group in byType.values()) == len({id(account) for group in byType.values() for account in group}), \
+        "An account can only be paid interest once per run."
+
+    entries = []
+    for accountType, group in byType.items():
+        balances = np.fromiter((account._cents for account in group), np.int64, len(group))
+        amounts = computeInterest(balances, BankAccount._intRates[accountType])
+        for account, cents in zip(group, amounts.tolist()):
+            if cents > 0:
+                transaction = Transaction("interest", account.getNextTransactionNum(), Cents(cents), date)
+                entries.append((account, transaction, FLAG_POSTED | FLAG_CREDIT))
+
+    writeTransactions(entries)
+    for account, transaction, flags in entries:
+        # add interest to list of transactions
+        account._accountTransactions.append(transaction)
+        account._applyDeposit(transaction.getCents())
+    return len(entries)
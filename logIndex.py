@@ -0,0 +1,252 @@
+"""
+This module defines the LogIndex class.
+@author: Hunter Peacock, Boden Kahn, and Anna Pitt
+@date: December 10, 2024
+
+A class to represent the sidecar index kept next to a transaction log.
+The index holds one fixed-size entry per record, in log order:
+    transaction number (4 bytes), day number (4 bytes), byte offset (8 bytes), framed size (4 bytes)
+Transaction numbers increase by one per record, so the entry of a transaction number is
+found with one seek; day numbers never decrease, so the first record of a date is found
+with a binary search over the entries. The number of entries is kept in memory once the
+file is opened, so a lookup costs one seek and read of its entry.
+The header also holds the base offset the account's records start at, since an account
+in a shared log only owns the records appended after it was opened, and the offset of the
+account's newest checkpoint, so recovery does not read every checkpoint before it.
+"""
+
+# Import statements
+import os
+import struct
+
+# The lookups shared by every index of an account's records. A subclass keeps the
+# entries, in log order, and the base and checkpoint offsets of the account
+class RecordIndex:
+
+    # Accessor/getter to retrieve the log offset the index starts at
+    #
+    #  @return: The base offset of the index (int)
+    def getBaseOffset(self):
+        return self._baseOffset
+
+    # Accessor/getter to retrieve the offset of the account's newest checkpoint
+    #
+    #  @return: The checkpoint log offset, or None if it is not known (int)
+    def getCheckpointOffset(self):
+        return self._checkpointOffset
+
+    # Returns the log offset just past the last indexed record, where records the index
+    # has not seen yet would start
+    #
+    #  @return: The end offset of the last entry, or the base offset if there is none (int)
+    def getEndOffset(self):
+        count = len(self)
+        if count == 0:
+            return self._baseOffset
+        tNumber, day, offset, framedSize = self.getEntry(count - 1)
+        return offset + framedSize
+
+    # Finds the position of a transaction number in the log
+    #
+    #  @param tNumber: The transaction number to find (int)
+    #
+    #  @return: The position of the record, or None if it is not in the index
+    def findTransaction(self, tNumber):
+        count = len(self)
+        if count == 0:
+            return None
+        position = tNumber - self.getEntry(0)[0]
+        if 0 <= position < count and self.getEntry(position)[0] == tNumber:
+            return position
+        # Falls back to a binary search if the numbers are not contiguous
+        low = self.findFrom(tNumber)
+        if low < count and self.getEntry(low)[0] == tNumber:
+            return low
+        return None
+
+    # Finds the position of the first record with a transaction number at or after a number
+    #
+    #  @param tNumber: The transaction number to find (int)
+    #
+    #  @return: The position of the first such record (int; the number of entries if there is none)
+    def findFrom(self, tNumber):
+        low, high = 0, len(self)
+        while low < high:
+            middle = (low + high) // 2
+            if self.getEntry(middle)[0] < tNumber:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    # Finds the position of the first record on or after a day
+    #
+    #  @param day: The day number to find (int)
+    #
+    #  @return: The position of the first record on or after the day (int; the number of entries if there is none)
+    def findDay(self, day):
+        low, high = 0, len(self)
+        while low < high:
+            middle = (low + high) // 2
+            if self.getEntry(middle)[1] < day:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+class LogIndex(RecordIndex):
+    # The header written at the start of every index file (magic value, format version, base
+    # offset and checkpoint offset)
+    _HEADER = struct.Struct("<4sBQQ")
+    _MAGIC = b"TXIX"
+    _VERSION = 3
+    # The checkpoint offset stored when no checkpoint is known
+    _NO_CHECKPOINT = 2 ** 64 - 1
+    # The layout of one index entry
+    _ENTRY = struct.Struct("<IIQI")
+
+    # Constructs a LogIndex object.
+    #
+    #  @param fileName: The name of the sidecar index file (String)
+    #  @param truncate: Whether an existing index should be emptied (bool; default is False)
+    #  @param baseOffset: The log offset a new index starts at (int; default is 0)
+    #
+    #  @require: fileName is a non-empty String
+    #  @require: baseOffset is an int >= 0
+    #
+    #  @ensure LogIndex object successfully created and the file is open
+    def __init__(self, fileName, truncate = False, baseOffset = 0):
+        assert isinstance(fileName, str) and len(fileName) > 0, "The file name must be a non-empty String."
+        assert isinstance(baseOffset, int) and baseOffset >= 0, "The base offset must be an integer >= 0."
+        self._fileName = fileName
+        self._pending = []  # Packed entries that have not been written yet
+        self._missing = False  # Set when a record was appended without its index fields
+        self._baseOffset = baseOffset
+        self._checkpointOffset = None  # The checkpoint log offset of the newest checkpoint, if known
+        self._count = 0  # The number of entries, counting buffered ones
+        if truncate or not os.path.exists(fileName):
+            self._file = open(fileName, "w+b")
+            self._file.write(self._packHeader())
+        else:
+            self._file = open(fileName, "r+b")
+            # An index without a valid header is rebuilt from the start of the log
+            header = self._readHeader()
+            if header is not None:
+                self._baseOffset, self._checkpointOffset = header
+            else:
+                self._baseOffset = 0
+            size = os.fstat(self._file.fileno()).st_size - LogIndex._HEADER.size
+            self._count = max(size, 0) // LogIndex._ENTRY.size
+        self._file.flush()
+
+    # Accessor/getter to retrieve the name of the index file
+    #
+    #  @return: The name of the sidecar index file (String)
+    def getFileName(self):
+        return self._fileName
+
+    # Mutator/setter to record the offset of the account's newest checkpoint in the header.
+    # An index without a valid header keeps the offset until it is rebuilt
+    #
+    #  @param offset: The checkpoint log offset, or None if no checkpoint is known (int)
+    def setCheckpointOffset(self, offset):
+        self._checkpointOffset = offset
+        if self._readHeader() is not None:
+            self._file.seek(0)
+            self._file.write(self._packHeader())
+
+    # A private helper method that packs the header of the index file
+    #
+    #  @return: The packed header (bytes)
+    def _packHeader(self):
+        checkpointOffset = LogIndex._NO_CHECKPOINT if self._checkpointOffset is None else self._checkpointOffset
+        return LogIndex._HEADER.pack(LogIndex._MAGIC, LogIndex._VERSION, self._baseOffset, checkpointOffset)
+
+    # A private helper method that reads the header of the index file
+    #
+    #  @return: The base offset and checkpoint offset stored in the header, or None if the header is not valid (tuple)
+    def _readHeader(self):
+        self._file.seek(0)
+        header = self._file.read(LogIndex._HEADER.size)
+        if len(header) != LogIndex._HEADER.size:
+            return None
+        magic, version, baseOffset, checkpointOffset = LogIndex._HEADER.unpack(header)
+        if magic != LogIndex._MAGIC or version != LogIndex._VERSION:
+            return None
+        return (baseOffset, None if checkpointOffset == LogIndex._NO_CHECKPOINT else checkpointOffset)
+
+    # Adds an entry for a record appended to the log. A record appended without its
+    # transaction number or day marks the index as needing a rebuild
+    #
+    #  @param tNumber: The transaction number of the record (int)
+    #  @param day: The day number of the record (int)
+    #  @param offset: The byte offset of the framed record in the log (int)
+    #  @param size: The number of bytes the framed record takes in the log (int)
+    def add(self, tNumber, day, offset, size):
+        if tNumber is None or day is None:
+            self._missing = True
+            return
+        self._pending.append(LogIndex._ENTRY.pack(tNumber, day, offset, size))
+        self._count += 1
+
+    # Writes the buffered entries to the index file
+    def flush(self):
+        if self._file is None:
+            return
+        if self._pending:
+            self._file.seek(0, os.SEEK_END)
+            self._file.write(b"".join(self._pending))
+            self._pending = []
+        self._file.flush()
+
+    # Flushes and closes the index file
+    def close(self):
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+    # Returns the number of entries in the index
+    #
+    #  @return: The number of indexed records (int)
+    def __len__(self):
+        return self._count
+
+    # Returns one entry of the index
+    #
+    #  @param position: The position of the record in the log (int)
+    #
+    #  @return: The transaction number, day number, offset and framed size of the record (tuple)
+    def getEntry(self, position):
+        if self._pending:
+            self.flush()
+        self._file.seek(LogIndex._HEADER.size + position * LogIndex._ENTRY.size)
+        return LogIndex._ENTRY.unpack(self._file.read(LogIndex._ENTRY.size))
+
+    # Determines whether the entries of the index can be trusted. A valid index may still
+    # be missing records appended after its last entry; they start at getEndOffset()
+    #
+    #  @return: True if the index is usable, False if it must be rebuilt
+    def isValid(self):
+        if self._missing:
+            return False
+        self.flush()
+        if self._readHeader() is None:
+            return False
+        size = os.fstat(self._file.fileno()).st_size - LogIndex._HEADER.size
+        return size % LogIndex._ENTRY.size == 0
+
+    # Replaces the contents of the index with entries found by scanning the log. The
+    # checkpoint offset is kept
+    #
+    #  @param entries: The (transaction number, day number, offset, framed size) of every record, in log order
+    def rebuild(self, entries):
+        self._pending = []
+        self._missing = False
+        self._count = 0
+        self._file.seek(0)
+        self._file.truncate()
+        self._file.write(self._packHeader())
+        for entry in entries:
+            self.add(*entry)
+        self.flush()
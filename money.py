@@ -0,0 +1,62 @@
+"""
+This module defines the fixed-point money representation.
+@author: Hunter Peacock, Boden Kahn, and Anna Pitt
+@date: December 15, 2024
+
+Accounts, transactions and persisted records hold money as an integer number of cents,
+so balances never drift under repeated interest and sums and comparisons are exact.
+Methods still take amounts as floating-point dollars; a float is rounded to the nearest
+cent once, where it enters. An amount already counted in cents is passed as Cents.
+"""
+
+class Cents(int):
+
+    # Returns the amount in dollars
+    #
+    #  @return: The amount in dollars (float)
+    def toDollars(self):
+        return int(self) / 100
+
+    # Returns a String representation of the amount
+    #
+    #  @return: The number of cents, marked as Cents (String)
+    def __repr__(self):
+        return f"Cents({int(self)})"
+
+# Determines if a value can be used as an amount of money
+#
+#  @param amount: The value to check
+#
+#  @return: True if the value is a floating-point number of dollars or Cents, False if not
+def isAmount(amount):
+    return isinstance(amount, (float, Cents))
+
+# Converts an amount of money to cents
+#
+#  @param amount: The amount in dollars (float) or in cents (Cents)
+#
+#  @require: amount is a float or Cents
+#
+#  @return: The amount in cents (int)
+def toCents(amount):
+    if isinstance(amount, Cents):
+        return int(amount)
+    assert isinstance(amount, float), "The amount must be a floating-point value or Cents."
+    return round(amount * 100)
+
+# Converts an amount in cents to dollars
+#
+#  @param cents: The amount in cents (int)
+#
+#  @return: The amount in dollars (float)
+def toDollars(cents):
+    return cents / 100
+
+# Calculates the interest earned on a balance, rounded to the nearest cent
+#
+#  @param cents: The balance in cents (int)
+#  @param rate: The interest rate in decimal form (float)
+#
+#  @return: The interest in cents (int)
+def interestCents(cents, rate):
+    return round(cents * rate)
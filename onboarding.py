@@ -0,0 +1,158 @@
+"""
+This module defines bulk Client onboarding and the OnboardingReport class.
+@author: Hunter Peacock, Boden Kahn, and Anna Pitt
+@date: December 16, 2024
+
+Migrating a customer file means constructing many Clients, and each one pays for a full
+password hash. onboardClients checks every row first, derives the hashes of the valid rows
+in parallel on a process pool sized to the cores, and then constructs the Clients in row
+order, so client numbers are handed out consecutively in the order of the file no matter
+which hash finishes first. Each hash is handed the key derivation settings of the calling
+process, as a spawned worker process starts without them. Only a window of hashes is submitted ahead of the row being
+constructed, so a large file does not queue every password at once. A row that fails
+validation is reported and skipped without hashing its password, taking a client number
+or stopping the batch.
+"""
+
+# Import statements
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from client import Client, hashPassword
+from passwordKdf import getKdfSettings, applyKdfSettings
+from name import Name
+from address import Address
+from phoneNumber import PhoneNumber
+from password import Password
+
+class OnboardingReport:
+
+    # Constructs an OnboardingReport object. Reports are returned by onboardClients
+    #
+    #  @param total: The number of rows in the batch (int)
+    def __init__(self, total):
+        self._total = total
+        self._clients = []
+        self._failures = []
+
+    # Accessor/getter to retrieve the number of rows in the batch
+    #
+    #  @return: The number of rows (int)
+    def getTotal(self):
+        return self._total
+
+    # Accessor/getter to retrieve the Clients created
+    #
+    #  @return: The Clients, in row order (list of Client)
+    def getClients(self):
+        return self._clients
+
+    # Accessor/getter to retrieve the rows that were not onboarded
+    #
+    #  @return: The position of each failed row and the reason, in row order (list of tuples)
+    def getFailures(self):
+        return self._failures
+
+    # Returns a String representation of the report
+    #
+    #  @return: The number of Clients created and rows that failed (String)
+    def __repr__(self):
+        return f"OnboardingReport({len(self._clients)} of {self._total} onboarded, {len(self._failures)} failed)"
+
+# Onboards a batch of Clients
+#
+#  @param rows: The Clients to create, each a tuple of (Name, Address, PhoneNumber, account type, Password)
+#               as taken by the Client constructor (iterable of tuples)
+#  @param executor: The executor the password hashes are derived on (concurrent.futures.Executor;
+#                   default is None, a process pool sized to the cores for the batch)
+#  @param progress: Called with the number of rows handled and the number of rows after each row
+#                   (function; default is None)
+#  @param window: The largest number of hashes submitted and not yet used (int; default is None,
+#                 four per core)
+#
+#  @require: window is None or an int >= 1
+#
+#  @return: The Clients created and the rows that failed (OnboardingReport)
+def onboardClients(rows, executor = None, progress = None, window = None):
+    assert window is None or (isinstance(window, int) and window >= 1), "The window must be an integer >= 1."
+    rows = list(rows)
+    report = OnboardingReport(len(rows))
+    valid = []
+    for index, row in enumerate(rows):
+        reason = _validateRow(row)
+        if reason is None:
+            valid.append(index)
+        else:
+            report._failures.append((index, reason))
+
+    if window is None:
+        window = 4 * (os.cpu_count() or 1)
+    ownExecutor = executor is None and len(valid) > 0
+    if ownExecutor:
+        executor = ProcessPoolExecutor(max_workers = os.cpu_count() or 1)
+    # The parameters are read here, since a worker process may not see ones set after it started
+    iterations, hashAlgo, kdfSettings = Client.HASH_ITERATIONS, Client.HASH_ALGO, getKdfSettings()
+    toSubmit = iter(valid)
+    hashes = deque()
+
+    # Submits the hashes of the next valid rows until the window is full
+    def submitAhead():
+        while len(hashes) < window:
+            index = next(toSubmit, None)
+            if index is None:
+                return
+            hashes.append((index, executor.submit(_hashPassword, rows[index][4], iterations, hashAlgo, kdfSettings)))
+
+    try:
+        submitAhead()
+        for index, row in enumerate(rows):
+            # Rows are constructed in order, so client numbers follow the order of the rows
+            if hashes and hashes[0][0] == index:
+                future = hashes.popleft()[1]
+                # The next hash is queued before waiting, so the workers are not left idle
+                submitAhead()
+                try:
+                    report._clients.append(Client(*row, _hashRecord = future.result()))
+                except Exception as error:
+                    report._failures.append((index, str(error) or type(error).__name__))
+            if progress is not None:
+                progress(index + 1, len(rows))
+    finally:
+        if ownExecutor:
+            executor.shutdown(wait = True)
+    report._failures.sort(key = lambda failure: failure[0])
+    return report
+
+# A private helper function that hashes a password in a worker with the key derivation
+# settings of the process that submitted it. Kept at module level so a process pool can run it
+#
+#  @param password: The password to hash (Password)
+#  @param iterations: The number of iterations to go through (int)
+#  @param hashAlgo: The name of the hash algorithm (String)
+#  @param kdfSettings: The settings returned by getKdfSettings in the submitting process (dict)
+#
+#  @return: The salt, iterations, hash algorithm and hash (tuple)
+def _hashPassword(password, iterations, hashAlgo, kdfSettings):
+    applyKdfSettings(kdfSettings)
+    return hashPassword(password, iterations, hashAlgo)
+
+# A private helper function that checks a row before its password is hashed
+#
+#  @param row: The row to check
+#
+#  @return: The reason the row cannot be onboarded, or None if it is valid (String)
+def _validateRow(row):
+    if not isinstance(row, (tuple, list)) or len(row) != 5:
+        return "The row must hold a name, address, phone number, account type and password."
+    name, address, phoneNumber, accountType, password = row
+    if not isinstance(name, Name):
+        return "The name must be of the Name type."
+    if not isinstance(address, Address):
+        return "The address must be of the Address type."
+    if not isinstance(phoneNumber, PhoneNumber):
+        return "The phone number must be of the PhoneNumber type."
+    if accountType not in ['checking', 'savings']:
+        return "The account type must be either checking or savings."
+    if not isinstance(password, Password):
+        return "The password must be of the Password type."
+    return None
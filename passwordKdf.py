@@ -0,0 +1,188 @@
+"""
+This module defines the PasswordKdf interface and its backends.
+@author: Hunter Peacock, Boden Kahn, and Anna Pitt
+@date: December 17, 2024
+
+An abstract class to represent a key derivation function that turns a password into
+the hash a Client stores. A Client records the name of the function its hash was
+derived with in _hash_algo and the cost in _iterations:
+   - the name of any hashlib algorithm selects PBKDF2-HMAC with that algorithm, and the
+     cost is the iteration count; this is what every existing hash was derived with
+   - 'scrypt' selects hashlib.scrypt, and the cost is its CPU/memory cost n
+   - 'insecure-fast' selects one SHA-256 of the salt and password, so tests and benchmarks
+     can create Clients in microseconds. It can only be enabled by a test configuration,
+     one that sets the environment variable BANK_TEST_CONFIG=1
+The parameters of a hash can be saved as a versioned String with encodeHashRecord.
+"""
+
+# Import statements
+import os
+import hashlib
+from abc import ABC, abstractmethod
+
+# The version written at the start of an encoded hash record
+HASH_RECORD_VERSION = 1
+
+# The names of the backends that are not PBKDF2
+SCRYPT = 'scrypt'
+INSECURE_FAST = 'insecure-fast'
+
+# The environment variable that marks a test configuration
+TEST_CONFIG_VARIABLE = "BANK_TEST_CONFIG"
+
+class PasswordKdf(ABC):
+
+    @abstractmethod
+    # Derives the hash of a password
+    #
+    #  @param secret: The password and pepper (bytes)
+    #  @param salt: The salt value (bytes)
+    #  @param cost: The cost of the derivation (int)
+    #
+    #  @return: The hash (bytes)
+    def derive(self, secret, salt, cost):
+        pass
+
+    @abstractmethod
+    # Accessor/getter to retrieve the cost new hashes are derived with by default
+    #
+    #  @return: The default cost (int)
+    def getDefaultCost(self):
+        pass
+
+    # Rounds a cost to the nearest one the function accepts
+    #
+    #  @param cost: The cost to round (int or float)
+    #
+    #  @return: The rounded cost (int)
+    def roundCost(self, cost):
+        return max(1, round(cost))
+
+class Pbkdf2Kdf(PasswordKdf):
+
+    # Constructs a Pbkdf2Kdf object.
+    #
+    #  @param hashAlgo: The name of the hashlib algorithm used by HMAC (String)
+    def __init__(self, hashAlgo):
+        self._hashAlgo = hashAlgo
+
+    def derive(self, secret, salt, cost):
+        return hashlib.pbkdf2_hmac(self._hashAlgo, secret, salt, cost)
+
+    def getDefaultCost(self):
+        return 100_000
+
+    # Iteration counts are kept to whole thousands
+    def roundCost(self, cost):
+        return max(1000, int(round(cost, -3)))
+
+class ScryptKdf(PasswordKdf):
+    # The block size and parallelization of every derivation
+    _BLOCK_SIZE = 8
+    _PARALLEL = 1
+
+    def derive(self, secret, salt, cost):
+        # Each derivation uses 128 * r * n bytes, so the limit is raised to fit the cost
+        memory = 128 * ScryptKdf._BLOCK_SIZE * cost * 2
+        return hashlib.scrypt(secret, salt = salt, n = cost, r = ScryptKdf._BLOCK_SIZE, p = ScryptKdf._PARALLEL,
+                              maxmem = memory, dklen = 32)
+
+    def getDefaultCost(self):
+        return 2 ** 14
+
+    # The cost n must be a power of two, so costs are rounded down to one
+    def roundCost(self, cost):
+        return 2 ** max(1, round(max(cost, 2)).bit_length() - 1)
+
+class InsecureFastKdf(PasswordKdf):
+
+    # Only a single hash, for tests; the cost is ignored
+    def derive(self, secret, salt, cost):
+        return hashlib.sha256(salt + secret).digest()
+
+    def getDefaultCost(self):
+        return 1
+
+# Whether the insecure fast backend may be used
+_insecureEnabled = False
+
+# Returns the backend a hash was derived with
+#
+#  @param hashAlgo: The name recorded with the hash (String)
+#
+#  @require: hashAlgo names an available backend
+#
+#  @return: The backend (PasswordKdf)
+def getKdf(hashAlgo):
+    assert isKdfAvailable(hashAlgo), "The key derivation function is not available."
+    if hashAlgo == SCRYPT:
+        return ScryptKdf()
+    if hashAlgo == INSECURE_FAST:
+        return InsecureFastKdf()
+    return Pbkdf2Kdf(hashAlgo)
+
+# Determines if a backend can derive hashes. A hashlib name is only accepted if PBKDF2
+# can use it, which rules out digests such as shake_128 that hashlib lists but HMAC cannot use
+#
+#  @param hashAlgo: The name recorded with the hash (String)
+#
+#  @return: True if the backend can be used, False if not (bool)
+def isKdfAvailable(hashAlgo):
+    if hashAlgo == INSECURE_FAST:
+        return _insecureEnabled
+    if hashAlgo == SCRYPT:
+        return True
+    try:
+        hashlib.pbkdf2_hmac(hashAlgo, b"", b"", 1)
+    except (ValueError, TypeError):
+        return False
+    return True
+
+# Allows the insecure fast backend to be used
+#
+#  @require: the environment marks a test configuration (BANK_TEST_CONFIG=1)
+def enableInsecureTestKdf():
+    global _insecureEnabled
+    assert os.environ.get(TEST_CONFIG_VARIABLE) == "1", "The insecure key derivation function is only for tests."
+    _insecureEnabled = True
+
+# Stops the insecure fast backend from being used, so hashes derived with it no longer match
+def disableInsecureTestKdf():
+    global _insecureEnabled
+    _insecureEnabled = False
+
+# Returns the backend settings of this process, which a worker process does not inherit
+# when it is spawned instead of forked
+#
+#  @return: The settings, to be passed to applyKdfSettings in the worker (dict)
+def getKdfSettings():
+    return {"insecureFast": _insecureEnabled}
+
+# Applies backend settings taken by getKdfSettings in the process that handed out the work
+#
+#  @param settings: The settings returned by getKdfSettings (dict)
+def applyKdfSettings(settings):
+    global _insecureEnabled
+    _insecureEnabled = settings["insecureFast"]
+
+# Encodes the parameters and value of a hash as a versioned String
+#
+#  @param hashRecord: The salt, cost, backend name and hash (tuple)
+#
+#  @return: The encoded record, "v<version>$<name>$<cost>$<salt>$<hash>" with hexadecimal bytes (String)
+def encodeHashRecord(hashRecord):
+    salt, cost, hashAlgo, hashValue = hashRecord
+    return f"v{HASH_RECORD_VERSION}${hashAlgo}${cost}${salt.hex()}${hashValue.hex()}"
+
+# Decodes a String produced by encodeHashRecord
+#
+#  @param text: The encoded record (String)
+#
+#  @require: text is an encoded hash record of a supported version
+#
+#  @return: The salt, cost, backend name and hash (tuple)
+def decodeHashRecord(text):
+    fields = text.split("$")
+    assert len(fields) == 5, "The hash record must have five fields."
+    assert fields[0] == f"v{HASH_RECORD_VERSION}", "The hash record has an unsupported version."
+    return (bytes.fromhex(fields[3]), int(fields[2]), fields[1], bytes.fromhex(fields[4]))
@@ -11,14 +11,14 @@ This class is inherited from the BankAccount superclass
 # Import statements
 from bankAccount import BankAccount
 from transaction import Transaction
-from AES_CBC import encrypt_AES_CBC, decrypt_AES_CBC
+from money import Cents, isAmount, toCents, interestCents
 import os
 
 # Hunter 
 class SavingsAccount(BankAccount):
     
-    # A private class variable that holds the overdraft fee amounts for savings accounts
-    _overdraftFee = [20.00, 30.00, 50.00]
+    # A private class variable that holds the overdraft fee amounts for savings accounts, in cents
+    _overdraftFee = [Cents(2000), Cents(3000), Cents(5000)]
 
     # Constructs a SavingsAccount object.
     #
@@ -26,13 +26,16 @@ class SavingsAccount(BankAccount):
     #  @param clientNum: The Client number of the Savings Account (int)
     #  @param balanceIn: The starting balance of the Savings Account (Floating point; default is 0.0)
     #  @param account_type: The account type of the Savings Account (String; default is 'savings')
+    #  @param key: The encryption key of an existing account whose log should be reopened (bytes; default is a new key)
     #
     #  @ensure SavingsAccount object successfully created    
-    def __init__(self, accountNum, clientNum, balanceIn = 0.0, accountType = 'savings'):
+    def __init__(self, accountNum, clientNum, balanceIn = 0.0, accountType = 'savings', key = None):
         super().__init__(accountNum, clientNum, balanceIn, accountType)
         self._overdrawnCount = 0  # Counter for overdrafts (savings only)
         # Encryption key (Ensure the key is 16, 24, or 32 bytes for AES-128, AES-192, or AES-256)
-        self._key = os.urandom(32)
+        # An existing key reopens the account's log instead of starting a new one
+        self._key = os.urandom(32) if key is None else key
+        self._resume = key is not None
         # Initialization vector (Ensure the IV is 16 bytes)
         self._iv = os.urandom(16)
 
@@ -41,7 +44,7 @@ class SavingsAccount(BankAccount):
     # @return: The overdraft fee (floating-point value)
     # Anna
     def getOverdraft(self):
-        return self._overdraftFee[self.getOverdrawnCount() - 1]
+        return self._overdraftFee[self.getOverdrawnCount() - 1].toDollars()
 
     # An accessor/getter method for the number of times the account has been
     # overdrawn
@@ -62,26 +65,34 @@ class SavingsAccount(BankAccount):
     #
     #  @param amount: the amount to be deposited
     #
-    #  @require amount must be a positive, floating-point value
+    #  @require amount must be a positive, floating-point value or Cents
     #
     #  @return The success or failure of the deposit
     # Boden
     def deposit(self, amount):
         # Make sure the amount to deposit a float is not negative
-        assert(isinstance(amount, float))
+        assert(isAmount(amount))
         assert(amount > 0)
         # Process the transaction and update necessary variables
         depositTransaction = Transaction("deposit", self.getNextTransactionNum(), amount)
+        self._writeTransaction(depositTransaction)
         # add deposit to list of transactions
         self._accountTransactions.append(depositTransaction)
-        self._writeTransaction(depositTransaction)
-        self._balance += amount
-        if self.getBalance() >= 100.0 and self.getOverdrawnCount() > 0:
+        self._applyDeposit(depositTransaction.getCents())
+        return True
+
+    # Adds a deposit to the balance and lowers the overdrawn counter if the new balance
+    # allows it
+    #
+    #  @param cents: the amount deposited in cents
+    # Boden
+    def _applyDeposit(self, cents):
+        self._cents += cents
+        if self._cents >= 10000 and self.getOverdrawnCount() > 0:
             self._setOverdrawnCount (self._overdrawnCount - 1)
-        if self.getBalance() >= 10000.0:
+        if self._cents >= 1000000:
             # if the account balance exceeds 10000 reset overdrawn counter:
             self._setOverdrawnCount(0)
-        return True
 
     # Withdraws money from the account if the transaction is valid and records the transaction
     # If the transaction is valid but the account will be overdrawn, applies an overdraft fee and 
@@ -89,68 +100,125 @@ class SavingsAccount(BankAccount):
     #
     #  @param amount: the amount to be withdrawn
     #
-    #  @require amount must be a positive, floating-point value
+    #  @require amount must be a positive, floating-point value or Cents
     #
     #  @return The success or failure of the withdrawal
     # Boden
     def withdraw(self, amount):
         # Make sure the amount to withdrawal is not negative
-        assert(isinstance(amount, float))
+        assert(isAmount(amount))
         assert(amount >= 0)
         # Ensure the balance is at least $250 more than the withdrawal amount
-        assert amount < self.getBalance() + 250.0 and self.getOverdrawnCount() < 3, "Transaction denied"
+        assert toCents(amount) < self._cents + 25000 and self.getOverdrawnCount() < 3, "Transaction denied"
         # Process the transaction and update necessary variables
         withdrawalTransaction = Transaction("withdrawal", self.getNextTransactionNum(), amount)
+        # If the withdrawal would put the balance in the negative, its overdraft fee is
+        # written with it as one task, so the withdrawal is never logged without its fee
+        penaltyTransaction = None
+        if self._cents - withdrawalTransaction.getCents() < 0:
+            penaltyTransaction = self._newPenalty(self.getNextTransactionNum() + 1)
+            self._writeTransactionGroup((withdrawalTransaction, penaltyTransaction))
+        else:
+            self._writeTransaction(withdrawalTransaction)
         # add withdrawal to list of transactions
         self._accountTransactions.append(withdrawalTransaction)
-        self._writeTransaction(withdrawalTransaction)
-        self._balance -= amount
-        # If the withdrawal would put the balance in the negative, add an
-        # overdraft fee and increment the overdrawn counter
-        if self.getBalance() < 0.0:
-            # Process the transaction and update necessary variables
-            self._setOverdrawnCount(self.getOverdrawnCount() + 1)
-            self._balance -= self.getOverdraft()
-            penaltyTransaction = Transaction("penalty", self.getNextTransactionNum(), self.getOverdraft())
-            # add penalty to list of transactions
-            self._accountTransactions.append(penaltyTransaction)
-            self._writeTransaction(penaltyTransaction)
-            print("The account is overdrawn")
+        self._cents -= withdrawalTransaction.getCents()
+        # Add the overdraft fee and increment the overdrawn counter
+        if penaltyTransaction is not None:
+            self._chargeOverdraft(penaltyTransaction)
         return True
 
+    # Creates the overdraft fee charged when a withdrawal or transfer leaves the balance negative
+    #
+    #  @param tNumber: The transaction number of the fee (int)
+    #
+    #  @return: The penalty transaction (Transaction)
+    # Boden
+    def _newPenalty(self, tNumber):
+        # The fee depends on how many times the account has already been overdrawn
+        fee = self._overdraftFee[self.getOverdrawnCount()]
+        return Transaction("penalty", tNumber, fee)
+
+    # Applies an overdraft fee whose record was written with the withdrawal or transfer
+    # that left the balance negative
+    #
+    #  @param penaltyTransaction: The overdraft fee (Transaction)
+    # Boden
+    def _chargeOverdraft(self, penaltyTransaction):
+        # add penalty to list of transactions
+        self._accountTransactions.append(penaltyTransaction)
+        self._applyPenalty(penaltyTransaction.getCents())
+        print("The account is overdrawn")
+
+    # Subtracts an overdraft fee from the balance and increments the overdrawn counter
+    #
+    #  @param cents: the overdraft fee charged in cents
+    # Boden
+    def _applyPenalty(self, cents):
+        self._setOverdrawnCount(self.getOverdrawnCount() + 1)
+        self._cents -= cents
+
     # Transfer an amount of money from one account to another
+    # Both legs are committed together through one write-ahead intent; an overdraft fee
+    # is committed in the same intent, so recovery logs the debit and its fee together
     #
     #  @param amount: The amount being transferred to the other account
     #  @param otherAccount: The account that is being transferred the money (if possible)
     #
+    #  @require amount must be a positive, floating-point value or Cents
+    #
     #  @return: True if the money was able to be transferred and False if not
     # Boden
     def transfer(self, amount, otherAccount: BankAccount):
-        assert self.withdraw(amount)
-        otherAccount.deposit(amount)
-        transaction = Transaction("transfer", self.getNextTransactionNum(), amount)
-        # add transfer to list of transactions
-        self._accountTransactions.append(transaction)
-        self._writeTransaction(transaction)
+        assert(isAmount(amount))
+        assert(amount > 0)
+        assert toCents(amount) < self._cents + 25000 and self.getOverdrawnCount() < 3, "Transfer denied"
+        # If the transfer would put the balance in the negative, its overdraft fee is
+        # numbered after the debit leg
+        penaltyTransaction = None
+        if self._cents - toCents(amount) < 0:
+            penaltyTransaction = self._newPenalty(self.getNextTransactionNum() + 1)
+        self._postTransfer(amount, otherAccount, penaltyTransaction)
+        if penaltyTransaction is not None:
+            self._chargeOverdraft(penaltyTransaction)
         return True
 
     # Calculates the interest payment for a savings account, adds a new interest transaction
-    # to the account, and updates the account balance
+    # to the account, and updates the account balance and overdrawn counter
+    # The interest transaction is the only record of the credit
     #
     #  @require balance > 0
     #
     #  @return if the interest was added or not    
     # Hunter 
     def calcInterest(self):
-        assert(self.getBalance() > 0)
-        interestAmount = self.getBalance() * BankAccount._intRates['savings']
-        transaction = Transaction("interest", self.getNextTransactionNum(), interestAmount)
-        # add interest to list of transactions
-        self._accountTransactions.append(transaction)
-        self._writeTransaction(transaction)
-        self.deposit(interestAmount)
+        assert(self._cents > 0)
+        self._postInterest(interestCents(self._cents, BankAccount._intRates['savings']))
         return True
     
+    # Accessor/getter for the overdraft count saved in checkpoints
+    #
+    #  @return: The number of times the account has been overdrawn (int)
+    def _getCheckpointCount(self):
+        return self.getOverdrawnCount()
+
+    # Mutator/setter for the overdraft count restored from a checkpoint
+    #
+    #  @param count: The overdraft count saved in the checkpoint (int)
+    def _setCheckpointCount(self, count):
+        self._setOverdrawnCount(count)
+
+    # Applies the balance and overdraft changes of a logged record during recovery
+    #
+    #  @param tType: The type of the record (String)
+    #  @param cents: The amount of the record in cents (int)
+    #  @param flags: The flags of the record (int)
+    def _replayRecord(self, tType, cents, flags):
+        if tType == 'penalty':
+            self._applyPenalty(cents)
+        else:
+            super()._replayRecord(tType, cents, flags)
+
     # Prints a String representation of all transactions for a Savings Account object      
     # 
     #  @return the list of transactions in string format
@@ -159,69 +227,6 @@ class SavingsAccount(BankAccount):
         print("Savings Account Transactions:")
         return super().printTransactionList()
 
-    # Method to write all transactions made on a savings account to the savings.txt
-    # file
-    # Data is encrypted first
-    #
-    #  @param transaction: The transaction to be written to the file
-    # Hunter 
-    def _writeTransaction(self, transaction: Transaction):
-        # Set the Debug Flag
-        DEBUG = False
-
-        key = self._key
-        iv = self._iv
-
-        if DEBUG:
-            print("The length of the key is %d bytes" % len(key))
-            print("The length of the Initialization Vector is %d bytes" % len(iv))
-
-        # Open the file to write the data
-        fileName = f"savings-{self._clientNum}-{self._accountNum}.txt"
-        with open(fileName, "wb") as outfile:
-            # Convert transaction to string, then encrypt
-            transaction_str = str(transaction)
-            # Encrypt the transaction data
-            encrypted_data = encrypt_AES_CBC(transaction_str, key, iv)
-            # Write the length of the encrypted data to the file
-            outfile.write(str(len(encrypted_data)).encode())
-            outfile.write(b"\n")
-            # Write the encrypted data to the file
-            outfile.write(encrypted_data)
-            outfile.write(b"\n")
-
-        self._nextTransaction += 1
-
-        if DEBUG:
-            print(f"Transactions written to savings--{self._clientNum}-{self._accountNum}.txt.")
-
-    # Method to read all transactions made on a checking account to the checking.txt
-    # file, data is decrypted first
-    # Hunter
-    def _readTransactions(self):
-        # Set the Debug Flag
-        DEBUG = False
-        key = self._key
-        iv = self._iv 
-
-        # Open the file to read the data
-        fileName = f"savings-{self._clientNum}-{self._accountNum}.txt"
-        with open(fileName, "rb") as infile:
-            length = infile.readline().rstrip().decode()
-
-            while length != "":
-                length = int(length)
-                if DEBUG:
-                    print("Length: ", length)
-                data = infile.read(length)
-                data = decrypt_AES_CBC(data, key, iv)
-                # process the decrypted data: 
-                print("Decrypted transaction:", data)
-                infile.readline()  # Skip the newline
-                length = infile.readline().rstrip().decode()
-
-            return data
-
     # repr method to print the information of a clients checking account: 
     def __repr__(self):
         return (f"Account Number: {self._accountNum}\n"
@@ -0,0 +1,191 @@
+"""
+This module defines the SessionStore class.
+@author: Hunter Peacock, Boden Kahn, and Anna Pitt
+@date: December 18, 2024
+
+A class to represent the sessions issued to Clients after a successful password check.
+A token names a session and carries the Client number and expiry time, signed with
+HMAC-SHA256 under a server key, so checking it takes one HMAC and a dictionary lookup
+instead of a full password hash. The store remembers each live session, which lets
+sessions be revoked before they expire. It holds a bounded number of sessions: expired
+sessions are evicted first, and then the oldest.
+"""
+
+# Import statements
+import os
+import hmac
+import time
+import base64
+import hashlib
+import struct
+import threading
+from collections import OrderedDict
+
+class SessionStore:
+    # The Client number, session id and expiry time signed by a token
+    _PAYLOAD = struct.Struct("<Q16sQ")
+
+    # Constructs a SessionStore object.
+    #
+    #  @param serverKey: The key tokens are signed with (bytes; default is None, a random key)
+    #  @param ttl: The number of seconds a session lasts (int or float; default is 900)
+    #  @param maxSessions: The largest number of sessions held at once (int; default is 10,000)
+    #  @param clock: Returns the current time in seconds (function; default is time.time)
+    #
+    #  @require: serverKey is None or at least 16 bytes, ttl > 0 and maxSessions is an int >= 1
+    #
+    #  @ensure SessionStore object successfully created
+    def __init__(self, serverKey = None, ttl = 900, maxSessions = 10_000, clock = time.time):
+        # Assert statements for preconditions
+        assert serverKey is None or (isinstance(serverKey, bytes) and len(serverKey) >= 16), \
+            "The server key must be at least 16 bytes."
+        assert isinstance(ttl, (int, float)) and ttl > 0, "The time to live must be a positive number."
+        assert isinstance(maxSessions, int) and maxSessions >= 1, "The maximum number of sessions must be an integer >= 1."
+
+        self._serverKey = os.urandom(32) if serverKey is None else serverKey
+        self._ttl = ttl
+        self._maxSessions = maxSessions
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._sessions = OrderedDict()  # The Client number and expiry of each session, oldest first
+        self._clientSessions = {}  # The ids of the sessions of each Client
+
+    # Returns the number of sessions held
+    #
+    #  @return: The number of sessions, including expired ones not yet evicted (int)
+    def __len__(self):
+        return len(self._sessions)
+
+    # Starts a session for a Client
+    #
+    #  @param clientNumber: The number of the Client (int)
+    #
+    #  @require: clientNumber is an int >= 0
+    #
+    #  @return: The signed token of the session (String)
+    def issue(self, clientNumber):
+        assert isinstance(clientNumber, int) and clientNumber >= 0, "The client number must be an integer >= 0."
+        sessionId = os.urandom(16)
+        expiry = int(self._clock() + self._ttl)
+        payload = SessionStore._PAYLOAD.pack(clientNumber, sessionId, expiry)
+        with self._lock:
+            self._evict()
+            self._sessions[sessionId] = (clientNumber, expiry)
+            self._clientSessions.setdefault(clientNumber, set()).add(sessionId)
+        return _encode(payload) + "." + _encode(self._sign(payload))
+
+    # Checks that a token names a live session of a Client
+    #
+    #  @param token: The token to check (String)
+    #  @param clientNumber: The number of the Client presenting it (int)
+    #
+    #  @return: True if the token is authentic, unexpired, not revoked and issued to the Client, False if not (bool)
+    def validate(self, token, clientNumber):
+        payload = self._readToken(token)
+        if payload is None:
+            return False
+        tokenClient, sessionId, expiry = SessionStore._PAYLOAD.unpack(payload)
+        if tokenClient != clientNumber or self._clock() >= expiry:
+            return False
+        with self._lock:
+            return self._sessions.get(sessionId) == (clientNumber, expiry)
+
+    # Ends the session named by a token
+    #
+    #  @param token: The token of the session (String)
+    #
+    #  @return: True if a session was ended, False if the token named none (bool)
+    def revoke(self, token):
+        payload = self._readToken(token)
+        if payload is None:
+            return False
+        clientNumber, sessionId, expiry = SessionStore._PAYLOAD.unpack(payload)
+        with self._lock:
+            if sessionId not in self._sessions:
+                return False
+            self._remove(sessionId)
+            return True
+
+    # Ends every session of a Client
+    #
+    #  @param clientNumber: The number of the Client (int)
+    #
+    #  @return: The number of sessions ended (int)
+    def revokeClient(self, clientNumber):
+        with self._lock:
+            sessionIds = self._clientSessions.pop(clientNumber, set())
+            for sessionId in sessionIds:
+                del self._sessions[sessionId]
+            return len(sessionIds)
+
+    # Removes every expired session
+    #
+    #  @return: The number of sessions removed (int)
+    def purgeExpired(self):
+        with self._lock:
+            now = self._clock()
+            expired = [sessionId for sessionId, (clientNumber, expiry) in self._sessions.items() if now >= expiry]
+            for sessionId in expired:
+                self._remove(sessionId)
+            return len(expired)
+
+    # A private helper method that signs a token payload
+    #
+    #  @param payload: The packed payload (bytes)
+    #
+    #  @return: The HMAC-SHA256 of the payload (bytes)
+    def _sign(self, payload):
+        return hmac.new(self._serverKey, payload, hashlib.sha256).digest()
+
+    # A private helper method that checks the signature of a token
+    #
+    #  @param token: The token to read
+    #
+    #  @return: The signed payload, or None if the token is malformed or forged (bytes)
+    def _readToken(self, token):
+        if not isinstance(token, str) or token.count(".") != 1:
+            return None
+        try:
+            payload, signature = (_decode(part) for part in token.split("."))
+        except ValueError:
+            return None
+        if len(payload) != SessionStore._PAYLOAD.size or not hmac.compare_digest(signature, self._sign(payload)):
+            return None
+        return payload
+
+    # A private helper method that makes room for a new session, evicting expired sessions
+    # and then the oldest. Called with the lock held
+    def _evict(self):
+        if len(self._sessions) < self._maxSessions:
+            return
+        now = self._clock()
+        for sessionId in [sessionId for sessionId, (clientNumber, expiry) in self._sessions.items() if now >= expiry]:
+            self._remove(sessionId)
+        while len(self._sessions) >= self._maxSessions:
+            self._remove(next(iter(self._sessions)))
+
+    # A private helper method that forgets a session. Called with the lock held
+    #
+    #  @param sessionId: The id of the session (bytes)
+    def _remove(self, sessionId):
+        clientNumber, expiry = self._sessions.pop(sessionId)
+        sessionIds = self._clientSessions[clientNumber]
+        sessionIds.discard(sessionId)
+        if not sessionIds:
+            del self._clientSessions[clientNumber]
+
+# A private helper function that encodes bytes for a token
+#
+#  @param data: The bytes to encode (bytes)
+#
+#  @return: The unpadded URL-safe base 64 encoding (String)
+def _encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+# A private helper function that decodes a part of a token
+#
+#  @param text: The encoded part (String)
+#
+#  @return: The decoded bytes (bytes)
+def _decode(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
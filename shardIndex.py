@@ -0,0 +1,267 @@
+"""
+This module defines the ShardIndex and AccountIndex classes.
+@author: Hunter Peacock, Boden Kahn, and Anna Pitt
+@date: December 19, 2024
+
+A class to represent the one index file kept for every account of a shard of a
+StorageLayout, so the number of open files and inodes grows with the shards instead of
+the accounts. The file starts with a magic value and version, followed by frames that
+each name the account key they belong to:
+    kind (1 byte), key length (2 bytes), key, then
+    an index entry (kind 1): transaction number, day number, byte offset and framed size
+    a base offset (kind 2), which starts the account's entries again from that offset
+    a checkpoint offset (kind 3), the offset of the account's newest checkpoint
+Frames are only ever appended. The whole file is read once when it is opened, and each
+account's entries are then kept in memory and looked up through an AccountIndex with
+the same interface as a LogIndex. A frame torn by a crash is cut off when the file is
+opened.
+"""
+
+# Import statements
+import os
+import struct
+import threading
+from logIndex import RecordIndex, LogIndex
+
+class ShardIndex:
+    # The header written at the start of every shard index file (magic value and format version)
+    _HEADER = struct.Struct("<4sB")
+    _MAGIC = b"TXSI"
+    _VERSION = 1
+    # The header of each frame (kind and key length)
+    _FRAME = struct.Struct("<BH")
+    # The kinds of frames and the layout of their contents
+    _ENTRY_KIND = 1
+    _BASE_KIND = 2
+    _CHECKPOINT_KIND = 3
+    _OFFSET = struct.Struct("<Q")
+
+    # Constructs a ShardIndex object.
+    #
+    #  @param fileName: The name of the shard index file (String)
+    #
+    #  @require: fileName is a non-empty String
+    #
+    #  @ensure ShardIndex object successfully created, every frame read and the file open for appending
+    def __init__(self, fileName):
+        assert isinstance(fileName, str) and len(fileName) > 0, "The file name must be a non-empty String."
+
+        self._fileName = fileName
+        self._lock = threading.RLock()
+        self._pending = []  # Packed frames that have not been written yet
+        self._accounts = {}  # The [base offset, checkpoint offset, entries] of each account, by key
+        end = self._load()
+        if end is None:
+            # A missing file, or a file without the header, is started again
+            self._file = open(fileName, "w+b")
+            self._file.write(ShardIndex._HEADER.pack(ShardIndex._MAGIC, ShardIndex._VERSION))
+        else:
+            self._file = open(fileName, "r+b")
+            self._file.truncate(end)
+        self._file.seek(0, os.SEEK_END)
+        self._file.flush()
+
+    # Accessor/getter to retrieve the name of the index file
+    #
+    #  @return: The name of the shard index file (String)
+    def getFileName(self):
+        return self._fileName
+
+    # Returns the index of one account of the shard
+    #
+    #  @param key: The key the account's records are framed with (String)
+    #  @param truncate: Whether the account's entries should be emptied (bool; default is False)
+    #  @param baseOffset: The log offset the entries of a new or emptied account start at (int; default is 0)
+    #
+    #  @require: key is a non-empty String
+    #  @require: baseOffset is an int >= 0
+    #
+    #  @return: The index of the account's records (AccountIndex)
+    def getAccountIndex(self, key, truncate = False, baseOffset = 0):
+        assert isinstance(key, str) and len(key) > 0, "The key must be a non-empty String."
+        assert isinstance(baseOffset, int) and baseOffset >= 0, "The base offset must be an integer >= 0."
+        with self._lock:
+            if truncate or key not in self._accounts:
+                self._reset(key, baseOffset, None)
+            return AccountIndex(self, key, self._accounts[key])
+
+    # Returns the checkpoint offset recorded for each account that has one
+    #
+    #  @return: The offset of each account's newest checkpoint, by key (dict)
+    def getCheckpointOffsets(self):
+        with self._lock:
+            return {key: state[1] for key, state in self._accounts.items() if state[1] is not None}
+
+    # Mutator/setter to record the offset of an account's newest checkpoint
+    #
+    #  @param key: The key of the account (String)
+    #  @param offset: The checkpoint log offset, or None if no checkpoint is known (int)
+    def setCheckpointOffset(self, key, offset):
+        with self._lock:
+            self._accounts.setdefault(key, [0, None, []])[1] = offset
+            packed = ShardIndex._OFFSET.pack(LogIndex._NO_CHECKPOINT if offset is None else offset)
+            self._append(ShardIndex._CHECKPOINT_KIND, key, packed)
+
+    # Writes the buffered frames to the index file
+    def flush(self):
+        with self._lock:
+            if self._file is None:
+                return
+            if self._pending:
+                self._file.write(b"".join(self._pending))
+                self._pending = []
+            self._file.flush()
+
+    # Flushes and closes the index file
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self.flush()
+                self._file.close()
+                self._file = None
+
+    # A private helper method that starts an account's entries again from a base offset
+    #
+    #  @param key: The key of the account (String)
+    #  @param baseOffset: The log offset the entries start at (int)
+    #  @param checkpointOffset: The checkpoint offset kept for the account (int or None)
+    def _reset(self, key, baseOffset, checkpointOffset):
+        with self._lock:
+            self._accounts[key] = [baseOffset, checkpointOffset, []]
+            self._append(ShardIndex._BASE_KIND, key, ShardIndex._OFFSET.pack(baseOffset))
+            if checkpointOffset is not None:
+                self._append(ShardIndex._CHECKPOINT_KIND, key, ShardIndex._OFFSET.pack(checkpointOffset))
+
+    # A private helper method that buffers one frame
+    #
+    #  @param kind: The kind of the frame (int)
+    #  @param key: The key of the account the frame belongs to (String)
+    #  @param payload: The packed contents of the frame (bytes)
+    def _append(self, kind, key, payload):
+        key = key.encode()
+        with self._lock:
+            self._pending.append(ShardIndex._FRAME.pack(kind, len(key)) + key + payload)
+
+    # A private helper method that reads every frame of the file into memory
+    #
+    #  @return: The offset just past the last whole frame, or None if the file is missing or
+    #           has no valid header (int)
+    def _load(self):
+        if not os.path.exists(self._fileName):
+            return None
+        with open(self._fileName, "rb") as infile:
+            data = infile.read()
+        if data[:ShardIndex._HEADER.size] != ShardIndex._HEADER.pack(ShardIndex._MAGIC, ShardIndex._VERSION):
+            return None
+        sizes = {ShardIndex._ENTRY_KIND: LogIndex._ENTRY.size, ShardIndex._BASE_KIND: ShardIndex._OFFSET.size,
+                 ShardIndex._CHECKPOINT_KIND: ShardIndex._OFFSET.size}
+        position = ShardIndex._HEADER.size
+        while position + ShardIndex._FRAME.size <= len(data):
+            kind, keyLength = ShardIndex._FRAME.unpack_from(data, position)
+            start = position + ShardIndex._FRAME.size + keyLength
+            if kind not in sizes or start + sizes[kind] > len(data):
+                # A frame torn by a crash
+                break
+            key = data[position + ShardIndex._FRAME.size:start].decode()
+            if kind == ShardIndex._ENTRY_KIND:
+                self._accounts.setdefault(key, [0, None, []])[2].append(LogIndex._ENTRY.unpack_from(data, start))
+            elif kind == ShardIndex._BASE_KIND:
+                self._accounts[key] = [ShardIndex._OFFSET.unpack_from(data, start)[0], None, []]
+            else:
+                offset = ShardIndex._OFFSET.unpack_from(data, start)[0]
+                self._accounts.setdefault(key, [0, None, []])[1] = None if offset == LogIndex._NO_CHECKPOINT else offset
+            position = start + sizes[kind]
+        return position
+
+class AccountIndex(RecordIndex):
+
+    # Constructs an AccountIndex object. Accounts get their index from ShardIndex.getAccountIndex
+    #
+    #  @param shard: The shard index the entries are kept in (ShardIndex)
+    #  @param key: The key of the account (String)
+    #  @param state: The [base offset, checkpoint offset, entries] of the account, shared with the shard (list)
+    #
+    #  @ensure AccountIndex object successfully created
+    def __init__(self, shard, key, state):
+        self._shard = shard
+        self._key = key
+        self._state = state
+        self._missing = False  # Set when a record was appended without its index fields
+
+    # Accessor/getter to retrieve the name of the index file
+    #
+    #  @return: The name of the shard index file (String)
+    def getFileName(self):
+        return self._shard.getFileName()
+
+    # The offsets are read from the state shared with the shard, as a rebuild replaces it
+    @property
+    def _baseOffset(self):
+        return self._state[0]
+
+    @property
+    def _checkpointOffset(self):
+        return self._state[1]
+
+    # Mutator/setter to record the offset of the account's newest checkpoint
+    #
+    #  @param offset: The checkpoint log offset, or None if no checkpoint is known (int)
+    def setCheckpointOffset(self, offset):
+        self._shard.setCheckpointOffset(self._key, offset)
+
+    # Adds an entry for a record appended to the log. A record appended without its
+    # transaction number or day marks the index as needing a rebuild
+    #
+    #  @param tNumber: The transaction number of the record (int)
+    #  @param day: The day number of the record (int)
+    #  @param offset: The byte offset of the framed record in the log (int)
+    #  @param size: The number of bytes the framed record takes in the log (int)
+    def add(self, tNumber, day, offset, size):
+        if tNumber is None or day is None:
+            self._missing = True
+            return
+        entry = (tNumber, day, offset, size)
+        self._state[2].append(entry)
+        self._shard._append(ShardIndex._ENTRY_KIND, self._key, LogIndex._ENTRY.pack(*entry))
+
+    # Writes the buffered entries of the whole shard to the index file
+    def flush(self):
+        self._shard.flush()
+
+    # Flushes the entries; the shard index stays open for the other accounts of the shard
+    def close(self):
+        self.flush()
+
+    # Returns the number of entries in the index
+    #
+    #  @return: The number of indexed records (int)
+    def __len__(self):
+        return len(self._state[2])
+
+    # Returns one entry of the index
+    #
+    #  @param position: The position of the record in the log (int)
+    #
+    #  @return: The transaction number, day number, offset and framed size of the record (tuple)
+    def getEntry(self, position):
+        return self._state[2][position]
+
+    # Determines whether the entries of the index can be trusted. A valid index may still
+    # be missing records appended after its last entry; they start at getEndOffset()
+    #
+    #  @return: True if the index is usable, False if it must be rebuilt
+    def isValid(self):
+        return not self._missing
+
+    # Replaces the account's entries with entries found by scanning the log. The base and
+    # checkpoint offsets are kept
+    #
+    #  @param entries: The (transaction number, day number, offset, framed size) of every record, in log order
+    def rebuild(self, entries):
+        self._missing = False
+        baseOffset, checkpointOffset, oldEntries = self._state
+        self._shard._reset(self._key, baseOffset, checkpointOffset)
+        self._state = self._shard._accounts[self._key]
+        for entry in entries:
+            self.add(*entry)
+        self.flush()
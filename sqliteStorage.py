@@ -0,0 +1,211 @@
+"""
+This module defines the SQLiteStore class.
+@author: Hunter Peacock, Boden Kahn, and Anna Pitt
+@date: December 11, 2024
+
+A class to represent a TransactionStore kept in an SQLite database.
+The database runs in WAL mode so readers do not block the writer. Every statement is a
+fixed SQL String with bound parameters, so SQLite compiles it once and reuses the
+prepared statement; records are buffered and inserted in batches with executemany,
+one transaction per batch. Records are looked up through the primary key on
+(client, type, account, transaction number) and an index on (client, type, account, day).
+Every statement runs on a connection checked out of a ConnectionPool, so worker threads
+read in parallel while writes are serialized by the store.
+"""
+
+# Import statements
+import sqlite3
+import threading
+from storage import TransactionStore
+from connectionPool import ConnectionPool
+
+class SQLiteStore(TransactionStore):
+    # The number of rows fetched by each query while streaming records
+    _PAGE = 1024
+    # The statements that create the schema
+    _SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS accounts (client INTEGER NOT NULL, type TEXT NOT NULL, "
+        "account INTEGER NOT NULL, balance_cents INTEGER NOT NULL, next_transaction INTEGER NOT NULL, "
+        "overdrawn_count INTEGER NOT NULL, PRIMARY KEY (client, type, account)) WITHOUT ROWID",
+        "CREATE TABLE IF NOT EXISTS transactions (client INTEGER NOT NULL, type TEXT NOT NULL, "
+        "account INTEGER NOT NULL, tnumber INTEGER NOT NULL, day INTEGER NOT NULL, data BLOB NOT NULL, "
+        "PRIMARY KEY (client, type, account, tnumber)) WITHOUT ROWID",
+        "CREATE INDEX IF NOT EXISTS transactions_by_day ON transactions (client, type, account, day)",
+    )
+    _INSERT = "INSERT OR REPLACE INTO transactions VALUES (?, ?, ?, ?, ?, ?)"
+    _SELECT_RANGE = ("SELECT tnumber, data FROM transactions WHERE client = ? AND type = ? AND account = ? "
+                     "ORDER BY tnumber LIMIT ? OFFSET ?")
+    _SELECT_AFTER = ("SELECT tnumber, data FROM transactions WHERE client = ? AND type = ? AND account = ? "
+                     "AND tnumber > ? ORDER BY tnumber LIMIT ?")
+    _SELECT_ONE = "SELECT data FROM transactions WHERE client = ? AND type = ? AND account = ? AND tnumber = ?"
+    _COUNT_BEFORE = "SELECT COUNT(*) FROM transactions WHERE client = ? AND type = ? AND account = ? AND day < ?"
+    _SAVE_STATE = "INSERT OR REPLACE INTO accounts VALUES (?, ?, ?, ?, ?, ?)"
+    _LOAD_STATE = ("SELECT balance_cents, next_transaction, overdrawn_count FROM accounts "
+                   "WHERE client = ? AND type = ? AND account = ?")
+    _DELETE_RECORDS = "DELETE FROM transactions WHERE client = ? AND type = ? AND account = ?"
+    _DELETE_STATE = "DELETE FROM accounts WHERE client = ? AND type = ? AND account = ?"
+
+    # Constructs a SQLiteStore object.
+    #
+    #  @param fileName: The name of the database file (String)
+    #  @param batchSize: The number of records buffered before they are inserted together (int; default is 256)
+    #  @param poolSize: The maximum number of open connections (int; default is 8)
+    #  @param idleTimeout: The number of seconds an idle connection is kept open (number; default is 60)
+    #
+    #  @require: fileName is a non-empty String
+    #  @require: batchSize is an int >= 1
+    #
+    #  @ensure SQLiteStore object successfully created and the schema exists
+    def __init__(self, fileName, batchSize = 256, poolSize = 8, idleTimeout = 60):
+        # Assert statements for preconditions
+        assert isinstance(fileName, str) and len(fileName) > 0, "The file name must be a non-empty String."
+        assert isinstance(batchSize, int) and batchSize >= 1, "The batch size must be an integer >= 1."
+
+        self._fileName = fileName
+        self._batchSize = batchSize
+        self._pending = []  # Parameter rows of records not inserted yet
+        self._lock = threading.RLock()  # Serializes the writes
+        self._closed = False
+        self._pool = ConnectionPool(self._connect, poolSize, idleTimeout)
+        with self._pool.connection() as connection:
+            connection.execute("PRAGMA journal_mode = WAL")
+            for statement in SQLiteStore._SCHEMA:
+                connection.execute(statement)
+
+    # A private helper method that opens a connection for the pool
+    # Transactions are managed explicitly, one per batch, and a connection may be used
+    # by any thread that checks it out
+    #
+    #  @return: The new connection (sqlite3.Connection)
+    def _connect(self):
+        connection = sqlite3.connect(self._fileName, isolation_level = None, check_same_thread = False)
+        connection.execute("PRAGMA synchronous = NORMAL")
+        return connection
+
+    # Accessor/getter to retrieve the name of the database file
+    #
+    #  @return: The name of the database file (String)
+    def getFileName(self):
+        return self._fileName
+
+    # Accessor/getter to retrieve the connection pool of the store
+    #
+    #  @return: The pool every statement runs through (ConnectionPool)
+    def getPool(self):
+        return self._pool
+
+    # Accessor/getter to retrieve the number of records waiting to be inserted
+    #
+    #  @return: The number of buffered records (int)
+    def getPendingCount(self):
+        return len(self._pending)
+
+    def appendRecord(self, account, tNumber, day, data):
+        with self._lock:
+            self._pending.append(account + (tNumber, day, data))
+            if len(self._pending) >= self._batchSize:
+                self.flush()
+
+    # Buffers every record and inserts the whole buffer with one executemany call
+    def appendRecords(self, records):
+        with self._lock:
+            self._pending.extend(account + (tNumber, day, data) for account, tNumber, day, data in records)
+            self.flush()
+
+    # Streams records a page at a time; after the first page, each page continues after
+    # the last transaction number seen instead of skipping rows with OFFSET
+    def iterRecords(self, account, start = 0, stop = None):
+        remaining = None if stop is None else stop - start
+        page = self._query(SQLiteStore._SELECT_RANGE, account + (self._pageSize(remaining), start))
+        while page:
+            for tNumber, data in page:
+                yield data
+            if remaining is not None:
+                remaining -= len(page)
+            if len(page) < SQLiteStore._PAGE or remaining == 0:
+                return
+            page = self._query(SQLiteStore._SELECT_AFTER, account + (page[-1][0], self._pageSize(remaining)))
+
+    def iterRecordsFrom(self, account, tNumber):
+        page = self._query(SQLiteStore._SELECT_AFTER, account + (tNumber - 1, SQLiteStore._PAGE))
+        while page:
+            yield from page
+            if len(page) < SQLiteStore._PAGE:
+                return
+            page = self._query(SQLiteStore._SELECT_AFTER, account + (page[-1][0], SQLiteStore._PAGE))
+
+    # A private helper method that sizes the next page of a stream
+    #
+    #  @param remaining: The number of records still to return (int or None for no limit)
+    #
+    #  @return: The number of rows to fetch (int)
+    def _pageSize(self, remaining):
+        return SQLiteStore._PAGE if remaining is None else min(remaining, SQLiteStore._PAGE)
+
+    def getRecord(self, account, tNumber):
+        rows = self._query(SQLiteStore._SELECT_ONE, account + (tNumber,))
+        return rows[0][0] if rows else None
+
+    def findDay(self, account, day):
+        return self._query(SQLiteStore._COUNT_BEFORE, account + (day,))[0][0]
+
+    def saveState(self, account, state):
+        with self._lock:
+            self.flush()
+            with self._pool.connection() as connection:
+                connection.execute(SQLiteStore._SAVE_STATE, account + tuple(state))
+
+    def loadState(self, account):
+        rows = self._query(SQLiteStore._LOAD_STATE, account)
+        return tuple(rows[0]) if rows else None
+
+    def resetAccount(self, account):
+        with self._lock:
+            self._pending = [row for row in self._pending if row[:3] != account]
+            self.flush()
+            self._transaction(((SQLiteStore._DELETE_RECORDS, [account]), (SQLiteStore._DELETE_STATE, [account])))
+
+    # Inserts every buffered record in one transaction
+    def flush(self):
+        with self._lock:
+            if not self._pending:
+                return
+            self._transaction(((SQLiteStore._INSERT, self._pending),))
+            self._pending = []
+
+    # A private helper method that runs statements in one transaction on a pooled connection
+    #
+    #  @param statements: The (SQL statement, rows of parameters) pairs to run (tuple)
+    def _transaction(self, statements):
+        with self._pool.connection() as connection:
+            connection.execute("BEGIN")
+            try:
+                for statement, rows in statements:
+                    connection.executemany(statement, rows)
+                connection.execute("COMMIT")
+            except sqlite3.Error:
+                connection.execute("ROLLBACK")
+                raise
+
+    # Flushes the buffered records and closes every pooled connection
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self.flush()
+            self._pool.close()
+            self._closed = True
+
+    # A private helper method that runs a query after writing out buffered records, so
+    # an account always reads its own writes. Queries from different threads run in
+    # parallel on their own connections
+    #
+    #  @param statement: The SQL statement (String)
+    #  @param parameters: The values bound to the statement (tuple)
+    #
+    #  @return: The rows returned by the query (list)
+    def _query(self, statement, parameters):
+        if self._pending:
+            self.flush()
+        with self._pool.connection() as connection:
+            return connection.execute(statement, parameters).fetchall()
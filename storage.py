@@ -0,0 +1,163 @@
+"""
+This module defines the TransactionStore interface.
+@author: Hunter Peacock, Boden Kahn, and Anna Pitt
+@date: December 11, 2024
+
+An abstract class to represent a backend that persists the encrypted transaction
+records and the saved state of accounts: the log files of fileStore.FileStore, or a
+database such as sqliteStorage.SQLiteStore.
+Accounts are identified by a key of (Client number, account type, account number).
+Records are encrypted by the account, so a store only ever holds encrypted blobs
+together with the transaction number and day used to look them up. The account's
+cipher is passed to the methods that return decrypted records, so a store that keeps
+some records in another form, such as compressed archives, can serve them directly.
+"""
+
+# Import statements
+from abc import ABC, abstractmethod
+
+class TransactionStore(ABC):
+
+    @abstractmethod
+    # Adds an encrypted transaction record of an account. A store may buffer records
+    # until it is flushed
+    #
+    #  @param account: The key of the account (tuple)
+    #  @param tNumber: The transaction number of the record (int)
+    #  @param day: The day number of the record (int)
+    #  @param data: The encrypted record (bytes)
+    def appendRecord(self, account, tNumber, day, data):
+        pass
+
+    # Adds many encrypted transaction records, of one or more accounts, at once. A store
+    # may buffer the batch until it is flushed
+    # Stores that can write a batch together should override this
+    #
+    #  @param records: The account key, transaction number, day number and encrypted record of
+    #                  each record (iterable of tuples)
+    def appendRecords(self, records):
+        for account, tNumber, day, data in records:
+            self.appendRecord(account, tNumber, day, data)
+
+    @abstractmethod
+    # Streams the encrypted records of an account in transaction number order
+    #
+    #  @param account: The key of the account (tuple)
+    #  @param start: The position of the first record to return (int; default is 0)
+    #  @param stop: The position to stop before (int; default is None, the last record)
+    #
+    #  @return: A generator of the encrypted records (bytes)
+    def iterRecords(self, account, start = 0, stop = None):
+        pass
+
+    @abstractmethod
+    # Streams the (transaction number, encrypted record) pairs of an account from a
+    # transaction number on
+    #
+    #  @param account: The key of the account (tuple)
+    #  @param tNumber: The first transaction number to return (int)
+    #
+    #  @return: A generator of the transaction numbers and encrypted records (tuple)
+    def iterRecordsFrom(self, account, tNumber):
+        pass
+
+    @abstractmethod
+    # Finds one encrypted record of an account by transaction number
+    #
+    #  @param account: The key of the account (tuple)
+    #  @param tNumber: The transaction number to find (int)
+    #
+    #  @return: The encrypted record, or None if there is none (bytes)
+    def getRecord(self, account, tNumber):
+        pass
+
+    @abstractmethod
+    # Finds the position of the first record of an account made on or after a day
+    #
+    #  @param account: The key of the account (tuple)
+    #  @param day: The day number to find (int)
+    #
+    #  @return: The position of the record (int; the number of records if there is none)
+    def findDay(self, account, day):
+        pass
+
+    @abstractmethod
+    # Saves the balance, next transaction number and overdraft count of an account
+    #
+    #  @param account: The key of the account (tuple)
+    #  @param state: The balance in cents, next transaction number and overdraft count (tuple)
+    def saveState(self, account, state):
+        pass
+
+    @abstractmethod
+    # Loads the state last saved for an account
+    #
+    #  @param account: The key of the account (tuple)
+    #
+    #  @return: The balance in cents, next transaction number and overdraft count, or None if there is none (tuple)
+    def loadState(self, account):
+        pass
+
+    @abstractmethod
+    # Removes every record and the saved state of an account
+    #
+    #  @param account: The key of the account (tuple)
+    def resetAccount(self, account):
+        pass
+
+    # Streams the decrypted records of an account in transaction number order
+    #
+    #  @param account: The key of the account (tuple)
+    #  @param cipher: The cipher the account's records are encrypted with (AESCipher)
+    #  @param start: The position of the first record to return (int; default is 0)
+    #  @param stop: The position to stop before (int; default is None, the last record)
+    #  @param mapped: Whether a store that reads files may map them into memory (bool; default is True)
+    #
+    #  @return: A generator of the decrypted records (bytes)
+    def iterData(self, account, cipher, start = 0, stop = None, mapped = True):
+        return decryptRecords(cipher, self.iterRecords(account, start, stop))
+
+    # Streams the decrypted records of an account from a transaction number on
+    #
+    #  @param account: The key of the account (tuple)
+    #  @param cipher: The cipher the account's records are encrypted with (AESCipher)
+    #  @param tNumber: The first transaction number to return (int)
+    #
+    #  @return: A generator of the decrypted records (bytes)
+    def iterDataFrom(self, account, cipher, tNumber):
+        return (cipher.decrypt(record) for recordNumber, record in self.iterRecordsFrom(account, tNumber))
+
+    # Finds one decrypted record of an account by transaction number
+    #
+    #  @param account: The key of the account (tuple)
+    #  @param cipher: The cipher the account's records are encrypted with (AESCipher)
+    #  @param tNumber: The transaction number to find (int)
+    #
+    #  @return: The decrypted record, or None if there is none (bytes)
+    def getData(self, account, cipher, tNumber):
+        record = self.getRecord(account, tNumber)
+        return None if record is None else cipher.decrypt(record)
+
+    # Writes out any buffered records
+    def flush(self):
+        pass
+
+    # Writes out any buffered records and forces them to stable storage
+    # Stores that do not control when their writes are durable only flush
+    def sync(self):
+        self.flush()
+
+    # Flushes the store and releases its resources
+    def close(self):
+        self.flush()
+
+# Decrypts a stream of records one at a time with the cached cipher, so records past
+# the ones a caller takes are never decrypted
+#
+#  @param cipher: The cipher the records are encrypted with (AESCipher)
+#  @param records: The encrypted records (iterable)
+#
+#  @return: A generator of the decrypted records (bytes)
+def decryptRecords(cipher, records):
+    for record in records:
+        yield cipher.decrypt(record)
@@ -0,0 +1,342 @@
+"""
+This module defines the StorageLayout class.
+@author: Hunter Peacock, Boden Kahn, and Anna Pitt
+@date: December 11, 2024
+
+A class to represent where account logs are kept under a data root directory.
+Instead of one log file per account in the working directory, every account of a
+Client, or of a shard of consecutive Client numbers, appends to one shared log. Each
+record in a shared log is framed with the key of the account it belongs to, so one
+account's records are read back by skipping over the frames of the others. A shard's
+transaction log may be rotated into segments. A sealed segment holds the records of
+every account of the shard, so its archive holds one frame per account, keyed like the
+log: the account's records decrypted, compressed and encrypted again as one block with
+the cipher of that account. The records of an account that has not been opened since
+the layout was, and whose cipher is therefore unknown, are packed still encrypted.
+The shared checkpoint log is pruned once each account has newer checkpoints than the
+ones it drops. Shards are grouped a thousand to a parent directory so no directory
+grows too large:
+    <data root>/<shard // 1000>/<shard>/transactions.log
+    <data root>/<shard // 1000>/<shard>/checkpoints.log
+    <data root>/<shard // 1000>/<shard>/index.idx
+The index file is shared the same way: it holds the entries of every account of the
+shard, keyed by account key, so a shard keeps the same few files open however many
+accounts it holds.
+"""
+
+# Import statements
+import os
+import threading
+from collections import deque
+from cryptography.exceptions import InvalidTag
+from transactionLog import TransactionLog, readFrames, readKeyedFrames, getArchivePath
+from transactionRecord import packSegment, unpackSegment, SEGMENT_CODECS
+from shardIndex import ShardIndex
+
+class StorageLayout:
+    # The number of checkpoints saved to a shard's checkpoint log before it may be pruned,
+    # and the number of newest checkpoints of each account a pruning keeps
+    _PRUNE_EVERY = 64
+    _KEEP_CHECKPOINTS = 2
+    # The kinds of block an archive frame holds: the account's records compressed and
+    # encrypted together, or its records compressed as they are, still encrypted one by one
+    SEALED_BLOCK = b"e"
+    PACKED_BLOCK = b"r"
+
+    # Constructs a StorageLayout object.
+    #
+    #  @param dataRoot: The directory that holds every shard (String)
+    #  @param shardSize: The number of consecutive Client numbers sharing one log (int; default is 1, a log per Client)
+    #  @param flushEvery: The number of records a shared log buffers before writing them out (int; default is 1)
+    #  @param flushInterval: The maximum number of milliseconds a record may stay buffered (int; default is 0, no limit)
+    #  @param segmentSize: The number of bytes the active file of a shard's transaction log may reach before
+    #                      it is sealed (int; default is None, no rotation)
+    #  @param codec: The compression used for sealed segments, 'zlib' or 'lzma' (String; default is 'zlib')
+    #
+    #  @require: dataRoot is a non-empty String
+    #  @require: shardSize is an int >= 1
+    #  @require: flushEvery is an int >= 1
+    #  @require: flushInterval is a number >= 0
+    #  @require: segmentSize is None or an int >= 1
+    #  @require: codec is 'zlib' or 'lzma'
+    #
+    #  @ensure StorageLayout object successfully created
+    def __init__(self, dataRoot, shardSize = 1, flushEvery = 1, flushInterval = 0, segmentSize = None, codec = 'zlib'):
+        # Assert statements for preconditions
+        assert isinstance(dataRoot, str) and len(dataRoot) > 0, "The data root must be a non-empty String."
+        assert isinstance(shardSize, int) and shardSize >= 1, "The shard size must be an integer >= 1."
+        assert isinstance(flushEvery, int) and flushEvery >= 1, "The flush count must be an integer >= 1."
+        assert isinstance(flushInterval, (int, float)) and flushInterval >= 0, "The flush interval must be >= 0."
+        assert segmentSize is None or (isinstance(segmentSize, int) and segmentSize >= 1), "The segment size must be an integer >= 1."
+        assert codec in SEGMENT_CODECS, "The codec must be 'zlib' or 'lzma'."
+
+        self._dataRoot = dataRoot
+        self._shardSize = shardSize
+        self._flushEvery = flushEvery
+        self._flushInterval = flushInterval
+        self._segmentSize = segmentSize
+        self._codec = codec
+        self._segmentSizes = {}  # The segment sizes set for single shards, by log file name
+        self._codecs = {}  # The codecs set for single shards, by log file name
+        self._logs = {}  # The open shared logs by file name
+        self._indexes = {}  # The open shard indexes by file name
+        self._ciphers = {}  # The cipher of each account opened through the layout, by record key
+        self._checkpointCounts = {}  # The checkpoints saved since the last pruning and the number it kept, by file name
+        self._lock = threading.Lock()
+
+    # Accessor/getter to retrieve the data root
+    #
+    #  @return: The directory that holds every shard (String)
+    def getDataRoot(self):
+        return self._dataRoot
+
+    # Accessor/getter to retrieve the shard size
+    #
+    #  @return: The number of consecutive Client numbers sharing one log (int)
+    def getShardSize(self):
+        return self._shardSize
+
+    # Returns the directory that holds the shared logs of a Client's shard
+    #
+    #  @param clientNum: The Client number (int)
+    #
+    #  @return: The shard directory (String)
+    def getShardDir(self, clientNum):
+        shard = clientNum // self._shardSize
+        return os.path.join(self._dataRoot, f"{shard // 1000:04d}", f"{shard:07d}")
+
+    # Returns the name of the shared transaction log of a Client's shard
+    #
+    #  @param clientNum: The Client number (int)
+    #
+    #  @return: The name of the log file (String)
+    def getLogFileName(self, clientNum):
+        return os.path.join(self.getShardDir(clientNum), "transactions.log")
+
+    # Returns the name of the shared checkpoint log of a Client's shard
+    #
+    #  @param clientNum: The Client number (int)
+    #
+    #  @return: The name of the checkpoint file (String)
+    def getCheckpointFileName(self, clientNum):
+        return os.path.join(self.getShardDir(clientNum), "checkpoints.log")
+
+    # Returns the name of the index file shared by the accounts of a Client's shard
+    #
+    #  @param clientNum: The Client number (int)
+    #
+    #  @return: The name of the index file (String)
+    def getIndexFileName(self, clientNum):
+        return os.path.join(self.getShardDir(clientNum), "index.idx")
+
+    # Returns the segment size of the transaction log of a Client's shard
+    #
+    #  @param clientNum: The Client number (int)
+    #
+    #  @return: The number of bytes the active file may reach (int or None for no rotation)
+    def getSegmentSize(self, clientNum):
+        return self._segmentSizes.get(self.getLogFileName(clientNum), self._segmentSize)
+
+    # Returns the codec the sealed segments of a Client's shard are compressed with
+    #
+    #  @param clientNum: The Client number (int)
+    #
+    #  @return: The codec, 'zlib' or 'lzma' (String)
+    def getCodec(self, clientNum):
+        return self._codecs.get(self.getLogFileName(clientNum), self._codec)
+
+    # Sets the segment policy of the transaction log of a Client's shard, which every account
+    # of the shard shares. A log that is already open is rotated on its next flush
+    #
+    #  @param clientNum: The Client number (int)
+    #  @param segmentSize: The number of bytes the active file may reach (int; default is None, no rotation)
+    #  @param codec: The compression used for sealed segments, 'zlib' or 'lzma' (String; default is 'zlib')
+    #
+    #  @require: segmentSize is None or an int >= 1
+    #  @require: codec is 'zlib' or 'lzma'
+    def setSegmentPolicy(self, clientNum, segmentSize = None, codec = 'zlib'):
+        assert segmentSize is None or (isinstance(segmentSize, int) and segmentSize >= 1), "The segment size must be an integer >= 1."
+        assert codec in SEGMENT_CODECS, "The codec must be 'zlib' or 'lzma'."
+        fileName = self.getLogFileName(clientNum)
+        with self._lock:
+            self._segmentSizes[fileName] = segmentSize
+            self._codecs[fileName] = codec
+            log = self._logs.get(fileName)
+            if log is not None:
+                log.setSegmentSize(segmentSize)
+
+    # Returns a shared log, opening it and creating its directories on first use
+    # The log stays open for every account of the shard until the layout is closed
+    #
+    #  @param fileName: The name of the shared log file (String)
+    #  @param segmented: Whether the log is rotated by the shard's segment size (bool; default is False,
+    #                    as checkpoints are read back by their offset in the file)
+    #
+    #  @return: The open shared log (TransactionLog)
+    def openLog(self, fileName, segmented = False):
+        with self._lock:
+            log = self._logs.get(fileName)
+            if log is None:
+                os.makedirs(os.path.dirname(fileName), exist_ok = True)
+                if segmented:
+                    segmentSize = self._segmentSizes.get(fileName, self._segmentSize)
+                    archiver = lambda sealedFileName, base: self._archiveSegment(fileName, sealedFileName, base)
+                else:
+                    segmentSize, archiver = None, None
+                log = TransactionLog(fileName, self._flushEvery, self._flushInterval, segmentSize = segmentSize,
+                                     archiver = archiver)
+                self._logs[fileName] = log
+            return log
+
+    # Returns a shard index, opening it and creating its directories on first use
+    # The index stays open for every account of the shard until the layout is closed
+    #
+    #  @param fileName: The name of the shard index file (String)
+    #
+    #  @return: The open shard index (ShardIndex)
+    def openIndex(self, fileName):
+        with self._lock:
+            index = self._indexes.get(fileName)
+            if index is None:
+                os.makedirs(os.path.dirname(fileName), exist_ok = True)
+                index = ShardIndex(fileName)
+                self._indexes[fileName] = index
+            return index
+
+    # Records the cipher of an account of a shared log, so the account's records can be
+    # compressed when a segment holding them is archived
+    #
+    #  @param key: The key the account's records are framed with (String)
+    #  @param cipher: The cipher of the account (AESCipher)
+    def addCipher(self, key, cipher):
+        with self._lock:
+            self._ciphers[key] = cipher
+
+    # Appends an encrypted checkpoint of an account to a shared checkpoint log, which must
+    # already be open, and records its offset in the shard index. Once as many checkpoints
+    # have been saved as the last pruning kept, and at least _PRUNE_EVERY of them, the log
+    # is pruned, so the work of pruning is spread over the checkpoints that grew the file
+    #
+    #  @param fileName: The name of the shared checkpoint log (String)
+    #  @param indexFileName: The name of the shard index (String)
+    #  @param key: The key of the account (String)
+    #  @param data: The encrypted checkpoint (bytes)
+    #
+    #  @return: The offset the checkpoint is written at, before any pruning (int)
+    def appendCheckpoint(self, fileName, indexFileName, key, data):
+        with self._lock:
+            offset = self._logs[fileName].append(data, key = key)
+            index = self._indexes[indexFileName]
+            index.setCheckpointOffset(key, offset)
+            counts = self._checkpointCounts.setdefault(fileName, [0, 0])
+            counts[0] += 1
+            if counts[0] >= max(StorageLayout._PRUNE_EVERY, counts[1]):
+                counts[:] = [0, self._pruneCheckpoints(fileName, index)]
+            return offset
+
+    # Flushes and closes every shared log and shard index opened through the layout
+    def close(self):
+        with self._lock:
+            for log in self._logs.values():
+                log.close()
+            self._logs = {}
+            for index in self._indexes.values():
+                index.close()
+            self._indexes = {}
+            self._checkpointCounts = {}
+
+    # A private helper method that rewrites a shared checkpoint log with only the newest
+    # checkpoints of each account, replacing the old file in one rename, and points the
+    # shard index at the new offsets. Called with the layout's lock held
+    #
+    #  @param fileName: The name of the shared checkpoint log (String)
+    #  @param index: The index of the shard (ShardIndex)
+    #
+    #  @return: The number of checkpoints kept (int)
+    def _pruneCheckpoints(self, fileName, index):
+        self._logs[fileName].flush()
+        newest = {}
+        for offset, size, key, data in readKeyedFrames(fileName):
+            newest.setdefault(key, deque(maxlen = StorageLayout._KEEP_CHECKPOINTS)).append((offset, data))
+        kept = sorted((offset, key, data) for key, frames in newest.items() for offset, data in frames)
+        newLog = TransactionLog(fileName + ".new", truncate = True)
+        offsets = {offset: newLog.append(data, key = key) for offset, key, data in kept}
+        newLog.sync()
+        newLog.close()
+        self._logs[fileName].close()
+        os.replace(fileName + ".new", fileName)
+        self._logs[fileName] = TransactionLog(fileName, self._flushEvery, self._flushInterval)
+        # A pointer that is no longer found sends recovery back over every checkpoint
+        for key, offset in index.getCheckpointOffsets().items():
+            index.setCheckpointOffset(key, offsets.get(offset))
+        index.flush()
+        return len(kept)
+
+    # A private helper method that archives a sealed segment of a shard's transaction log.
+    # The records of each account whose cipher is known are decrypted, compressed together
+    # and encrypted again as one block; the others, including records of an earlier account
+    # with the same key, are compressed as they are. Each block is framed with its key
+    #
+    #  @param fileName: The name of the shared transaction log (String)
+    #  @param sealedFileName: The name of the sealed segment file (String)
+    #  @param base: The log offset of the first byte of the segment (int)
+    #
+    #  @return: The path of the archive and the codec it was compressed with (tuple)
+    def _archiveSegment(self, fileName, sealedFileName, base):
+        codec = self._codecs.get(fileName, self._codec)
+        sealed, packed = {}, {}
+        for offset, size, key, record in readKeyedFrames(sealedFileName):
+            data = _decryptOrNone(self._ciphers.get(key), record)
+            if data is None:
+                packed.setdefault(key, []).append((base + offset, size, record))
+            else:
+                sealed.setdefault(key, []).append((base + offset, size, data))
+        path = getArchivePath(fileName, base, codec)
+        archive = TransactionLog(path + ".new", truncate = True)
+        for key, frames in sealed.items():
+            archive.append(StorageLayout.SEALED_BLOCK + self._ciphers[key].encrypt(packSegment(frames, codec)), key = key)
+        for key, frames in packed.items():
+            archive.append(StorageLayout.PACKED_BLOCK + packSegment(frames, codec), key = key)
+        archive.sync()
+        archive.close()
+        os.replace(path + ".new", path)
+        return (path, codec)
+
+# Reads the records of one account from the archive of a sealed segment of a shared log
+#
+#  @param path: The path of the archive (String)
+#  @param codec: The codec the archive was compressed with (String)
+#  @param key: The key of the account (String)
+#  @param cipher: The cipher of the account (AESCipher)
+#
+#  @return: The (log offset, framed size, decrypted record) of each of the account's records,
+#           in log order; records that do not decrypt, as they belong to an earlier account
+#           with the same key, are skipped (list)
+def readSharedArchive(path, codec, key, cipher):
+    frames = []
+    for offset, size, block in readFrames(path, 0, key):
+        if block[:1] == StorageLayout.SEALED_BLOCK:
+            data = _decryptOrNone(cipher, block[1:])
+            if data is not None:
+                frames.extend(unpackSegment(data, codec))
+            continue
+        for frameOffset, frameSize, record in unpackSegment(block[1:], codec):
+            data = _decryptOrNone(cipher, record)
+            if data is not None:
+                frames.append((frameOffset, frameSize, data))
+    frames.sort(key = lambda frame: frame[0])
+    return frames
+
+# A private helper function that decrypts a record that may belong to another account
+#
+#  @param cipher: The cipher to try (AESCipher or None if it is not known)
+#  @param record: The encrypted record (bytes)
+#
+#  @return: The decrypted record, or None if it does not decrypt with the cipher (bytes)
+def _decryptOrNone(cipher, record):
+    if cipher is None:
+        return None
+    try:
+        return cipher.decrypt(record)
+    except (InvalidTag, ValueError):
+        return None
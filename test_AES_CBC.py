@@ -0,0 +1,81 @@
+"""
+This module defines the tester for the AES_CBC encryption helpers.
+@author: Hunter Peacock and Boden Kahn
+@date: December 9, 2024
+
+Import the unittest module and the AES_CBC module
+Test each function with at least one unit test
+"""
+
+import os
+import unittest
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from AES_CBC import (encrypt_AES_CBC, decrypt_AES_CBC, encrypt_AES_GCM, decrypt_AES_GCM,
+                     decrypt_AES_GCM_many, GCM_NONCE_SIZE, AESCipher)
+
+class TestAES(unittest.TestCase):
+
+    def setUp(self):
+        self.key = os.urandom(32)
+        self.iv = os.urandom(16)
+
+    def test_CBCRoundTrip(self):
+        print("\nTesting encrypting and decrypting text in CBC mode")
+        ciphertext = encrypt_AES_CBC("some text", self.key, self.iv)
+        self.assertEqual(decrypt_AES_CBC(ciphertext, self.key, self.iv), "some text")
+
+    def test_CBCBytes(self):
+        print("\nTesting encrypting and decrypting bytes in CBC mode")
+        ciphertext = encrypt_AES_CBC(b"\x00\x01\x02", self.key, self.iv)
+        self.assertEqual(decrypt_AES_CBC(ciphertext, self.key, self.iv, decode = False), b"\x00\x01\x02")
+
+    def test_GCMRoundTrip(self):
+        print("\nTesting encrypting and decrypting a record in GCM mode")
+        record = encrypt_AES_GCM(b"record", self.key)
+        self.assertEqual(len(record), GCM_NONCE_SIZE + len(b"record") + 16)
+        self.assertEqual(decrypt_AES_GCM(record, self.key), b"record")
+
+    def test_GCMTampered(self):
+        print("\nTesting that a modified GCM record is rejected")
+        record = bytearray(encrypt_AES_GCM(b"record", self.key))
+        record[-1] ^= 1
+        self.assertRaises(InvalidTag, decrypt_AES_GCM, bytes(record), self.key)
+
+    def test_GCMMany(self):
+        print("\nTesting decrypting many GCM records in one call")
+        data = [bytes([index]) * 20 for index in range(50)]
+        records = [encrypt_AES_GCM(item, self.key) for item in data]
+        self.assertEqual(decrypt_AES_GCM_many(records, self.key), data)
+
+    def test_cipherInvalidMode(self):
+        print("\nTesting to ensure the cipher throws an assertion with an invalid mode")
+        self.assertRaises(AssertionError, AESCipher, self.key, self.iv, 'ecb')
+        self.assertRaises(AssertionError, AESCipher, self.key, None, 'cbc')
+
+    def test_cipherMatchesCBCFunctions(self):
+        print("\nTesting that the CBC cipher is interchangeable with the per-call functions")
+        cipher = AESCipher(self.key, self.iv, 'cbc')
+        for data in (b"", b"x" * 15, b"x" * 16, b"x" * 40):
+            self.assertEqual(cipher.encrypt(data), encrypt_AES_CBC(data, self.key, self.iv))
+            self.assertEqual(cipher.decrypt(encrypt_AES_CBC(data, self.key, self.iv)), data)
+
+    def test_cipherCBCBadPadding(self):
+        print("\nTesting that the CBC cipher rejects a record with invalid padding")
+        # A block that ends in a zero byte is never valid PKCS7 padding
+        encryptor = Cipher(algorithms.AES(self.key), modes.CBC(self.iv)).encryptor()
+        record = encryptor.update(b"\x00" * 16) + encryptor.finalize()
+        self.assertRaises(ValueError, AESCipher(self.key, self.iv, 'cbc').decrypt, record)
+
+    def test_cipherGCMMany(self):
+        print("\nTesting the batch entry points of the GCM cipher")
+        cipher = AESCipher(self.key)
+        data = [bytes([index]) * 19 for index in range(20)]
+        records = cipher.encrypt_many(data)
+        self.assertEqual(cipher.decrypt_many(records), data)
+        self.assertEqual(cipher.decrypt_many(iter(records)), data)
+        self.assertEqual(cipher.decrypt_many([]), [])
+        self.assertEqual(decrypt_AES_GCM(records[0], self.key), data[0])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+"""
+This module defines the tester for the AccountTable class.
+@author: Boden Kahn and Anna Pitt
+@date: December 14, 2024
+
+Import the unittest module and the AccountTable module
+Test each method with at least one unit test
+"""
+
+import unittest
+from accountTable import AccountTable
+from checkingAccount import CheckingAccount
+from savingsAccount import SavingsAccount
+from client import Client
+from name import Name
+from address import Address
+from phoneNumber import PhoneNumber
+from password import Password
+
+class TestAccountTable(unittest.TestCase):
+
+    def setUp(self):
+        print("\nSetting up an account table...")
+        self.table = AccountTable(capacity = 2)
+        self.checking = CheckingAccount(1000, 100, 250.0)
+        self.savings = SavingsAccount(1001, 100, 40.0)
+        self.savings._balance = -35.5
+        self.savings._setOverdrawnCount(2)
+        self.other = SavingsAccount(1002, 101, 900.0)
+        self.table.addAccount(self.checking, "VA")
+        self.table.addAccount(self.savings, "VA")
+        self.table.addAccount(self.other, "MD")
+
+    def test_ConstructorInvalidCapacity(self):
+        print("Testing to ensure the constructor throws an assertion with an invalid capacity")
+        self.assertRaises(AssertionError, AccountTable, 0)
+
+    def test_rows(self):
+        print("Testing that a row reads back like the account it was taken from")
+        self.assertEqual(len(self.table), 3)
+        row = self.table.getRow(1)
+        self.assertEqual((row.getAccountNumber(), row.getClientNumber(), row.getAccountType()), (1001, 100, "savings"))
+        self.assertEqual((row.getBalance(), row.getOverdrawnCount(), row.getState()), (-35.5, 2, "VA"))
+        self.assertEqual(row.getInterestRate(), 0.04)
+        self.assertIs(row.getAccount(), self.savings)
+        self.assertEqual(list(self.table.getBalances()), [25000, -3550, 90000])
+        self.assertRaises(AssertionError, self.table.getRow, 3)
+
+    def test_rowsAreViews(self):
+        print("Testing that a row reflects later changes to the table")
+        row = self.table.getRow(0)
+        self.checking._balance = 300.0
+        self.assertEqual(row.getBalance(), 250.0)
+        self.table.refresh()
+        self.assertEqual(row.getBalance(), 300.0)
+
+    def test_totalBalanceByState(self):
+        print("Testing the total balance held in each state")
+        self.assertEqual(self.table.totalBalanceByState(), {"VA": 214.5, "MD": 900.0})
+
+    def test_findNegativeSavings(self):
+        print("Testing the search for overdrawn savings accounts")
+        self.assertEqual([row.getAccountNumber() for row in self.table.findNegativeSavings()], [1001])
+
+    def test_topBalances(self):
+        print("Testing the accounts with the largest balances")
+        self.assertEqual([row.getAccountNumber() for row in self.table.topBalances(2)], [1002, 1000])
+        self.assertEqual(len(self.table.topBalances(10)), 3)
+        self.assertEqual(self.table.topBalances(0), [])
+
+    def test_fromClients(self):
+        print("Testing that a table is built from the accounts of Clients")
+        client = Client(Name("First", "Last"), Address("100 Street", "City", "PA"), PhoneNumber("8041234567"),
+                        "checking", Password("Tester123!"))
+        client.openBankAccount(client.authenticate("Tester123!"), "savings", 10.0)
+        table = AccountTable.fromClients([client])
+        self.assertEqual(len(table), 2)
+        self.assertEqual(table.totalBalanceByState(), {"PA": 10.0})
+
+if __name__ == "__main__":
+    unittest.main()
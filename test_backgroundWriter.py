@@ -0,0 +1,187 @@
+"""
+This module defines the tester for the BackgroundWriter class.
+@author: Hunter Peacock and Boden Kahn
+@date: December 10, 2024
+
+Import the unittest module and the BackgroundWriter module
+Test each method with at least one unit test
+"""
+
+import os
+import queue
+import tempfile
+import threading
+import unittest
+from backgroundWriter import BackgroundWriter
+from bankAccount import enableBackgroundWriter, disableBackgroundWriter
+from checkingAccount import CheckingAccount
+from savingsAccount import SavingsAccount
+
+class TestBackgroundWriter(unittest.TestCase):
+
+    def setUp(self):
+        print("\nSetting up a temporary directory for the log files...")
+        self.oldDir = os.getcwd()
+        self.tempDir = tempfile.TemporaryDirectory()
+        os.chdir(self.tempDir.name)
+
+    def tearDown(self):
+        disableBackgroundWriter()
+        os.chdir(self.oldDir)
+        self.tempDir.cleanup()
+
+    def test_ConstructorInvalidQueueSize(self):
+        print("Testing to ensure the constructor throws an assertion with an invalid queue size")
+        self.assertRaises(AssertionError, BackgroundWriter, 0)
+
+    def test_tasksRunInOrder(self):
+        print("Testing that queued tasks run in the order they were submitted")
+        writer = BackgroundWriter(maxQueue = 8)
+        results = []
+        for index in range(20):
+            writer.submit(results.append, index)
+        writer.flush()
+        self.assertEqual(results, list(range(20)))
+        self.assertEqual(writer.getStats()["written"], 20)
+        self.assertEqual(writer.getQueueDepth(), 0)
+        writer.close()
+
+    def test_failFastWhenFull(self):
+        print("Testing that a full queue rejects tasks when failing fast")
+        writer = BackgroundWriter(maxQueue = 1, block = False)
+        gate = threading.Event()
+        writer.submit(gate.wait)   # Occupies the writer thread
+        while writer.getQueueDepth() > 0:
+            pass
+        writer.submit(lambda: None)
+        self.assertRaises(queue.Full, writer.submit, lambda: None)
+        self.assertGreaterEqual(writer.getStats()["rejected"], 1)
+        gate.set()
+        writer.close()
+
+    def test_blockWithTimeout(self):
+        print("Testing that a blocked producer gives up after its timeout")
+        writer = BackgroundWriter(maxQueue = 1, timeout = 0.01)
+        gate = threading.Event()
+        writer.submit(gate.wait)
+        while writer.getQueueDepth() > 0:
+            pass
+        writer.submit(lambda: None)
+        self.assertRaises(queue.Full, writer.submit, lambda: None)
+        gate.set()
+        writer.close()
+
+    def test_flushReportsErrors(self):
+        print("Testing that an error raised on the writer thread is reported by flush")
+        writer = BackgroundWriter()
+        writer.submit(int, "not a number")
+        self.assertRaises(ValueError, writer.flush)
+        writer.close()
+
+    def test_closeRejectsTasks(self):
+        print("Testing that a closed writer refuses new tasks")
+        writer = BackgroundWriter()
+        writer.close()
+        self.assertRaises(AssertionError, writer.submit, print)
+
+    def test_accountsWriteAsynchronously(self):
+        print("Testing account operations in asynchronous persistence mode")
+        writer = enableBackgroundWriter(maxQueue = 4)
+        checking = CheckingAccount(1000, 100, 100.0)
+        savings = SavingsAccount(1001, 100, 0.0)
+        for count in range(10):
+            checking.deposit(1.0)
+        savings.withdraw(10.0)
+        history = list(checking.iter_transactions())
+        self.assertEqual(len(history), 10)
+        self.assertEqual([transaction.getTType() for transaction in savings.iter_transactions()],
+                         ["withdrawal", "penalty"])
+        self.assertGreater(writer.getStats()["written"], 10)
+        self.assertGreaterEqual(writer.getLag(), 0.0)
+        checking.close()
+        savings.close()
+
+    # Occupies the writer thread until the gate is set and fills its queue
+    # Blocks the writer thread on the gate and fills its queue of 4 tasks, leaving room for some
+    def fillQueue(self, writer, gate, room = 0):
+        writer.submit(gate.wait)
+        while writer.getQueueDepth() > 0:
+            pass
+        while writer.getQueueDepth() < 4 - room:
+            writer.submit(lambda: None)
+
+    def test_rejectedWritesChangeNothing(self):
+        print("Testing that writes a fail-fast writer rejects leave the accounts unchanged")
+        writer = enableBackgroundWriter(maxQueue = 4, block = False)
+        gate = threading.Event()
+        self.fillQueue(writer, gate)
+        checking = CheckingAccount(1000, 100, 100.0)
+        savings = SavingsAccount(1001, 100, 500.0)
+        # The opening checkpoint is rejected, so the account has not started its log
+        self.assertRaises(queue.Full, checking.deposit, 1.0)
+        self.assertEqual((checking.getBalanceCents(), checking.getNextTransactionNum()), (10000, 100))
+        self.assertEqual(len(checking._accountTransactions), 0)
+        self.assertFalse(checking._hasLog())
+        gate.set()
+        writer.flush()
+
+        checking.deposit(1.0)
+        savings.deposit(1.0)
+        writer.flush()
+        gate.clear()
+        self.fillQueue(writer, gate)
+        self.assertRaises(queue.Full, checking.transfer, 50.0, savings)
+        self.assertEqual((checking.getBalanceCents(), checking.getNextTransactionNum()), (10100, 101))
+        self.assertEqual((savings.getBalanceCents(), savings.getNextTransactionNum()), (50100, 101))
+        gate.set()
+        writer.flush()
+        checking.deposit(2.0)
+        checking.close()
+        savings.close()
+        disableBackgroundWriter()
+
+        # The rejected transfer is not rolled forward
+        reopened = CheckingAccount(1000, 100, key = checking._key)
+        self.assertEqual(reopened.recover(), 2)
+        self.assertEqual(reopened.getBalanceCents(), 10300)
+        self.assertEqual([transaction.getTNumber() for transaction in reopened.iter_transactions()], [100, 101])
+        reopened.close()
+
+
+    def test_overdraftWrittenWithWithdrawal(self):
+        print("Testing that an overdrawing withdrawal and its fee are accepted or rejected together")
+        writer = enableBackgroundWriter(maxQueue = 4, block = False)
+        savings = SavingsAccount(1001, 100, 10.0)
+        savings.deposit(1.0)
+        writer.flush()
+        gate = threading.Event()
+        # Room for one task holds both records
+        self.fillQueue(writer, gate, room = 1)
+        savings.withdraw(50.0)
+        self.assertEqual((savings.getBalanceCents(), savings.getOverdrawnCount()), (-5900, 1))
+        self.assertRaises(queue.Full, savings.withdraw, 10.0)
+        self.assertEqual((savings.getBalanceCents(), savings.getOverdrawnCount()), (-5900, 1))
+        self.assertEqual(savings.getNextTransactionNum(), 103)
+        gate.set()
+        writer.flush()
+        self.assertEqual([t.getTType() for t in savings.iter_transactions()], ["deposit", "withdrawal", "penalty"])
+        savings.close()
+
+    def test_recoverAfterAsynchronousWrites(self):
+        print("Testing that checkpoints written asynchronously point at the right offset")
+        enableBackgroundWriter()
+        checking = CheckingAccount(1000, 100, 100.0)
+        for count in range(5):
+            checking.deposit(2.0)
+        checking.checkpoint()
+        checking.withdraw(4.0)
+        checking.close()
+        disableBackgroundWriter()
+
+        reopened = CheckingAccount(1000, 100, key = checking._key)
+        self.assertEqual(reopened.recover(), 1)
+        self.assertAlmostEqual(reopened.getBalance(), 106.0)
+        reopened.close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,327 @@
+"""
+This module defines the tester for the shared BankAccount behavior.
+@author: Hunter Peacock and Anna Pitt
+@date: December 9, 2024
+
+Import the unittest module and the account modules
+Test each method with at least one unit test
+"""
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from checkingAccount import CheckingAccount
+from savingsAccount import SavingsAccount
+from transaction import Transaction
+from bankAccount import BankAccount, _getTransferJournal
+from fileStore import FileStore
+from transactionLog import listSegments
+from money import Cents
+
+class TestBankAccount(unittest.TestCase):
+
+    def setUp(self):
+        # Works inside a temporary directory so the log files do not collect in the project
+        print("\nSetting up accounts in a temporary directory...")
+        self.oldDir = os.getcwd()
+        self.tempDir = tempfile.TemporaryDirectory()
+        os.chdir(self.tempDir.name)
+        self.checking = CheckingAccount(1000, 100, 100.0)
+        self.savings = SavingsAccount(1001, 100, 100.0)
+
+    def tearDown(self):
+        self.checking.close()
+        self.savings.close()
+        os.chdir(self.oldDir)
+        self.tempDir.cleanup()
+
+    def test_iterTransactionsEmpty(self):
+        print("Testing the history of an account without transactions")
+        self.assertEqual(list(self.checking.iter_transactions()), [])
+
+    def test_iterTransactions(self):
+        print("Testing that the history is streamed back as Transaction objects")
+        self.checking.deposit(50.0)
+        self.checking.withdraw(20.0)
+        history = list(self.checking.iter_transactions())
+        self.assertEqual(len(history), 2)
+        self.assertTrue(all(isinstance(transaction, Transaction) for transaction in history))
+        self.assertEqual(history[0], self.checking._accountTransactions[0])
+        self.assertEqual(history[1].getTType(), "withdrawal")
+        self.assertEqual(history[1].getAmount(), 20.0)
+
+    def test_iterTransactionsOffsets(self):
+        print("Testing the start and stop offsets of the history")
+        for count in range(5):
+            self.savings.deposit(float(count + 1))
+        history = list(self.savings.iter_transactions(1, 3))
+        self.assertEqual([transaction.getTNumber() for transaction in history], [101, 102])
+        history = list(self.savings.iter_transactions(start = 4))
+        self.assertEqual([transaction.getAmount() for transaction in history], [5.0])
+
+    def test_iterTransactionsInvalidOffsets(self):
+        print("Testing that invalid offsets throw an assertion")
+        self.assertRaises(AssertionError, list, self.checking.iter_transactions(-1))
+        self.assertRaises(AssertionError, list, self.checking.iter_transactions(3, 2))
+
+    def test_iterTransactionsOrder(self):
+        print("Testing that a longer history is streamed in order from an offset")
+        for count in range(10):
+            self.checking.deposit(float(count + 1))
+        history = list(self.checking.iter_transactions(2))
+        self.assertEqual([transaction.getTNumber() for transaction in history], list(range(102, 110)))
+
+    def test_cbcCipherMode(self):
+        print("Testing that an account can still use the account-wide initialization vector")
+        self.savings._cipherMode = 'cbc'
+        self.savings.deposit(10.0)
+        self.savings.withdraw(5.0)
+        history = list(self.savings.iter_transactions())
+        self.assertEqual([transaction.getTType() for transaction in history], ["deposit", "withdrawal"])
+
+    def test_recordsUseDistinctNonces(self):
+        print("Testing that equal transactions produce different encrypted records")
+        record = self.checking._encryptRecord(b"same record")
+        self.assertNotEqual(record, self.checking._encryptRecord(b"same record"))
+        self.assertEqual(self.checking._decryptRecord(record), b"same record")
+
+    def test_iterTransactionsMapped(self):
+        print("Testing that the mapped and buffered readers return the same history")
+        for count in range(6):
+            self.savings.deposit(float(count + 1))
+        mapped = list(self.savings.iter_transactions(1, 5))
+        self.assertEqual(mapped, list(self.savings.iter_transactions(1, 5, mapped = False)))
+
+    def test_recoverFromCheckpoint(self):
+        print("Testing that a reopened checking account recovers from its newest checkpoint")
+        oldEvery = BankAccount._checkpointEvery
+        BankAccount._checkpointEvery = 4
+        try:
+            for count in range(10):
+                self.checking.deposit(10.0)
+            self.checking.withdraw(30.0)
+            self.checking.close()
+
+            reopened = CheckingAccount(1000, 100, key = self.checking._key)
+            replayed = reopened.recover()
+            self.assertLess(replayed, 11)
+            self.assertAlmostEqual(reopened.getBalance(), 170.0)
+            self.assertEqual(reopened.getNextTransactionNum(), 111)
+            reopened.deposit(5.0)
+            self.assertEqual(reopened.getTransaction(111).getAmount(), 5.0)
+            reopened.close()
+        finally:
+            BankAccount._checkpointEvery = oldEvery
+
+    def test_recoverOverdraftCount(self):
+        print("Testing that a reopened savings account recovers its overdraft count")
+        self.savings.withdraw(150.0)
+        self.savings.deposit(20.0)
+        self.savings.close()
+
+        reopened = SavingsAccount(1001, 100, key = self.savings._key)
+        reopened.recover()
+        self.assertAlmostEqual(reopened.getBalance(), self.savings.getBalance())
+        self.assertEqual(reopened.getOverdrawnCount(), 1)
+        reopened.close()
+
+    def test_recoverSkipsCorruptCheckpoint(self):
+        print("Testing that a corrupted checkpoint is skipped during recovery")
+        oldEvery = BankAccount._checkpointEvery
+        BankAccount._checkpointEvery = 2
+        try:
+            for count in range(5):
+                self.checking.deposit(1.0)
+            self.checking.close()
+            # Flips the last byte of the newest checkpoint
+            with open(self.checking._getLogFileName() + ".ckpt", "r+b") as ckpt:
+                ckpt.seek(-2, os.SEEK_END)
+                last = ckpt.read(1)
+                ckpt.seek(-2, os.SEEK_END)
+                ckpt.write(bytes([last[0] ^ 1]))
+
+            reopened = CheckingAccount(1000, 100, key = self.checking._key)
+            self.assertEqual(reopened.recover(), 3)
+            self.assertAlmostEqual(reopened.getBalance(), 105.0)
+            reopened.close()
+        finally:
+            BankAccount._checkpointEvery = oldEvery
+
+    def test_segmentRotation(self):
+        print("Testing that a long history rolls over into compressed archived segments")
+        self.checking.setSegmentPolicy(segmentSize = 400)
+        for count in range(30):
+            self.checking.deposit(1.0)
+        self.checking.flush()
+        fileName = self.checking._getLogFileName()
+        segments = listSegments(fileName)
+        self.assertGreater(len(segments), 2)
+        self.assertTrue(all(codec == "zlib" for base, end, codec, path in segments[:-1]))
+        self.assertTrue(all(os.path.dirname(path) == "archive" for base, end, codec, path in segments[:-1]))
+        self.assertLess(os.path.getsize(fileName), 400)
+        numbers = [transaction.getTNumber() for transaction in self.checking.iter_transactions()]
+        self.assertEqual(numbers, list(range(100, 130)))
+
+    def test_segmentHistoryApis(self):
+        print("Testing random access, seeking and slicing across archived segments")
+        self.savings.setSegmentPolicy(segmentSize = 300, codec = "lzma")
+        for date in ("2024-12-01", "2024-12-02", "2024-12-03", "2024-12-04") * 5:
+            self.savings._writeTransaction(Transaction("deposit", self.savings.getNextTransactionNum(), 1.0, date))
+        self.assertEqual(self.savings.getTransaction(101).getDate(), "2024-12-02")
+        self.assertEqual(self.savings.getTransaction(119).getDate(), "2024-12-04")
+        numbers = [t.getTNumber() for t in self.savings.iter_transactions(3, 9)]
+        self.assertEqual(numbers, list(range(103, 109)))
+        self.assertEqual(len(list(self.savings.iter_transactions(mapped = False))), 20)
+        # A rebuilt index reads the archived segments back
+        self.savings._getStore().getLog().getIndex().rebuild([])
+        self.assertEqual(self.savings.getTransaction(110).getTNumber(), 110)
+
+    def test_recoverAcrossSegments(self):
+        print("Testing that recovery replays records held in archived segments")
+        BankAccount._checkpointEvery = 0
+        try:
+            self.checking.setSegmentPolicy(segmentSize = 200)
+            for count in range(10):
+                self.checking.deposit(2.0)
+            self.checking.close()
+            reopened = CheckingAccount(1000, 100, key = self.checking._key)
+            reopened.setSegmentPolicy(segmentSize = 200)
+            self.assertEqual(reopened.recover(), 10)
+            self.assertAlmostEqual(reopened.getBalance(), 120.0)
+            reopened.close()
+        finally:
+            BankAccount._checkpointEvery = 100
+
+    def test_migrateSegmentedLog(self):
+        print("Testing that migrating a segmented log rewrites it as one file")
+        self.checking.setSegmentPolicy(segmentSize = 200)
+        for count in range(10):
+            self.checking.deposit(1.0)
+        self.checking.setSegmentPolicy(None)
+        self.checking.migrateLog()
+        self.assertEqual(len(listSegments(self.checking._getLogFileName())), 1)
+        self.assertEqual(len(list(self.checking.iter_transactions())), 10)
+
+    def test_transferPostsOneRecordPerAccount(self):
+        print("Testing that a transfer logs one posted record in each account and one intent")
+        self.checking.transfer(30.0, self.savings)
+        self.assertEqual([t.getTType() for t in self.checking.iter_transactions()], ["transfer"])
+        self.assertEqual([t.getTType() for t in self.savings.iter_transactions()], ["transfer"])
+        self.assertEqual((self.checking.getBalance(), self.savings.getBalance()), (70.0, 130.0))
+        journal = BankAccount._transferJournal
+        self.assertEqual(journal.getPending(self.checking._getAccountKey()), [])
+        self.assertEqual(journal.getPending(self.savings._getAccountKey()), [])
+
+    def test_transferRecovered(self):
+        print("Testing that recovery replays transfers in both accounts")
+        self.savings.transfer(120.0, self.checking)
+        self.checking.close()
+        self.savings.close()
+        checking = CheckingAccount(1000, 100, key = self.checking._key)
+        savings = SavingsAccount(1001, 100, key = self.savings._key)
+        checking.recover()
+        savings.recover()
+        self.assertAlmostEqual(checking.getBalance(), 220.0)
+        self.assertAlmostEqual(savings.getBalance(), -40.0)
+        self.assertEqual(savings.getOverdrawnCount(), 1)
+        checking.close()
+        savings.close()
+
+    def test_transferRolledForward(self):
+        print("Testing that recovery completes a transfer that crashed after its intent was durable")
+        self.savings.deposit(10.0)
+        def crash(store, transaction, record = None, flags = 0):
+            raise RuntimeError("The process died.")
+        self.savings._appendTransaction = crash
+        self.assertRaises(RuntimeError, self.checking.transfer, 30.0, self.savings)
+        self.checking.close()
+        self.savings.close()
+
+        savings = SavingsAccount(1001, 100, key = self.savings._key)
+        self.assertEqual(savings.recover(), 2)
+        self.assertAlmostEqual(savings.getBalance(), 140.0)
+        self.assertEqual(savings.getTransaction(101).getTType(), "transfer")
+        savings.close()
+        checking = CheckingAccount(1000, 100, key = self.checking._key)
+        self.assertEqual(checking.recover(), 1)
+        self.assertAlmostEqual(checking.getBalance(), 70.0)
+        checking.close()
+        # The rolled-forward leg is not applied twice
+        again = SavingsAccount(1001, 100, key = self.savings._key)
+        again.recover()
+        self.assertAlmostEqual(again.getBalance(), 140.0)
+        self.assertEqual(again.getNextTransactionNum(), 102)
+        again.close()
+
+    def test_overdraftFeeRolledForward(self):
+        print("Testing that recovery logs the overdraft fee of a transfer together with its debit")
+        def crash(store, transaction, record = None, flags = 0):
+            raise RuntimeError("The process died.")
+        self.savings._appendTransaction = crash
+        self.assertRaises(RuntimeError, self.savings.transfer, 150.0, self.checking)
+        self.checking.close()
+        self.savings.close()
+
+        savings = SavingsAccount(1001, 100, key = self.savings._key)
+        self.assertEqual(savings.recover(), 2)
+        self.assertEqual((savings.getBalanceCents(), savings.getOverdrawnCount()), (-7000, 1))
+        self.assertEqual([t.getTType() for t in savings.iter_transactions()], ["transfer", "penalty"])
+        savings.close()
+        checking = CheckingAccount(1000, 100, key = self.checking._key)
+        self.assertEqual(checking.recover(), 1)
+        self.assertAlmostEqual(checking.getBalance(), 250.0)
+        checking.close()
+        self.assertEqual(_getTransferJournal(False).getOpenCount(), 0)
+
+    def test_transferSyncsBothLogs(self):
+        print("Testing that both legs are forced to disk before the transfer is marked complete")
+        synced = []
+        with patch.object(FileStore, "sync", lambda store: synced.append(store.getFileName())):
+            self.checking.transfer(10.0, self.savings)
+        self.assertEqual(synced, [self.checking._getLogFileName(), self.savings._getLogFileName()])
+        self.assertEqual(_getTransferJournal(False).getOpenCount(), 0)
+
+    def test_transferInvalid(self):
+        print("Testing to ensure an invalid transfer throws an assertion and writes no intent")
+        self.assertRaises(AssertionError, self.checking.transfer, 500.0, self.savings)
+        self.assertRaises(AssertionError, self.checking.transfer, 5.0, self.checking)
+        self.assertEqual(self.checking.getBalance(), 100.0)
+
+    def test_interestPostsOneRecord(self):
+        print("Testing that interest is logged as one posted record and replayed on recovery")
+        self.savings.withdraw(150.0)
+        self.savings._balance = 5000.0
+        self.savings.calcInterest()
+        self.assertEqual([t.getTType() for t in self.savings.iter_transactions()], ["withdrawal", "penalty", "interest"])
+        self.assertEqual(self.savings.getNextTransactionNum(), 103)
+        self.assertEqual(self.savings.getOverdrawnCount(), 0)
+        self.checking.calcInterest()
+        self.assertEqual(len(list(self.checking.iter_transactions())), 1)
+        self.checking.close()
+        reopened = CheckingAccount(1000, 100, key = self.checking._key)
+        self.assertEqual(reopened.recover(), 1)
+        self.assertAlmostEqual(reopened.getBalance(), 101.5)
+        reopened.close()
+
+    def test_balanceInCents(self):
+        print("Testing that balances are kept exactly in cents")
+        for count in range(10):
+            self.checking.deposit(0.1)
+        self.assertEqual(self.checking.getBalanceCents(), 10100)
+        self.assertEqual(self.checking.getBalance(), 101.0)
+        self.checking.withdraw(Cents(1))
+        self.assertEqual(self.checking.getBalanceCents(), 10099)
+        self.savings._balance = 33.333
+        self.assertEqual(self.savings.getBalanceCents(), 3333)
+        self.savings.calcInterest()
+        self.assertEqual(self.savings.getBalanceCents(), 3466)
+        self.assertRaises(AssertionError, self.checking.deposit, 5)
+
+    def test_segmentPolicyInvalid(self):
+        print("Testing to ensure an invalid segment policy throws an assertion")
+        self.assertRaises(AssertionError, self.checking.setSegmentPolicy, 0)
+        self.assertRaises(AssertionError, self.checking.setSegmentPolicy, 100, "gzip")
+
+if __name__ == "__main__":
+    unittest.main()
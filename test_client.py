@@ -9,7 +9,15 @@ Test each method with at least one unit test
 
 # Import statements
 import unittest
-from client import Client
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import threading
+from sessionStore import SessionStore
+from client import Client, enableHashExecutor, disableHashExecutor, calibrateHashCost, setHashParameters, useKdf, enableSessions, disableSessions
+from passwordKdf import enableInsecureTestKdf, disableInsecureTestKdf, TEST_CONFIG_VARIABLE
+from unittest.mock import patch
+import os
+import time
 from name import Name
 from address import Address
 from phoneNumber import PhoneNumber
@@ -35,6 +43,10 @@ class TestClient(unittest.TestCase):
         self.client1 = Client(self.validName, self.validAddress, self.validPhone, "checking", self.validPassword)
         self.client2 = Client(self.validName, self.validAddress, self.validPhone, "savings", self.validPassword)
         
+        # Starts a session for each client, which privileged operations are requested with
+        self.token1 = self.client1.authenticate("Tester123!")
+        self.token2 = self.client2.authenticate("Tester123!")
+        
     def test_ConstructorInvalidName(self):
         print("\nTesting to ensure the constructor properly throws an assertion with incorrect name type")
         
@@ -215,13 +227,13 @@ class TestClient(unittest.TestCase):
     def test_openBankAccountInvalidAccountType(self):
         print("\nTesting to ensure that openBankAccount() throws an assertion when the account type is an invalid type") 
         
-        self.assertRaises(AssertionError, self.client1.openBankAccount, 100.0, "neither")  
+        self.assertRaises(AssertionError, self.client1.openBankAccount, self.token1, "neither", 100.0)  
     
     def test_openBankAccountValidChecking(self):
         print("\nTesting to ensure that openBankAccount() works as intended with a checking account") 
         
         # Attempts to add a new bank account
-        self.client1.openBankAccount('checking', 100.0)
+        self.client1.openBankAccount(self.token1, 'checking', 100.0)
         
         # Pulls the bank accounts to compare
         checkList = self.client1.getClientAccounts()
@@ -240,7 +252,7 @@ class TestClient(unittest.TestCase):
         print("\nTesting to ensure that openBankAccount() works as intended with a savings account") 
         
         # Attempts to add a new bank account
-        self.client1.openBankAccount('savings', 100.0)
+        self.client1.openBankAccount(self.token1, 'savings', 100.0)
         
         # Pulls the bank accounts to compare
         checkList = self.client1.getClientAccounts()
@@ -259,7 +271,7 @@ class TestClient(unittest.TestCase):
         print("\nTesting to ensure that openBankAccount() works as intended when no balance is passed in") 
         
         # Attempts to add a new bank account
-        self.client1.openBankAccount('checking')
+        self.client1.openBankAccount(self.token1, 'checking')
         
         # Pulls the bank accounts to compare
         checkList = self.client1.getClientAccounts()
@@ -278,13 +290,13 @@ class TestClient(unittest.TestCase):
         print("\nTesting to ensure that closeBankAccount() works as intended")
         
         # Adds a new bank account to delete
-        self.client1.openBankAccount('checking', 100.0)
+        self.client1.openBankAccount(self.token1, 'checking', 100.0)
         
         # Pulls out the bank account to close it
         closeAccount = self.client1._bankAccounts[1]
         
         # Attempts to close the new bank account
-        self.client1.closeBankAccount(closeAccount)
+        self.client1.closeBankAccount(self.token1, closeAccount)
         
         # Pulls out the client account list
         clientList = self.client1.getClientAccounts()
@@ -302,13 +314,13 @@ class TestClient(unittest.TestCase):
         print("\nTesting to ensure that closeBankAccount() throws an assertion error when an invalid account number is passed in")
         
         # Attempts to close a nonexistent bank account
-        self.assertRaises(AssertionError, self.client1.closeBankAccount, 1005)    
+        self.assertRaises(AssertionError, self.client1.closeBankAccount, self.token1, 1005)    
 
     def test_closeBankAccountOneAccount(self):
         print("\nTesting to ensure that closeBankAccount() does not allow the closing of an account if the client only has one account") 
         
         # Attempts to close a bank account when there is only one account
-        self.assertRaises(AssertionError, self.client1.closeBankAccount, 1000)
+        self.assertRaises(AssertionError, self.client1.closeBankAccount, self.token1, 1000)
     
     def test_clientAccountTransactionNum(self):
         print("\nTesting to ensure that proper client numbers, account numbers, and transaction numbers are being assigned")
@@ -318,8 +330,8 @@ class TestClient(unittest.TestCase):
         self.assertEqual(self.client2.getClientNumber(), 101)
         
         # Creates additional accounts for each client
-        self.client1.openBankAccount('savings', 100.0)
-        self.client2.openBankAccount('savings', 100.0) 
+        self.client1.openBankAccount(self.token1, 'savings', 100.0)
+        self.client2.openBankAccount(self.token2, 'savings', 100.0) 
         
         # Checks the account numbers of each of the two client accounts for both clients
         self.assertEqual(self.client1._bankAccounts[0].getAccountNumber(), 1000)
@@ -354,7 +366,7 @@ class TestClient(unittest.TestCase):
     def test_get_next_account_number(self):
         print("Testing getting the next account number")
         self.assertEqual(self.client1.getNextAccountNumber(), 1001)
-        self.client1.openBankAccount('checking', 0.0)
+        self.client1.openBankAccount(self.token1, 'checking', 0.0)
         self.assertEqual(self.client1.getNextAccountNumber(), 1002)
     
     def test_changePassword(self):
@@ -364,15 +376,13 @@ class TestClient(unittest.TestCase):
         oldHash = self.client1._hash
         
         print()
-        print("1) Enter the invalid client password tester123. This should prompt you to re-enter the current password.")
-        print("2) Enter the valid client password Tester123!, which should allow you to move on.")
-        print("3) Enter the invalid new password short. This should prompt you to enter a password that meets the requirements.")
-        print("4) Enter the invalid new password longlonglonglonglong. This should prompt you to enter a password that meets the requirements.")
-        print("5) Enter the invalid new password test/. This should prompt you to enter a password that meets the requirements.")
-        print("6) Enter the valid new password Tester123!!. This should prompt you to re-enter the new password.")
-        print("7) Enter the non-matching password Tester123!. This should prompt you to enter and re-enter the new password again.")
-        print("8) Enter the valid new password Tester123!! two times when prompted. This should allow the password to be changed.")
-        self.client1.changePassword()
+        print("1) Enter the invalid new password short. This should prompt you to enter a password that meets the requirements.")
+        print("2) Enter the invalid new password longlonglonglonglong. This should prompt you to enter a password that meets the requirements.")
+        print("3) Enter the invalid new password test/. This should prompt you to enter a password that meets the requirements.")
+        print("4) Enter the valid new password Tester123!!. This should prompt you to re-enter the new password.")
+        print("5) Enter the non-matching password Tester123!. This should prompt you to enter and re-enter the new password again.")
+        print("6) Enter the valid new password Tester123!! two times when prompted. This should allow the password to be changed.")
+        self.client1.changePassword(self.token1)
         
         # Checks to ensure that the old and new hashes are different
         self.assertNotEqual(oldHash, self.client1._hash)
@@ -391,5 +401,192 @@ class TestClient(unittest.TestCase):
         # Checks to ensure that the new hash is equal to the correct hash value of the new password
         self.assertEqual(self.client1._hash, correctHash)
 
+    def test_createAsync(self):
+        print("\nTesting that Clients are created and passwords checked without blocking the event loop")
+        async def run():
+            ticks = 0
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    ticks += 1
+                    await asyncio.sleep(0)
+            tickTask = asyncio.create_task(ticker())
+            client = await Client.createAsync(self.validName, self.validAddress, self.validPhone, "savings", self.validPassword)
+            results = await asyncio.gather(client.checkPasswordAsync("Tester123!"), client.checkPasswordAsync("Wrong1234!"),
+                                           client.checkPasswordAsync("short"))
+            tickTask.cancel()
+            return client, results, ticks
+        try:
+            client, results, ticks = asyncio.run(run())
+        finally:
+            disableHashExecutor()
+        self.assertEqual(client.getClientNumber(), 102)
+        self.assertEqual(client.getClientAccounts()[0].getAccountType(), "savings")
+        self.assertEqual(results, [True, False, False])
+        self.assertTrue(client._checkPasswordMatch("Tester123!"))
+        # The loop kept running while the hashes were derived
+        self.assertGreater(ticks, 2)
+
+    def test_submitCreateProcessPool(self):
+        print("\nTesting that Clients are created and checked through a process pool")
+        with ProcessPoolExecutor(max_workers = 2) as pool:
+            enableHashExecutor(pool)
+            try:
+                futures = [Client.submitCreate(self.validName, self.validAddress, self.validPhone, "checking", self.validPassword)
+                           for count in range(3)]
+                clients = [future.result() for future in futures]
+                self.assertTrue(clients[0].submitPasswordCheck("Tester123!").result())
+                self.assertFalse(clients[1].submitPasswordCheck("Tester123?").result())
+            finally:
+                disableHashExecutor()
+        self.assertEqual(sorted(client.getClientNumber() for client in clients), [102, 103, 104])
+        bad = Client.submitCreate(self.validName, self.validAddress, self.validPhone, "neither", self.validPassword)
+        self.assertRaises(AssertionError, bad.result)
+        disableHashExecutor()
+
+    def test_calibrateHashCost(self):
+        print("\nTesting that the calibrated iteration count follows the target time")
+        fast = calibrateHashCost(5, sampleIterations = 2_000)
+        slow = calibrateHashCost(200, sampleIterations = 2_000)
+        self.assertGreaterEqual(fast, Client.MIN_ITERATIONS)
+        self.assertEqual(slow % 1000, 0)
+        self.assertGreater(slow, fast)
+        self.assertRaises(AssertionError, calibrateHashCost, 0)
+
+    def test_rehashOnLogin(self):
+        print("\nTesting that a login with outdated hash parameters rehashes the password")
+        setHashParameters(2_000, 'sha512')
+        try:
+            oldHash = self.client1._hash
+            self.assertFalse(self.client1._checkPasswordMatch("Wrong1234!"))
+            self.assertEqual((self.client1._iterations, self.client1._hash_algo, self.client1._hash), (100_000, 'sha256', oldHash))
+            self.assertTrue(self.client1._checkPasswordMatch("Tester123!"))
+            self.assertEqual((self.client1._iterations, self.client1._hash_algo), (2_000, 'sha512'))
+            self.assertNotEqual(self.client1._hash, oldHash)
+            self.assertTrue(self.client1._checkPasswordMatch("Tester123!"))
+            self.assertTrue(self.client2.submitPasswordCheck("Tester123!").result())
+            disableHashExecutor()
+            self.assertEqual(self.client2._iterations, 2_000)
+            self.assertRaises(AssertionError, setHashParameters, 1000, 'not-a-hash')
+        finally:
+            setHashParameters(100_000, 'sha256')
+            disableHashExecutor()
+
+    def test_rehashAfterPasswordChange(self):
+        print("\nTesting that a rehash finishing after a password change does not restore the old password")
+        release = threading.Event()
+        pool = ThreadPoolExecutor(max_workers = 2)
+        # Holds the rehash until the password has been changed
+        def held(function, *args):
+            release.wait(5)
+            return function(*args)
+        class HeldExecutor:
+            def submit(self, function, *args):
+                if function.__name__ == "_newHashRecord":
+                    return pool.submit(held, function, *args)
+                return pool.submit(function, *args)
+        enableHashExecutor(HeldExecutor())
+        token = self.client1.authenticate("Tester123!")
+        setHashParameters(2_000, 'sha512')
+        try:
+            self.assertTrue(self.client1.submitPasswordCheck("Tester123!").result())
+            with patch('builtins.input', side_effect = ["Changed12!", "Changed12!"]):
+                self.client1.changePassword(token)
+            changed = self.client1.getHashRecord()
+            release.set()
+            pool.shutdown(wait = True)
+            self.assertEqual(self.client1.getHashRecord(), changed)
+            self.assertTrue(self.client1._checkPasswordMatch("Changed12!"))
+            self.assertFalse(self.client1._checkPasswordMatch("Tester123!"))
+        finally:
+            release.set()
+            pool.shutdown(wait = True)
+            setHashParameters(100_000, 'sha256')
+            disableHashExecutor()
+
+    def test_fastTestKdf(self):
+        print("\nTesting that the fast test profile creates and checks Clients in microseconds")
+        with patch.dict(os.environ, {TEST_CONFIG_VARIABLE: "1"}):
+            enableInsecureTestKdf()
+        try:
+            useKdf('insecure-fast')
+            start = time.perf_counter()
+            clients = [Client(self.validName, self.validAddress, self.validPhone, "checking", self.validPassword) for count in range(100)]
+            self.assertTrue(all(client._checkPasswordMatch("Tester123!") for client in clients))
+            self.assertLess(time.perf_counter() - start, 1.0)
+            self.assertEqual((clients[0]._hash_algo, clients[0]._iterations), ('insecure-fast', 1))
+            disableInsecureTestKdf()
+            # A hash derived by the turned-off profile never matches
+            self.assertFalse(clients[0]._checkPasswordMatch("Tester123!"))
+        finally:
+            disableInsecureTestKdf()
+            setHashParameters(100_000, 'sha256')
+
+    def test_scryptKdf(self):
+        print("\nTesting clients hashed with scrypt and restored from their hash record")
+        useKdf('scrypt', 2 ** 10)
+        try:
+            client = Client(self.validName, self.validAddress, self.validPhone, "savings", self.validPassword)
+            self.assertEqual((client._hash_algo, client._iterations), ('scrypt', 2 ** 10))
+            self.assertTrue(client._checkPasswordMatch("Tester123!"))
+            record = client.getHashRecord()
+            self.assertTrue(record.startswith("v1$scrypt$1024$"))
+            restored = Client(self.validName, self.validAddress, self.validPhone, "savings", self.validPassword,
+                              _hashRecord = record)
+            self.assertEqual(restored._hash, client._hash)
+            self.assertTrue(restored._checkPasswordMatch("Tester123!"))
+            # The older PBKDF2 hash is replaced on the next login
+            self.assertTrue(self.client1._checkPasswordMatch("Tester123!"))
+            self.assertEqual(self.client1._hash_algo, 'scrypt')
+        finally:
+            setHashParameters(100_000, 'sha256')
+
+    def test_sessions(self):
+        print("\nTesting that a session token replaces repeated password checks")
+        enableSessions(b"s" * 32, ttl = 60)
+        try:
+            self.assertIsNone(self.client1.authenticate("Wrong1234!"))
+            token = self.client1.authenticate("Tester123!")
+            self.assertTrue(self.client1.checkSession(token))
+            self.assertFalse(self.client2.checkSession(token))
+            self.assertFalse(self.client2.endSession(token))
+            self.assertTrue(self.client1.endSession(token))
+            self.assertFalse(self.client1.checkSession(token))
+        finally:
+            disableSessions()
+
+    def test_changePasswordRevokesSessions(self):
+        print("\nTesting that changing the password ends every session of the Client")
+        enableSessions(b"s" * 32, ttl = 60)
+        try:
+            tokens = [self.client1.authenticate("Tester123!") for count in range(2)]
+            other = self.client2.authenticate("Tester123!")
+            with patch("builtins.input", side_effect = ["NewPass123!", "NewPass123!"]):
+                self.client1.changePassword(tokens[0])
+            self.assertFalse(any(self.client1.checkSession(token) for token in tokens))
+            self.assertTrue(self.client2.checkSession(other))
+        finally:
+            disableSessions()
+
+    def test_privilegedOperationsNeedSession(self):
+        print("\nTesting that privileged operations reject an expired or revoked session token")
+        now = [1000.0]
+        Client._sessionStore = SessionStore(b"s" * 32, ttl = 60, clock = lambda: now[0])
+        try:
+            expired = self.client1.authenticate("Tester123!")
+            revoked = self.client1.authenticate("Tester123!")
+            self.client1.endSession(revoked)
+            now[0] += 61
+            live = self.client1.authenticate("Tester123!")
+            for token in (expired, revoked, self.token2, "not a token"):
+                self.assertRaises(AssertionError, self.client1.openBankAccount, token, "savings")
+                self.assertRaises(AssertionError, self.client1.changePassword, token)
+            account = self.client1.openBankAccount(live, "savings", 10.0)
+            self.assertRaises(AssertionError, self.client1.closeBankAccount, expired, account)
+            self.client1.closeBankAccount(live, account)
+            self.assertEqual(len(self.client1.getClientAccounts()), 1)
+        finally:
+            disableSessions()
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,135 @@
+"""
+This module defines the tester for the ConnectionPool class.
+@author: Boden Kahn and Anna Pitt
+@date: December 12, 2024
+
+Import the unittest module and the ConnectionPool module
+Test each method with at least one unit test
+"""
+
+import threading
+import time
+import unittest
+from connectionPool import ConnectionPool
+
+# A stand-in connection that records whether it was closed and can be made to fail
+class FakeConnection:
+
+    def __init__(self):
+        self.closed = False
+        self.broken = False
+
+    def execute(self, statement):
+        if self.broken:
+            raise RuntimeError("The connection is broken.")
+        return self
+
+    def fetchone(self):
+        return (1,)
+
+    def close(self):
+        self.closed = True
+
+class TestConnectionPool(unittest.TestCase):
+
+    def setUp(self):
+        print("\nSetting up a connection pool of fake connections...")
+        self.opened = []
+        self.pool = ConnectionPool(self.connect, maxSize = 2, checkAfter = 0)
+
+    def tearDown(self):
+        self.pool.close()
+
+    def connect(self):
+        connection = FakeConnection()
+        self.opened.append(connection)
+        return connection
+
+    def test_ConstructorInvalidSize(self):
+        print("Testing to ensure the constructor throws an assertion with an invalid pool size")
+        self.assertRaises(AssertionError, ConnectionPool, self.connect, 0)
+        self.assertRaises(AssertionError, ConnectionPool, self.connect, 2, -1)
+
+    def test_reuseAndAffinity(self):
+        print("Testing that a thread gets back the connection it used last")
+        with self.pool.connection() as first:
+            with self.pool.connection() as second:
+                pass
+        self.assertEqual(len(self.opened), 2)
+        # The thread acquired the second connection last, although the first was released after it
+        with self.pool.connection() as again:
+            self.assertIs(again, second)
+        self.assertEqual(self.pool.getStats()["affinityHits"], 1)
+        self.assertEqual(len(self.opened), 2)
+
+    def test_boundedWaitAndTimeout(self):
+        print("Testing that callers wait for a free connection and can time out")
+        pool = ConnectionPool(self.connect, maxSize = 1, acquireTimeout = 0.05)
+        held = pool.acquire()
+        self.assertRaises(TimeoutError, pool.acquire)
+        threading.Timer(0.01, pool.release, (held,)).start()
+        pool._acquireTimeout = 1
+        self.assertIs(pool.acquire(), held)
+        stats = pool.getStats()
+        self.assertEqual(stats["waited"], 1)
+        self.assertGreater(stats["maxWait"], 0)
+        pool.close()
+
+    def test_healthCheck(self):
+        print("Testing that a broken idle connection is replaced")
+        with self.pool.connection() as connection:
+            pass
+        connection.broken = True
+        with self.pool.connection() as replacement:
+            self.assertIsNot(replacement, connection)
+        self.assertTrue(connection.closed)
+        self.assertEqual(self.pool.getStats()["failedChecks"], 1)
+
+    def test_idleEviction(self):
+        print("Testing that connections idle past the timeout are closed")
+        pool = ConnectionPool(self.connect, maxSize = 2, idleTimeout = 0.01)
+        with pool.connection() as connection:
+            pass
+        time.sleep(0.02)
+        with pool.connection() as fresh:
+            self.assertIsNot(fresh, connection)
+        self.assertTrue(connection.closed)
+        self.assertEqual(pool.getStats()["evicted"], 1)
+        pool.close()
+
+    def test_utilization(self):
+        print("Testing the utilization counters")
+        connection = self.pool.acquire()
+        stats = self.pool.getStats()
+        self.assertEqual((stats["inUse"], stats["utilization"], stats["created"]), (1, 0.5, 1))
+        self.pool.release(connection)
+        self.assertEqual(self.pool.getStats()["idle"], 1)
+
+    def test_closeReleasesConnections(self):
+        print("Testing that closing the pool closes idle and later released connections")
+        held = self.pool.acquire()
+        with self.pool.connection() as idle:
+            pass
+        self.pool.close()
+        self.assertTrue(idle.closed)
+        self.assertFalse(held.closed)
+        self.pool.release(held)
+        self.assertTrue(held.closed)
+        self.assertRaises(AssertionError, self.pool.acquire)
+
+    def test_threadsShareBoundedPool(self):
+        print("Testing that many threads never open more connections than the pool size")
+        def work():
+            for count in range(20):
+                with self.pool.connection():
+                    time.sleep(0.0005)
+        threads = [threading.Thread(target = work) for count in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertLessEqual(len(self.opened), 2)
+        self.assertEqual(self.pool.getStats()["acquired"], 120)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,201 @@
+"""
+This module defines the tester for the FileStore class.
+@author: Hunter Peacock and Anna Pitt
+@date: December 19, 2024
+
+Import the unittest module and the FileStore module
+Test each method with at least one unit test
+"""
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+import fileStore
+from fileStore import FileStore
+from storageLayout import StorageLayout
+from AES_CBC import AESCipher
+from transactionLog import listSegments, readFrames
+from transaction import Transaction
+from transactionRecord import encodeTransaction, unpackRecord, FLAG_POSTED
+
+class TestFileStore(unittest.TestCase):
+
+    def setUp(self):
+        print("\nSetting up a file store in a temporary directory...")
+        self.oldDir = os.getcwd()
+        self.tempDir = tempfile.TemporaryDirectory()
+        os.chdir(self.tempDir.name)
+        self.cipher = AESCipher(os.urandom(32))
+        self.key = (100, "checking", 1000)
+        self.store = FileStore("checking-100-1000.txt", self.cipher)
+        self.store.resetAccount(self.key)
+
+    def tearDown(self):
+        self.store.close()
+        os.chdir(self.oldDir)
+        self.tempDir.cleanup()
+
+    # Packs the record of a deposit numbered tNumber
+    def data(self, tNumber, flags = 0):
+        return encodeTransaction(Transaction("deposit", tNumber, 1.0, "2024-12-01"), flags)
+
+    # Appends the record of a deposit for each of the numbers
+    def append(self, store, numbers, day = 1, cipher = None):
+        cipher = self.cipher if cipher is None else cipher
+        for tNumber in numbers:
+            store.appendRecord(self.key, tNumber, day, cipher.encrypt(self.data(tNumber)))
+
+    def test_ConstructorInvalidFileName(self):
+        print("Testing to ensure the constructor throws an assertion with an empty file name")
+        self.assertRaises(AssertionError, FileStore, "", self.cipher)
+
+    def test_defaultFileNames(self):
+        print("Testing that the checkpoints and index sit next to the log by default")
+        self.store.flush()
+        for suffix in ("", ".ckpt", ".idx"):
+            self.assertTrue(os.path.exists("checking-100-1000.txt" + suffix))
+
+    def test_iterRecords(self):
+        print("Testing that records are streamed by position, encrypted or decrypted")
+        self.append(self.store, range(100, 110))
+        records = list(self.store.iterRecords(self.key, 2, 5))
+        self.assertEqual([self.cipher.decrypt(record) for record in records], [self.data(n) for n in range(102, 105)])
+        self.assertEqual(list(self.store.iterData(self.key, self.cipher, 7)), [self.data(n) for n in range(107, 110)])
+        self.assertEqual(list(self.store.iterData(self.key, self.cipher, 10)), [])
+        self.assertEqual([n for n, record in self.store.iterRecordsFrom(self.key, 108)], [108, 109])
+        self.assertEqual(list(self.store.iterDataFrom(self.key, self.cipher, 108)), [self.data(108), self.data(109)])
+
+    def test_lookups(self):
+        print("Testing lookups by transaction number and by day")
+        self.append(self.store, (100, 101), 10)
+        self.append(self.store, (102,), 12)
+        self.assertEqual(self.cipher.decrypt(self.store.getRecord(self.key, 101)), self.data(101))
+        self.assertEqual(self.store.getData(self.key, self.cipher, 102), self.data(102))
+        self.assertIsNone(self.store.getData(self.key, self.cipher, 103))
+        self.assertEqual(self.store.findDay(self.key, 11), 2)
+        self.assertEqual(self.store.findDay(self.key, 13), 3)
+
+    def test_lookupsCached(self):
+        print("Testing that repeated lookups neither check the index again nor reopen the log")
+        self.append(self.store, range(100, 110))
+        self.assertEqual(self.store.getData(self.key, self.cipher, 100), self.data(100))
+        with patch.object(fileStore, "getLogSize") as logSize, patch.object(fileStore, "readManifest") as manifest, \
+             patch("builtins.open") as opened:
+            for tNumber in range(100, 110):
+                self.assertEqual(self.store.getData(self.key, self.cipher, tNumber), self.data(tNumber))
+        logSize.assert_not_called()
+        manifest.assert_not_called()
+        opened.assert_not_called()
+        # An appended record is found once the index has been checked again
+        self.append(self.store, (110,))
+        self.assertEqual(self.store.getData(self.key, self.cipher, 110), self.data(110))
+
+    def test_lookupsAfterRotation(self):
+        print("Testing that a lookup follows its record into the archive after the log is rotated")
+        self.store.close()
+        self.store = FileStore("checking-100-1000.txt", self.cipher, segmentSize = 200)
+        self.append(self.store, (100,))
+        self.assertEqual(self.store.getData(self.key, self.cipher, 100), self.data(100))
+        self.append(self.store, range(101, 110))
+        for tNumber in range(100, 110):
+            self.assertEqual(self.store.getData(self.key, self.cipher, tNumber), self.data(tNumber))
+
+    def test_stateAndReset(self):
+        print("Testing that account state is saved, loaded and reset")
+        self.assertIsNone(self.store.loadState(self.key))
+        self.store.saveState(self.key, (1250, 100, 1))
+        self.append(self.store, (100, 101))
+        self.store.saveState(self.key, (1300, 102, 1))
+        self.store.close()
+        self.assertEqual(tuple(self.store.loadState(self.key)), (1300, 102, 1))
+        self.store.resetAccount(self.key)
+        self.assertIsNone(self.store.loadState(self.key))
+        self.assertEqual(list(self.store.iterRecords(self.key)), [])
+
+    def test_checkpointPointer(self):
+        print("Testing that recovery reads checkpoints from the newest one recorded in the index")
+        for next in range(100, 105):
+            self.store.saveState(self.key, (next * 10, next, 0))
+        newest = self.store.getLog().getIndex().getCheckpointOffset()
+        self.store.close()
+        offsets = []
+        def recordOffset(fileName, offset = 0, key = None):
+            offsets.append(offset)
+            return readFrames(fileName, offset, key)
+        with patch.object(fileStore, "readFrames", recordOffset):
+            self.assertEqual(tuple(self.store.loadState(self.key)), (1040, 104, 0))
+        self.assertEqual(offsets, [newest])
+
+    def test_stalePointer(self):
+        print("Testing that every checkpoint is tried when the recorded one cannot be read")
+        self.store.saveState(self.key, (1250, 100, 0))
+        self.store.getLog().getIndex().setCheckpointOffset(10 ** 6)
+        self.assertEqual(tuple(self.store.loadState(self.key)), (1250, 100, 0))
+
+    def test_pruneCheckpoints(self):
+        print("Testing that the checkpoint log is pruned to its newest checkpoints")
+        with patch.object(FileStore, "_PRUNE_EVERY", 4):
+            for next in range(100, 110):
+                self.store.saveState(self.key, (next * 10, next, 0))
+        self.store.flush()
+        self.assertEqual(len(list(readFrames("checking-100-1000.txt.ckpt"))), 4)
+        self.store.close()
+        self.assertEqual(tuple(self.store.loadState(self.key)), (1090, 109, 0))
+
+    def test_batchBuffered(self):
+        print("Testing that a batch is buffered until the store is flushed")
+        self.store.appendRecords([(self.key, tNumber, 1, self.cipher.encrypt(self.data(tNumber)))
+                                  for tNumber in range(100, 103)])
+        self.assertEqual(self.store.getLog().getPendingCount(), 3)
+        self.store.sync()
+        self.assertEqual(self.store.getLog().getPendingCount(), 0)
+        self.assertEqual(list(self.store.iterDataFrom(self.key, self.cipher, 100)), [self.data(n) for n in range(100, 103)])
+
+    def test_archivedSegments(self):
+        print("Testing that records of archived segments are read back in either form")
+        self.store.close()
+        self.store = FileStore("checking-100-1000.txt", self.cipher, segmentSize = 200)
+        self.append(self.store, range(100, 110))
+        self.assertTrue(any(codec == 'zlib' for base, end, codec, path in listSegments("checking-100-1000.txt")))
+        self.assertEqual(list(self.store.iterData(self.key, self.cipher)), [self.data(n) for n in range(100, 110)])
+        self.assertEqual([self.cipher.decrypt(record) for record in self.store.iterRecords(self.key, 0, 2)],
+                         [self.data(100), self.data(101)])
+        self.assertEqual(self.cipher.decrypt(self.store.getRecord(self.key, 100)), self.data(100))
+        self.assertEqual(self.store.getData(self.key, self.cipher, 109), self.data(109))
+
+    def test_sharedLog(self):
+        print("Testing that two stores keep their records apart in a shared log")
+        layout = StorageLayout("data", shardSize = 10)
+        otherKey = (100, "savings", 1001)
+        otherCipher = AESCipher(os.urandom(32))
+        stores = []
+        for key in ("checking-100-1000", "savings-100-1001"):
+            store = FileStore(layout.getLogFileName(100), self.cipher if key.startswith("checking") else otherCipher,
+                              layout.getCheckpointFileName(100), layout.getIndexFileName(100), layout, key)
+            store.resetAccount(None)
+            stores.append(store)
+        try:
+            self.append(stores[0], (100, 101))
+            self.append(stores[1], (100,), cipher = otherCipher)
+            self.append(stores[0], (102,))
+            for store in stores:
+                store.flush()
+            self.assertEqual(list(stores[0].iterData(self.key, self.cipher)), [self.data(n) for n in range(100, 103)])
+            self.assertEqual(list(stores[1].iterData(otherKey, otherCipher)), [self.data(100)])
+        finally:
+            for store in stores:
+                store.close()
+            layout.close()
+
+    def test_migrate(self):
+        print("Testing that migrate rewrites every record and empties the index and checkpoints")
+        self.append(self.store, range(100, 103))
+        self.store.saveState(self.key, (0, 103, 0))
+        self.store.migrate(lambda data: self.data(unpackRecord(data)[0], FLAG_POSTED))
+        self.assertEqual(list(self.store.iterData(self.key, self.cipher)),
+                         [self.data(n, FLAG_POSTED) for n in range(100, 103)])
+        self.assertIsNone(self.store.loadState(self.key))
+
+if __name__ == "__main__":
+    unittest.main()
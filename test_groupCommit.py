@@ -0,0 +1,109 @@
+"""
+This module defines the tester for the GroupCommitter class.
+@author: Hunter Peacock and Boden Kahn
+@date: December 9, 2024
+
+Import the unittest module and the GroupCommitter module
+Test each method with at least one unit test
+"""
+
+import os
+import tempfile
+import threading
+import unittest
+from groupCommit import GroupCommitter, _Ticket
+from transactionLog import TransactionLog, readRecords
+from bankAccount import enableGroupCommit, disableGroupCommit
+from checkingAccount import CheckingAccount
+
+class TestGroupCommit(unittest.TestCase):
+
+    def setUp(self):
+        print("\nSetting up a temporary directory for the log files...")
+        self.oldDir = os.getcwd()
+        self.tempDir = tempfile.TemporaryDirectory()
+        os.chdir(self.tempDir.name)
+
+    def tearDown(self):
+        disableGroupCommit()
+        os.chdir(self.oldDir)
+        self.tempDir.cleanup()
+
+    def test_ConstructorInvalidBatchSize(self):
+        print("Testing to ensure the constructor throws an assertion with an invalid batch size")
+        self.assertRaises(AssertionError, GroupCommitter, 0)
+
+    def test_commitIsDurable(self):
+        print("Testing that a committed record is in the file when commit returns")
+        committer = GroupCommitter(batchSize = 4, maxLatency = 1)
+        log = TransactionLog("group.txt", flushEvery = 100)
+        committer.commit(log, b"record")
+        self.assertEqual(list(readRecords("group.txt")), [b"record"])
+        committer.close()
+        log.close()
+
+    def test_commitBatchesWriters(self):
+        print("Testing that concurrent writers share fsync calls")
+        committer = GroupCommitter(batchSize = 8, maxLatency = 50)
+        logs = [TransactionLog(f"group-{index}.txt") for index in range(2)]
+        threads = [threading.Thread(target = committer.commit, args = (logs[index % 2], b"x" * index))
+                   for index in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = committer.getStats()
+        self.assertEqual(stats["records"], 16)
+        self.assertLess(stats["syncs"], 16)
+        committer.close()
+        for log in logs:
+            log.close()
+
+    def test_failedRecordInBatch(self):
+        print("Testing that only the record that failed and the ones after it get the error")
+        committer = GroupCommitter()
+        log = TransactionLog("group.txt", flushEvery = 100)
+        tickets = [_Ticket() for index in range(3)]
+        # A record that is not bytes cannot be appended
+        batch = [(log, (b"first",), tickets[0], 0), (log, ("second",), tickets[1], 0), (log, (b"third",), tickets[2], 0)]
+        committer._commitBatch(batch)
+        tickets[0].wait()
+        self.assertRaises(AssertionError, tickets[1].wait)
+        self.assertRaises(AssertionError, tickets[2].wait)
+        self.assertEqual(list(readRecords("group.txt")), [b"first"])
+        self.assertEqual(committer.getStats()["records"], 1)
+        committer.close()
+        log.close()
+
+    def test_closeRejectsCommits(self):
+        print("Testing that a closed committer refuses new records")
+        committer = GroupCommitter()
+        log = TransactionLog("group.txt")
+        committer.close()
+        self.assertRaises(AssertionError, committer.commit, log, b"late")
+        log.close()
+
+    def test_accountsUseGroupCommit(self):
+        print("Testing deposits and withdrawals from many accounts in group-commit mode")
+        committer = enableGroupCommit(batchSize = 16, maxLatency = 20)
+        accounts = [CheckingAccount(1000 + index, 100, 100.0) for index in range(4)]
+
+        def work(account):
+            for count in range(5):
+                account.deposit(10.0)
+                account.withdraw(5.0)
+
+        threads = [threading.Thread(target = work, args = (account,)) for account in accounts]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for account in accounts:
+            self.assertEqual(account.getBalance(), 125.0)
+            self.assertEqual(len(list(readRecords(account._getLogFileName()))), 10)
+            account.close()
+        self.assertEqual(committer.getStats()["records"], 40)
+
+if __name__ == "__main__":
+    unittest.main()
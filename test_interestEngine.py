@@ -0,0 +1,90 @@
+"""
+This module defines the tester for the batch interest engine.
+@author: Hunter Peacock and Boden Kahn
+@date: December 14, 2024
+
+Import the unittest module and the interestEngine module
+Test each method with at least one unit test
+"""
+
+import os
+import tempfile
+import unittest
+from interestEngine import computeInterest, runInterest
+from bankAccount import enableSharedStorage, disableSharedStorage, enableTransactionStore, disableTransactionStore
+from checkingAccount import CheckingAccount
+from savingsAccount import SavingsAccount
+from sqliteStorage import SQLiteStore
+from transactionLog import readRecords
+
+class TestInterestEngine(unittest.TestCase):
+
+    def setUp(self):
+        print("\nSetting up accounts in a temporary directory...")
+        self.oldDir = os.getcwd()
+        self.tempDir = tempfile.TemporaryDirectory()
+        os.chdir(self.tempDir.name)
+
+    def tearDown(self):
+        disableSharedStorage()
+        disableTransactionStore()
+        os.chdir(self.oldDir)
+        self.tempDir.cleanup()
+
+    def test_computeInterest(self):
+        print("Testing that interest is calculated for a whole array of balances")
+        amounts = computeInterest([10000, 0, -5000, 200012], 0.04)
+        self.assertEqual(amounts.tolist(), [400, 0, 0, 8000])
+
+    def test_runInterest(self):
+        print("Testing that every account with a positive balance is paid interest once")
+        checking = CheckingAccount(1000, 100, 200.0)
+        savings = SavingsAccount(1001, 100, 1000.0)
+        empty = SavingsAccount(1002, 100, 0.0)
+        self.assertEqual(runInterest([checking, savings, empty], "2024-12-31"), 2)
+        self.assertAlmostEqual(checking.getBalance(), 203.0)
+        self.assertAlmostEqual(savings.getBalance(), 1040.0)
+        self.assertEqual(empty.getBalance(), 0.0)
+        history = list(savings.iter_transactions())
+        self.assertEqual([(t.getTType(), t.getDate()) for t in history], [("interest", "2024-12-31")])
+        self.assertEqual(savings.getNextTransactionNum(), 101)
+        self.assertRaises(AssertionError, runInterest, [checking, checking])
+
+    def test_runInterestMatchesCalcInterest(self):
+        print("Testing that the batch run credits the same amount as calcInterest and survives recovery")
+        batch = SavingsAccount(1000, 100, 10.0)
+        single = SavingsAccount(1001, 100, 10.0)
+        for account in (batch, single):
+            account.withdraw(150.0)
+            account.deposit(900.0)
+        runInterest([batch])
+        single.calcInterest()
+        self.assertAlmostEqual(batch.getBalance(), single.getBalance())
+        self.assertEqual(batch.getOverdrawnCount(), single.getOverdrawnCount())
+        batch.close()
+        reopened = SavingsAccount(1000, 100, key = batch._key)
+        reopened.recover()
+        self.assertAlmostEqual(reopened.getBalance(), batch.getBalance())
+        reopened.close()
+
+    def test_sharedLogBulkAppend(self):
+        print("Testing that the records of accounts sharing a log are appended together")
+        enableSharedStorage("data", shardSize = 10)
+        accounts = [CheckingAccount(1000 + number, 100 + number, 100.0) for number in range(5)]
+        for account in accounts:
+            account.flush()
+        self.assertEqual(runInterest(accounts), 5)
+        fileName = accounts[0]._getLogFileName()
+        self.assertEqual(len(list(readRecords(fileName))), 5)
+        self.assertEqual([t.getAmount() for t in accounts[3].iter_transactions()], [1.5])
+
+    def test_storeBulkAppend(self):
+        print("Testing that the records of accounts kept in a storage backend are inserted together")
+        store = enableTransactionStore(SQLiteStore("bank.db", batchSize = 1000))
+        accounts = [SavingsAccount(1000 + number, 100, 50.0) for number in range(3)]
+        runInterest(accounts)
+        self.assertEqual(store.getPendingCount(), 0)
+        self.assertEqual([t.getAmount() for t in accounts[2].iter_transactions()], [2.0])
+
+if __name__ == "__main__":
+    unittest.main()
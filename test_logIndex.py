@@ -0,0 +1,124 @@
+"""
+This module defines the tester for the LogIndex class.
+@author: Hunter Peacock and Anna Pitt
+@date: December 10, 2024
+
+Import the unittest module and the LogIndex module
+Test each method with at least one unit test
+"""
+
+import os
+import tempfile
+import unittest
+from logIndex import LogIndex
+from checkingAccount import CheckingAccount
+from transaction import Transaction
+
+class TestLogIndex(unittest.TestCase):
+
+    def setUp(self):
+        print("\nSetting up an account with dated transactions in a temporary directory...")
+        self.oldDir = os.getcwd()
+        self.tempDir = tempfile.TemporaryDirectory()
+        os.chdir(self.tempDir.name)
+        self.account = CheckingAccount(1000, 100, 100.0)
+        # Records two transactions on each of three days
+        for date in ("2024-12-01", "2024-12-01", "2024-12-03", "2024-12-03", "2024-12-05", "2024-12-05"):
+            self.account._writeTransaction(Transaction("deposit", self.account.getNextTransactionNum(), 1.0, date))
+
+    def tearDown(self):
+        self.account.close()
+        os.chdir(self.oldDir)
+        self.tempDir.cleanup()
+
+    def test_indexMatchesLog(self):
+        print("Testing that the index is kept up to date on append")
+        index = self.account._getStore().getLog().getIndex()
+        self.assertEqual(len(index), 6)
+        self.assertTrue(index.isValid())
+        self.assertEqual(index.getEndOffset(), os.path.getsize(self.account._getLogFileName()))
+        self.assertEqual(index.getEntry(0)[:3], (100, index.getEntry(1)[1], 0))
+
+    def test_getTransaction(self):
+        print("Testing random access to a transaction by number")
+        transaction = self.account.getTransaction(103)
+        self.assertEqual(transaction.getTNumber(), 103)
+        self.assertEqual(transaction.getDate(), "2024-12-03")
+
+    def test_getTransactionMissing(self):
+        print("Testing looking up transaction numbers that are not in the log")
+        self.assertIsNone(self.account.getTransaction(99))
+        self.assertIsNone(self.account.getTransaction(106))
+        self.assertIsNone(CheckingAccount(1001, 100).getTransaction(100))
+
+    def test_seekDate(self):
+        print("Testing seeking to the first transaction of a date")
+        self.assertEqual(self.account.seekDate("2024-11-30"), 0)
+        self.assertEqual(self.account.seekDate("2024-12-02"), 2)
+        self.assertEqual(self.account.seekDate("2024-12-05"), 4)
+        self.assertEqual(self.account.seekDate("2024-12-06"), 6)
+
+    def test_iterTransactionsSince(self):
+        print("Testing streaming the transactions since a date")
+        numbers = [transaction.getTNumber() for transaction in self.account.iterTransactionsSince("2024-12-03")]
+        self.assertEqual(numbers, [102, 103, 104, 105])
+
+    def test_rebuildStaleIndex(self):
+        print("Testing that a stale index is rebuilt by scanning the log")
+        index = self.account._getStore().getLog().getIndex()
+        index.rebuild([])
+        self.assertEqual(index.getEndOffset(), 0)
+        self.assertEqual(self.account.getTransaction(104).getDate(), "2024-12-05")
+        self.assertEqual(len(index), 6)
+
+    def test_rebuildMissingIndex(self):
+        print("Testing that a deleted index file is rebuilt")
+        self.account.close()
+        os.remove(self.account._getLogFileName() + ".idx")
+        self.assertEqual(self.account.seekDate("2024-12-03"), 2)
+        self.assertEqual(self.account.getTransaction(105).getTNumber(), 105)
+
+    def test_indexRejectsOtherFiles(self):
+        print("Testing that a file without the index header is not valid")
+        with open("other.idx", "wb") as outfile:
+            outfile.write(b"not an index")
+        index = LogIndex("other.idx")
+        self.assertFalse(index.isValid())
+        self.assertEqual(index.getBaseOffset(), 0)
+        index.close()
+
+    def test_catchUpTail(self):
+        print("Testing that records missing from the end of the index are added from the log tail")
+        self.account.close()
+        fileName = self.account._getLogFileName() + ".idx"
+        with open(fileName, "r+b") as indexFile:
+            indexFile.truncate(os.path.getsize(fileName) - 2 * LogIndex._ENTRY.size)
+        self.assertEqual(self.account.getTransaction(105).getDate(), "2024-12-05")
+        index = self.account._getStore().getLog().getIndex()
+        self.assertTrue(index.isValid())
+        self.assertEqual(len(index), 6)
+
+    def test_lengthKeptInMemory(self):
+        print("Testing that the number of entries is counted once, when the index is opened")
+        index = LogIndex("count.idx")
+        index.add(100, 1, 0, 10)
+        index.add(101, 1, 10, 10)
+        self.assertEqual(len(index), 2)
+        index.close()
+        index = LogIndex("count.idx")
+        self.assertEqual(len(index), 2)
+        index.rebuild([(100, 1, 0, 10)])
+        self.assertEqual(len(index), 1)
+        index.close()
+
+    def test_baseOffset(self):
+        print("Testing that a new index starts at its base offset")
+        index = LogIndex("base.idx", baseOffset = 42)
+        self.assertEqual(index.getEndOffset(), 42)
+        index.close()
+        index = LogIndex("base.idx")
+        self.assertEqual(index.getBaseOffset(), 42)
+        index.close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+"""
+This module defines the tester for the fixed-point money representation.
+@author: Hunter Peacock and Anna Pitt
+@date: December 15, 2024
+
+Import the unittest module and the money module
+Test each method with at least one unit test
+"""
+
+import unittest
+from money import Cents, isAmount, toCents, toDollars, interestCents
+
+class TestMoney(unittest.TestCase):
+
+    def test_toCents(self):
+        print("\nTesting that floats are rounded to the nearest cent and Cents pass through")
+        self.assertEqual(toCents(20.25), 2025)
+        self.assertEqual(toCents(0.1 + 0.2), 30)
+        self.assertEqual(toCents(Cents(1999)), 1999)
+        self.assertRaises(AssertionError, toCents, 5)
+        self.assertRaises(AssertionError, toCents, "5.00")
+
+    def test_toDollars(self):
+        print("\nTesting the conversion back to dollars")
+        self.assertEqual(toDollars(2025), 20.25)
+        self.assertEqual(Cents(-350).toDollars(), -3.5)
+        self.assertEqual(repr(Cents(12)), "Cents(12)")
+
+    def test_isAmount(self):
+        print("\nTesting which values are accepted as amounts")
+        self.assertTrue(isAmount(1.0))
+        self.assertTrue(isAmount(Cents(100)))
+        self.assertFalse(isAmount(100))
+
+    def test_interestCents(self):
+        print("\nTesting that interest is rounded to the nearest cent")
+        self.assertEqual(interestCents(10000, 0.015), 150)
+        self.assertEqual(interestCents(3333, 0.04), 133)
+
+if __name__ == "__main__":
+    unittest.main()
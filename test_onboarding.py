@@ -0,0 +1,114 @@
+"""
+This module defines the tester for bulk Client onboarding.
+@author: Hunter Peacock and Anna Pitt
+@date: December 16, 2024
+
+Import the unittest module and the onboarding module
+Test each function with at least one unit test
+"""
+
+import multiprocessing
+import os
+import unittest
+from unittest.mock import patch
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from client import Client, setHashParameters
+from passwordKdf import enableInsecureTestKdf, disableInsecureTestKdf, TEST_CONFIG_VARIABLE
+from name import Name
+from address import Address
+from phoneNumber import PhoneNumber
+from password import Password
+from onboarding import onboardClients
+
+# A thread pool that records the password of each hash submitted
+class CountingExecutor(ThreadPoolExecutor):
+
+    def __init__(self, max_workers):
+        super().__init__(max_workers = max_workers)
+        self.submitted = []
+
+    def submit(self, function, *args):
+        self.submitted.append(args[0])
+        return super().submit(function, *args)
+
+class TestOnboarding(unittest.TestCase):
+
+    def setUp(self):
+        print("\nSetting up rows of Clients to onboard...")
+        Client.clientCounter = 100
+        self.name = Name("First", "Last")
+        self.address = Address("100 Street", "City", "VA")
+        self.phone = PhoneNumber("8041234567")
+        self.password = Password("Tester123!")
+
+    def test_onboardInRowOrder(self):
+        print("Testing that Clients are numbered in row order and bad rows are reported")
+        rows = [(self.name, self.address, self.phone, "checking", self.password),
+                (self.name, self.address, self.phone, "neither", self.password),
+                (self.name, self.address, self.phone, "savings", Password("Another12!")),
+                ("First Last", self.address, self.phone, "checking", self.password),
+                (self.name, self.address),
+                (self.name, self.address, self.phone, "checking", self.password)]
+        seen = []
+        with ThreadPoolExecutor(max_workers = 3) as pool:
+            report = onboardClients(iter(rows), pool, lambda done, total: seen.append((done, total)))
+        self.assertEqual([client.getClientNumber() for client in report.getClients()], [100, 101, 102])
+        self.assertEqual(report.getClients()[1].getClientAccounts()[0].getAccountType(), "savings")
+        self.assertTrue(report.getClients()[1]._checkPasswordMatch("Another12!"))
+        self.assertEqual([index for index, reason in report.getFailures()], [1, 3, 4])
+        self.assertEqual(report.getFailures()[0][1], "The account type must be either checking or savings.")
+        self.assertEqual(seen, [(done, 6) for done in range(1, 7)])
+        self.assertEqual(repr(report), "OnboardingReport(3 of 6 onboarded, 3 failed)")
+
+    def test_onboardProcessPool(self):
+        print("Testing that hashes are derived on a process pool sized to the cores")
+        rows = [(self.name, self.address, self.phone, "checking", self.password)] * 4
+        report = onboardClients(rows)
+        self.assertEqual([client.getClientNumber() for client in report.getClients()], [100, 101, 102, 103])
+        self.assertEqual(report.getFailures(), [])
+        self.assertTrue(report.getClients()[3]._checkPasswordMatch("Tester123!"))
+
+    def test_spawnedWorkersGetKdf(self):
+        print("Testing that spawned worker processes hash with the key derivation function of the caller")
+        with patch.dict(os.environ, {TEST_CONFIG_VARIABLE: "1"}):
+            enableInsecureTestKdf()
+        rows = [(self.name, self.address, self.phone, "checking", self.password)] * 2
+        try:
+            setHashParameters(1, 'insecure-fast')
+            with ProcessPoolExecutor(max_workers = 2, mp_context = multiprocessing.get_context("spawn")) as pool:
+                report = onboardClients(rows, pool)
+            self.assertEqual(report.getFailures(), [])
+            self.assertEqual((report.getClients()[0]._hash_algo, report.getClients()[0]._iterations), ('insecure-fast', 1))
+            self.assertTrue(report.getClients()[1]._checkPasswordMatch("Tester123!"))
+        finally:
+            disableInsecureTestKdf()
+            setHashParameters(100_000, 'sha256')
+
+    def test_invalidRowsNotHashed(self):
+        print("Testing that invalid rows are skipped without hashing their passwords")
+        badPassword = Password("Invalid12!")
+        rows = [(self.name, self.address, self.phone, "neither", badPassword),
+                (self.name, self.address, self.phone, "checking", self.password),
+                ("First Last", self.address, self.phone, "checking", badPassword)]
+        with CountingExecutor(max_workers = 2) as pool:
+            report = onboardClients(rows, pool)
+        self.assertEqual(pool.submitted, [self.password])
+        self.assertEqual([index for index, reason in report.getFailures()], [0, 2])
+
+    def test_onboardWindow(self):
+        print("Testing that only a window of hashes is in flight at once")
+        rows = [(self.name, self.address, self.phone, "checking", self.password)] * 10
+        ahead = []
+        with CountingExecutor(max_workers = 4) as pool:
+            report = onboardClients(rows, pool, lambda done, total: ahead.append(len(pool.submitted) - done), 2)
+        self.assertEqual(len(pool.submitted), 10)
+        self.assertEqual(ahead, [2] * 8 + [1, 0])
+        self.assertEqual([client.getClientNumber() for client in report.getClients()], list(range(100, 110)))
+
+    def test_onboardEmpty(self):
+        print("Testing an empty batch")
+        report = onboardClients([])
+        self.assertEqual((report.getTotal(), report.getClients(), report.getFailures()), (0, [], []))
+
+if __name__ == "__main__":
+    unittest.main()
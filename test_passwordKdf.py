@@ -0,0 +1,69 @@
+"""
+This module defines the tester for the password key derivation backends.
+@author: Hunter Peacock and Anna Pitt
+@date: December 17, 2024
+
+Import the unittest module and the passwordKdf module
+Test each function with at least one unit test
+"""
+
+import hashlib
+import os
+import unittest
+from unittest.mock import patch
+from passwordKdf import (Pbkdf2Kdf, ScryptKdf, InsecureFastKdf, getKdf, isKdfAvailable, enableInsecureTestKdf,
+                         disableInsecureTestKdf, encodeHashRecord, decodeHashRecord, TEST_CONFIG_VARIABLE)
+
+class TestPasswordKdf(unittest.TestCase):
+
+    def tearDown(self):
+        disableInsecureTestKdf()
+
+    def test_getKdf(self):
+        print("\nTesting that each name selects its backend")
+        self.assertIsInstance(getKdf('sha256'), Pbkdf2Kdf)
+        self.assertIsInstance(getKdf('scrypt'), ScryptKdf)
+        self.assertRaises(AssertionError, getKdf, 'md7')
+        self.assertRaises(AssertionError, getKdf, 'insecure-fast')
+
+    def test_pbkdf2(self):
+        print("\nTesting that the PBKDF2 backend matches hashlib")
+        self.assertEqual(getKdf('sha256').derive(b"secret", b"salt", 1000),
+                         hashlib.pbkdf2_hmac('sha256', b"secret", b"salt", 1000))
+        self.assertEqual(Pbkdf2Kdf('sha256').roundCost(123_456), 123_000)
+
+    def test_scrypt(self):
+        print("\nTesting the scrypt backend")
+        kdf = ScryptKdf()
+        self.assertEqual(len(kdf.derive(b"secret", b"salt", 1024)), 32)
+        self.assertNotEqual(kdf.derive(b"secret", b"salt", 1024), kdf.derive(b"secret", b"pepper", 1024))
+        self.assertEqual(kdf.roundCost(20_000), 2 ** 14)
+        self.assertEqual(kdf.getDefaultCost(), 2 ** 14)
+
+    def test_kdfAvailable(self):
+        print("\nTesting that only digests PBKDF2 can use are available")
+        self.assertTrue(isKdfAvailable('sha256'))
+        self.assertTrue(isKdfAvailable('scrypt'))
+        self.assertFalse(isKdfAvailable('shake_128'))
+        self.assertFalse(isKdfAvailable('no-such-digest'))
+        self.assertRaises(AssertionError, getKdf, 'shake_256')
+
+    def test_insecureOnlyInTests(self):
+        print("\nTesting that the fast backend can only be enabled by a test configuration")
+        with patch.dict(os.environ, {TEST_CONFIG_VARIABLE: "0"}):
+            self.assertRaises(AssertionError, enableInsecureTestKdf)
+        self.assertFalse(isKdfAvailable('insecure-fast'))
+        with patch.dict(os.environ, {TEST_CONFIG_VARIABLE: "1"}):
+            enableInsecureTestKdf()
+        self.assertIsInstance(getKdf('insecure-fast'), InsecureFastKdf)
+        self.assertEqual(getKdf('insecure-fast').derive(b"secret", b"salt", 1), hashlib.sha256(b"saltsecret").digest())
+
+    def test_hashRecord(self):
+        print("\nTesting that hash records are encoded with their version")
+        record = (b"\x01\x02", 100_000, 'sha256', b"\xff")
+        self.assertEqual(encodeHashRecord(record), "v1$sha256$100000$0102$ff")
+        self.assertEqual(decodeHashRecord(encodeHashRecord(record)), record)
+        self.assertRaises(AssertionError, decodeHashRecord, "v2$sha256$100000$0102$ff")
+
+if __name__ == "__main__":
+    unittest.main()
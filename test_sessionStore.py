@@ -0,0 +1,86 @@
+"""
+This module defines the tester for the SessionStore class.
+@author: Hunter Peacock and Anna Pitt
+@date: December 18, 2024
+
+Import the unittest module and the SessionStore module
+Test each method with at least one unit test
+"""
+
+import unittest
+from sessionStore import SessionStore
+
+class TestSessionStore(unittest.TestCase):
+
+    def setUp(self):
+        print("\nSetting up a session store with a manual clock...")
+        self.now = 1000.0
+        self.store = SessionStore(b"k" * 32, ttl = 60, maxSessions = 3, clock = lambda: self.now)
+
+    def test_ConstructorInvalid(self):
+        print("Testing to ensure the constructor throws an assertion with invalid arguments")
+        self.assertRaises(AssertionError, SessionStore, b"short")
+        self.assertRaises(AssertionError, SessionStore, None, 0)
+        self.assertRaises(AssertionError, SessionStore, None, 60, 0)
+
+    def test_issueAndValidate(self):
+        print("Testing that a token is only valid for its Client")
+        token = self.store.issue(100)
+        self.assertTrue(self.store.validate(token, 100))
+        self.assertFalse(self.store.validate(token, 101))
+        self.assertEqual(len(self.store), 1)
+
+    def test_forgedTokens(self):
+        print("Testing that forged and malformed tokens are refused")
+        token = self.store.issue(100)
+        payload, signature = token.split(".")
+        other = SessionStore(b"x" * 32, clock = lambda: self.now)
+        self.assertFalse(self.store.validate(other.issue(100), 100))
+        self.assertFalse(self.store.validate(payload + "." + signature[:-2] + "AA", 100))
+        self.assertFalse(self.store.validate("not a token", 100))
+        self.assertFalse(self.store.validate("!!.??", 100))
+        self.assertFalse(self.store.validate(None, 100))
+
+    def test_expiry(self):
+        print("Testing that sessions expire and are purged")
+        token = self.store.issue(100)
+        self.now += 59
+        self.assertTrue(self.store.validate(token, 100))
+        self.now += 1
+        self.assertFalse(self.store.validate(token, 100))
+        self.assertEqual(self.store.purgeExpired(), 1)
+        self.assertEqual(len(self.store), 0)
+
+    def test_boundedEviction(self):
+        print("Testing that the store evicts expired sessions first and then the oldest")
+        first = self.store.issue(100)
+        self.now += 30
+        second = self.store.issue(101)
+        third = self.store.issue(102)
+        fourth = self.store.issue(103)
+        self.assertFalse(self.store.validate(first, 100))
+        self.assertTrue(self.store.validate(second, 101))
+        self.now += 60
+        fifth = self.store.issue(104)
+        self.assertEqual(len(self.store), 1)
+        self.assertTrue(self.store.validate(fifth, 104))
+        for count in range(3):
+            self.store.issue(105)
+        self.assertFalse(self.store.validate(fifth, 104))
+        self.assertEqual(len(self.store), 3)
+
+    def test_revoke(self):
+        print("Testing that sessions are revoked one at a time or by Client")
+        first = self.store.issue(100)
+        second = self.store.issue(100)
+        other = self.store.issue(101)
+        self.assertTrue(self.store.revoke(first))
+        self.assertFalse(self.store.revoke(first))
+        self.assertFalse(self.store.validate(first, 100))
+        self.assertTrue(self.store.validate(second, 100))
+        self.assertEqual(self.store.revokeClient(100), 1)
+        self.assertFalse(self.store.validate(second, 100))
+        self.assertTrue(self.store.validate(other, 101))
+
+if __name__ == "__main__":
+    unittest.main()
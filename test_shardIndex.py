@@ -0,0 +1,109 @@
+"""
+This module defines the tester for the ShardIndex and AccountIndex classes.
+@author: Hunter Peacock, Boden Kahn, and Anna Pitt
+@date: December 19, 2024
+
+Import the unittest module and the ShardIndex module
+Test each method with at least one unit test
+"""
+
+import os
+import tempfile
+import unittest
+from shardIndex import ShardIndex
+
+class TestShardIndex(unittest.TestCase):
+
+    def setUp(self):
+        print("\nSetting up a shard index in a temporary directory...")
+        self.oldDir = os.getcwd()
+        self.tempDir = tempfile.TemporaryDirectory()
+        os.chdir(self.tempDir.name)
+        self.shard = ShardIndex("index.idx")
+
+    def tearDown(self):
+        self.shard.close()
+        os.chdir(self.oldDir)
+        self.tempDir.cleanup()
+
+    def test_ConstructorInvalidFileName(self):
+        print("Testing to ensure the constructor throws an assertion with an empty file name")
+        self.assertRaises(AssertionError, ShardIndex, "")
+        self.assertRaises(AssertionError, self.shard.getAccountIndex, "")
+
+    def test_accountsKeptApart(self):
+        print("Testing that the entries of each account are kept apart in one file and read back")
+        checking = self.shard.getAccountIndex("checking-100-1000")
+        savings = self.shard.getAccountIndex("savings-100-1001", baseOffset = 20)
+        checking.add(100, 1, 0, 20)
+        savings.add(100, 1, 20, 20)
+        checking.add(101, 2, 40, 20)
+        checking.setCheckpointOffset(64)
+        self.shard.close()
+        self.assertEqual(os.listdir("."), ["index.idx"])
+        self.shard = ShardIndex("index.idx")
+        checking = self.shard.getAccountIndex("checking-100-1000")
+        savings = self.shard.getAccountIndex("savings-100-1001")
+        self.assertEqual([checking.getEntry(i)[0] for i in range(len(checking))], [100, 101])
+        self.assertEqual(checking.findTransaction(101), 1)
+        self.assertEqual(checking.getEndOffset(), 60)
+        self.assertEqual(checking.getCheckpointOffset(), 64)
+        self.assertEqual(len(savings), 1)
+        self.assertEqual(savings.getBaseOffset(), 20)
+        self.assertIsNone(savings.getCheckpointOffset())
+
+    def test_truncate(self):
+        print("Testing that truncating one account starts its entries again from a new base offset")
+        checking = self.shard.getAccountIndex("checking-100-1000")
+        savings = self.shard.getAccountIndex("savings-100-1001")
+        checking.add(100, 1, 0, 20)
+        savings.add(100, 1, 20, 20)
+        checking = self.shard.getAccountIndex("checking-100-1000", truncate = True, baseOffset = 40)
+        self.shard.close()
+        self.shard = ShardIndex("index.idx")
+        checking = self.shard.getAccountIndex("checking-100-1000")
+        self.assertEqual(len(checking), 0)
+        self.assertEqual(checking.getEndOffset(), 40)
+        self.assertEqual(len(self.shard.getAccountIndex("savings-100-1001")), 1)
+
+    def test_rebuild(self):
+        print("Testing that a rebuild replaces the entries and keeps the checkpoint offset")
+        checking = self.shard.getAccountIndex("checking-100-1000")
+        checking.add(100, 1, 0, 20)
+        checking.setCheckpointOffset(8)
+        checking.add(None, None, 20, 20)
+        self.assertFalse(checking.isValid())
+        checking.rebuild([(100, 1, 0, 20), (101, 1, 20, 20)])
+        self.assertTrue(checking.isValid())
+        self.shard.close()
+        self.shard = ShardIndex("index.idx")
+        checking = self.shard.getAccountIndex("checking-100-1000")
+        self.assertEqual(len(checking), 2)
+        self.assertEqual(checking.getCheckpointOffset(), 8)
+
+    def test_tornFrame(self):
+        print("Testing that a frame torn by a crash is cut off when the file is opened")
+        checking = self.shard.getAccountIndex("checking-100-1000")
+        checking.add(100, 1, 0, 20)
+        checking.add(101, 1, 20, 20)
+        self.shard.close()
+        with open("index.idx", "r+b") as indexFile:
+            indexFile.truncate(os.path.getsize("index.idx") - 3)
+        self.shard = ShardIndex("index.idx")
+        checking = self.shard.getAccountIndex("checking-100-1000")
+        self.assertEqual(len(checking), 1)
+        checking.add(101, 1, 20, 20)
+        self.shard.close()
+        self.shard = ShardIndex("index.idx")
+        self.assertEqual(len(self.shard.getAccountIndex("checking-100-1000")), 2)
+
+    def test_otherFile(self):
+        print("Testing that a file without the shard index header is started again")
+        with open("other.idx", "wb") as outfile:
+            outfile.write(b"not an index")
+        shard = ShardIndex("other.idx")
+        self.assertEqual(len(shard.getAccountIndex("checking-100-1000")), 0)
+        shard.close()
+
+if __name__ == "__main__":
+    unittest.main()
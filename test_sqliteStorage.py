@@ -0,0 +1,145 @@
+"""
+This module defines the tester for the SQLiteStore class.
+@author: Hunter Peacock and Anna Pitt
+@date: December 11, 2024
+
+Import the unittest module and the SQLiteStore module
+Test each method with at least one unit test
+"""
+
+import os
+import tempfile
+import threading
+import unittest
+from sqliteStorage import SQLiteStore
+from bankAccount import enableTransactionStore, disableTransactionStore
+from checkingAccount import CheckingAccount
+from savingsAccount import SavingsAccount
+from transaction import Transaction
+
+class TestSQLiteStore(unittest.TestCase):
+
+    def setUp(self):
+        print("\nSetting up an SQLite store in a temporary directory...")
+        self.oldDir = os.getcwd()
+        self.tempDir = tempfile.TemporaryDirectory()
+        os.chdir(self.tempDir.name)
+        self.store = SQLiteStore("bank.db", batchSize = 4)
+        self.key = (100, "checking", 1000)
+
+    def tearDown(self):
+        disableTransactionStore()
+        self.store.close()
+        os.chdir(self.oldDir)
+        self.tempDir.cleanup()
+
+    def test_ConstructorInvalidBatchSize(self):
+        print("Testing to ensure the constructor throws an assertion with an invalid batch size")
+        self.assertRaises(AssertionError, SQLiteStore, "other.db", 0)
+
+    def test_walMode(self):
+        print("Testing that the database runs in WAL mode")
+        with self.store.getPool().connection() as connection:
+            self.assertEqual(connection.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+
+    def test_batchedInserts(self):
+        print("Testing that records are buffered until the batch is full")
+        for tNumber in range(100, 103):
+            self.store.appendRecord(self.key, tNumber, 1, b"data")
+        self.assertEqual(self.store.getPendingCount(), 3)
+        self.store.appendRecord(self.key, 103, 1, b"data")
+        self.assertEqual(self.store.getPendingCount(), 0)
+
+    def test_iterRecords(self):
+        print("Testing that records are streamed by position across pages")
+        SQLiteStore._PAGE = 3
+        try:
+            for tNumber in range(100, 110):
+                self.store.appendRecord(self.key, tNumber, tNumber, bytes([tNumber]))
+            self.store.appendRecord((100, "savings", 1000), 100, 1, b"other")
+            self.assertEqual(list(self.store.iterRecords(self.key)), [bytes([n]) for n in range(100, 110)])
+            self.assertEqual(list(self.store.iterRecords(self.key, 2, 7)), [bytes([n]) for n in range(102, 107)])
+            self.assertEqual(list(self.store.iterRecords(self.key, 4, 4)), [])
+            self.assertEqual([n for n, data in self.store.iterRecordsFrom(self.key, 105)], list(range(105, 110)))
+        finally:
+            SQLiteStore._PAGE = 1024
+
+    def test_lookups(self):
+        print("Testing lookups by transaction number and by day")
+        for tNumber, day in ((100, 10), (101, 10), (102, 12)):
+            self.store.appendRecord(self.key, tNumber, day, b"%d" % tNumber)
+        self.assertEqual(self.store.getRecord(self.key, 101), b"101")
+        self.assertIsNone(self.store.getRecord(self.key, 103))
+        self.assertEqual(self.store.findDay(self.key, 11), 2)
+        self.assertEqual(self.store.findDay(self.key, 13), 3)
+
+    def test_stateAndReset(self):
+        print("Testing that account state is saved, loaded and reset")
+        self.assertIsNone(self.store.loadState(self.key))
+        self.store.saveState(self.key, (1250, 104, 1))
+        self.store.appendRecord(self.key, 104, 1, b"data")
+        self.assertEqual(self.store.loadState(self.key), (1250, 104, 1))
+        self.store.resetAccount(self.key)
+        self.assertIsNone(self.store.loadState(self.key))
+        self.assertEqual(list(self.store.iterRecords(self.key)), [])
+
+    def test_accountHistory(self):
+        print("Testing an account that keeps its history in the store instead of a log file")
+        enableTransactionStore(self.store)
+        account = CheckingAccount(1000, 100, 100.0)
+        for date in ("2024-12-01", "2024-12-02", "2024-12-03"):
+            account._writeTransaction(Transaction("deposit", account.getNextTransactionNum(), 1.0, date))
+        self.assertEqual([t.getTNumber() for t in account.iter_transactions(1)], [101, 102])
+        self.assertEqual(len(list(account.iter_transactions())), 3)
+        self.assertEqual(account.getTransaction(102).getDate(), "2024-12-03")
+        self.assertIsNone(account.getTransaction(103))
+        self.assertEqual(account.seekDate("2024-12-02"), 1)
+        self.assertIn("deposit", account._readTransactions())
+        account.close()
+        self.assertEqual(sorted(name for name in os.listdir(".") if not name.startswith("bank.db")), [])
+
+    def test_recoverFromStore(self):
+        print("Testing that an account is recovered from its saved state and later records")
+        enableTransactionStore(self.store)
+        savings = SavingsAccount(1000, 100, 10.0)
+        savings.deposit(5.0)
+        savings.withdraw(20.0)
+        savings.checkpoint()
+        savings.deposit(50.0)
+        savings.close()
+        restored = SavingsAccount(1000, 100, key = savings._key)
+        self.assertEqual(restored.recover(), 1)
+        self.assertAlmostEqual(restored.getBalance(), savings.getBalance())
+        self.assertEqual(restored.getOverdrawnCount(), 1)
+        self.assertEqual(restored.getNextTransactionNum(), savings.getNextTransactionNum())
+
+    def test_newAccountResetsKey(self):
+        print("Testing that a new account does not read records stored by an earlier one")
+        enableTransactionStore(self.store)
+        first = CheckingAccount(1000, 100, 100.0)
+        first.deposit(1.0)
+        second = CheckingAccount(1000, 100, 100.0)
+        second.deposit(2.0)
+        self.assertEqual([t.getAmount() for t in second.iter_transactions()], [2.0])
+
+    def test_poolSharedByThreads(self):
+        print("Testing that worker threads drive accounts through the bounded connection pool")
+        enableTransactionStore(SQLiteStore("pooled.db", batchSize = 8, poolSize = 2))
+        accounts = [CheckingAccount(1000 + number, 100, 0.0) for number in range(4)]
+        def work(account):
+            for count in range(25):
+                account.deposit(1.0)
+            account.flush()
+            self.assertEqual(len(list(account.iter_transactions())), 25)
+        threads = [threading.Thread(target = work, args = (account,)) for account in accounts]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = accounts[0]._store.getPool().getStats()
+        self.assertLessEqual(stats["created"], 2)
+        self.assertGreater(stats["acquired"], 4)
+        self.assertEqual(sum(len(list(account.iter_transactions())) for account in accounts), 100)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,227 @@
+"""
+This module defines the tester for the StorageLayout class.
+@author: Hunter Peacock and Boden Kahn
+@date: December 11, 2024
+
+Import the unittest module and the StorageLayout module
+Test each method with at least one unit test
+"""
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from storageLayout import StorageLayout
+from bankAccount import BankAccount, enableSharedStorage, disableSharedStorage
+from checkingAccount import CheckingAccount
+from savingsAccount import SavingsAccount
+from transaction import Transaction
+from transactionLog import listSegments, readFrames
+
+class TestStorageLayout(unittest.TestCase):
+
+    def setUp(self):
+        print("\nSetting up shared storage in a temporary directory...")
+        self.oldDir = os.getcwd()
+        self.tempDir = tempfile.TemporaryDirectory()
+        os.chdir(self.tempDir.name)
+        self.layout = enableSharedStorage("data", shardSize = 10)
+
+    def tearDown(self):
+        disableSharedStorage()
+        os.chdir(self.oldDir)
+        self.tempDir.cleanup()
+
+    def test_ConstructorInvalidShardSize(self):
+        print("Testing to ensure the constructor throws an assertion with an invalid shard size")
+        self.assertRaises(AssertionError, StorageLayout, "data", 0)
+        self.assertRaises(AssertionError, StorageLayout, "")
+
+    def test_shardPaths(self):
+        print("Testing that Clients of one shard share a directory under the data root")
+        self.assertEqual(self.layout.getShardDir(105), os.path.join("data", "0000", "0000010"))
+        self.assertEqual(self.layout.getLogFileName(101), self.layout.getLogFileName(109))
+        self.assertNotEqual(self.layout.getLogFileName(109), self.layout.getLogFileName(110))
+        self.assertEqual(StorageLayout("data").getShardDir(123456), os.path.join("data", "0123", "0123456"))
+
+    def test_accountsShareOneLog(self):
+        print("Testing that every account of a shard appends to the same log")
+        checking = CheckingAccount(1000, 100, 100.0)
+        savings = SavingsAccount(1000, 100, 100.0)
+        other = CheckingAccount(1001, 101, 100.0)
+        checking.deposit(10.0)
+        savings.deposit(20.0)
+        other.deposit(30.0)
+        checking.withdraw(5.0)
+        for account in (checking, savings, other):
+            account.flush()
+        self.assertEqual(os.listdir("."), ["data"])
+        fileName = self.layout.getLogFileName(100)
+        self.assertEqual(len(list(readFrames(fileName))), 4)
+        self.assertEqual(len(list(readFrames(fileName, 0, checking._getRecordKey()))), 2)
+        # The accounts of a shard are indexed in one file as well
+        names = os.listdir(self.layout.getShardDir(100))
+        self.assertEqual([name for name in names if name.endswith(".idx")], ["index.idx"])
+        self.assertFalse(os.path.exists(os.path.join(self.layout.getShardDir(100), "index")))
+        for account in (checking, savings, other):
+            account.close()
+
+    def test_readsOnlyOwnRecords(self):
+        print("Testing that the history APIs skip the records of other accounts")
+        checking = CheckingAccount(1000, 100, 100.0)
+        savings = SavingsAccount(1000, 100, 100.0)
+        for date in ("2024-12-01", "2024-12-03", "2024-12-05"):
+            checking._writeTransaction(Transaction("deposit", checking.getNextTransactionNum(), 1.0, date))
+            savings._writeTransaction(Transaction("deposit", savings.getNextTransactionNum(), 2.0, date))
+        for mapped in (True, False):
+            amounts = [t.getAmount() for t in checking.iter_transactions(mapped = mapped)]
+            self.assertEqual(amounts, [1.0, 1.0, 1.0])
+        self.assertEqual(savings.getTransaction(101).getAmount(), 2.0)
+        self.assertEqual(savings.seekDate("2024-12-02"), 1)
+        self.assertEqual([t.getTNumber() for t in checking.iterTransactionsSince("2024-12-04")], [102])
+        checking.close()
+        savings.close()
+
+    def test_newAccountIgnoresEarlierRecords(self):
+        print("Testing that a new account with a reused number starts after the earlier records")
+        first = CheckingAccount(1000, 100, 100.0)
+        first.deposit(10.0)
+        first.close()
+        second = CheckingAccount(1000, 100, 50.0)
+        second.deposit(1.0)
+        self.assertEqual([t.getAmount() for t in second.iter_transactions()], [1.0])
+        # Losing the index falls back to skipping records that do not decrypt
+        second.close()
+        self.layout.close()
+        os.remove(self.layout.getIndexFileName(100))
+        second._resume = True
+        self.assertEqual([t.getAmount() for t in second.iter_transactions()], [1.0])
+        second.close()
+
+    def test_recoverFromSharedLog(self):
+        print("Testing that an account is recovered from the shared logs after a restart")
+        savings = SavingsAccount(1000, 100, 100.0)
+        checking = CheckingAccount(1001, 100, 100.0)
+        savings.deposit(25.0)
+        checking.deposit(5.0)
+        savings.withdraw(10.0)
+        savings.close()
+        checking.close()
+        restored = SavingsAccount(1000, 100, 0.0, key = savings._key)
+        self.assertEqual(restored.recover(), 2)
+        self.assertAlmostEqual(restored.getBalance(), 115.0)
+        self.assertEqual(restored.getNextTransactionNum(), 102)
+        restored.close()
+
+    def test_sharedSegmentRotation(self):
+        print("Testing that a shared log is rotated for its shard and each account's records are archived compressed")
+        self.layout = enableSharedStorage("data", shardSize = 10, segmentSize = 400)
+        checking = CheckingAccount(1000, 100, 100.0)
+        savings = SavingsAccount(1001, 101, 100.0)
+        for date in ("2024-12-01", "2024-12-02", "2024-12-03", "2024-12-04", "2024-12-05", "2024-12-06"):
+            checking._writeTransaction(Transaction("deposit", checking.getNextTransactionNum(), 1.0, date))
+            savings._writeTransaction(Transaction("deposit", savings.getNextTransactionNum(), 2.0, date))
+        checking.flush()
+        segments = listSegments(self.layout.getLogFileName(100))
+        self.assertGreater(len(segments), 2)
+        self.assertTrue(all(codec == 'zlib' for base, end, codec, path in segments[:-1]))
+        # Each account's records are one block, encrypted with the account's own cipher
+        for base, end, codec, path in segments[:-1]:
+            blocks = list(readFrames(path, 0, checking._getRecordKey()))
+            self.assertEqual(len(blocks), 1)
+            self.assertEqual(blocks[0][2][:1], StorageLayout.SEALED_BLOCK)
+        self.assertEqual([t.getTNumber() for t in checking.iter_transactions()], list(range(100, 106)))
+        self.assertEqual([t.getAmount() for t in savings.iter_transactions(mapped = False)], [2.0] * 6)
+        self.assertEqual(savings.getTransaction(100).getDate(), "2024-12-01")
+        self.assertEqual(checking.seekDate("2024-12-04"), 3)
+        checking.close()
+        savings.close()
+        restored = CheckingAccount(1000, 100, 0.0, key = checking._key)
+        self.assertEqual(restored.recover(), 6)
+        self.assertEqual(restored.getNextTransactionNum(), 106)
+        restored.close()
+
+    def test_setSegmentPolicyShared(self):
+        print("Testing that the segment policy of a shared account applies to its whole shard")
+        account = CheckingAccount(1000, 100, 100.0)
+        account.deposit(1.0)
+        account.setSegmentPolicy(segmentSize = 200, codec = 'lzma')
+        self.assertEqual(self.layout.getSegmentSize(109), 200)
+        self.assertEqual(self.layout.getCodec(109), 'lzma')
+        self.assertIsNone(self.layout.getSegmentSize(110))
+        for i in range(4):
+            account.deposit(1.0)
+        account.flush()
+        self.assertGreater(len(listSegments(self.layout.getLogFileName(100))), 1)
+        self.assertEqual(len(list(account.iter_transactions())), 5)
+        self.assertFalse(any(name.startswith("checkpoints") for name in os.listdir(os.path.join(self.layout.getShardDir(100), "archive"))))
+        account.close()
+        self.assertRaises(AssertionError, self.layout.setSegmentPolicy, 100, 0)
+        self.assertRaises(AssertionError, self.layout.setSegmentPolicy, 100, 200, 'gzip')
+
+    def test_archiveWithUnknownCipher(self):
+        print("Testing that records of an account not opened since a restart are archived still encrypted")
+        checking = CheckingAccount(1000, 100, 100.0)
+        for i in range(3):
+            checking.deposit(1.0)
+        checking.close()
+        # After a restart, only another account of the shard is opened before the log is rotated
+        self.layout = enableSharedStorage("data", shardSize = 10, segmentSize = 200)
+        savings = SavingsAccount(1001, 101, 100.0)
+        for i in range(3):
+            savings.deposit(2.0)
+        savings.flush()
+        base, end, codec, path = listSegments(self.layout.getLogFileName(100))[0]
+        blocks = list(readFrames(path, 0, checking._getRecordKey()))
+        self.assertEqual([block[2][:1] for block in blocks], [StorageLayout.PACKED_BLOCK])
+        restored = CheckingAccount(1000, 100, 0.0, key = checking._key)
+        self.assertEqual([t.getAmount() for t in restored.iter_transactions()], [1.0] * 3)
+        self.assertEqual([t.getAmount() for t in savings.iter_transactions()], [2.0] * 3)
+        restored.close()
+        savings.close()
+
+    def test_pruneSharedCheckpoints(self):
+        print("Testing that the shared checkpoint log keeps only the newest checkpoints of each account")
+        checking = CheckingAccount(1000, 100, 100.0)
+        savings = SavingsAccount(1001, 101, 100.0)
+        fileName = self.layout.getCheckpointFileName(100)
+        savings.deposit(2.0)
+        savings.checkpoint()
+        with patch.object(StorageLayout, "_PRUNE_EVERY", 4):
+            for i in range(20):
+                checking.deposit(1.0)
+                checking.checkpoint()
+        checking.flush()
+        # The account that saved no newer checkpoints keeps its own
+        self.assertEqual(len(list(readFrames(fileName, 0, savings._getRecordKey()))), 2)
+        self.assertLessEqual(len(list(readFrames(fileName, 0, checking._getRecordKey()))), 2 + 4)
+        checking.deposit(1.0)
+        checking.close()
+        savings.close()
+        self.layout.close()
+        restored = CheckingAccount(1000, 100, 0.0, key = checking._key)
+        self.assertEqual(restored.recover(), 1)
+        self.assertAlmostEqual(restored.getBalance(), 121.0)
+        restored.close()
+        restored = SavingsAccount(1001, 101, 0.0, key = savings._key)
+        self.assertEqual(restored.recover(), 0)
+        self.assertAlmostEqual(restored.getBalance(), 102.0)
+        restored.close()
+
+    def test_sharedLogRestrictions(self):
+        print("Testing that per-account operations are refused on a shared log")
+        account = CheckingAccount(1000, 100, 100.0)
+        self.assertRaises(AssertionError, account.setFlushPolicy, 5)
+        self.assertRaises(AssertionError, account.migrateLog)
+
+    def test_disableSharedStorage(self):
+        print("Testing that accounts go back to files of their own once shared storage is off")
+        disableSharedStorage()
+        self.assertIsNone(BankAccount._storageLayout)
+        account = CheckingAccount(1000, 100, 100.0)
+        account.deposit(1.0)
+        account.close()
+        self.assertTrue(os.path.exists("checking-100-1000.txt"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -11,7 +11,8 @@ Test each method with at least one unit test
 import unittest
 from unittest.mock import patch
 from datetime import datetime
-from transaction import Transaction
+from money import Cents
+from transaction import Transaction, parseTransaction
 
 """ Define test testTransaction class by extending the unittest.TestCase class"""
 
@@ -238,5 +239,29 @@ class TestTransaction(unittest.TestCase):
         # Checks to ensure that casting the transaction to a String type produces the correct results
         self.assertEqual(repr(self.transaction1), strCheck)     
         
+    # Tests that amounts are held exactly in cents
+    def test_cents(self):
+        print("\nTesting that amounts are held exactly in cents")
+        transaction = Transaction("deposit", 105, Cents(1999))
+        self.assertEqual(transaction.getAmount(), 19.99)
+        self.assertEqual(transaction.getCents(), 1999)
+        self.assertEqual(Transaction("deposit", 105, 0.1 + 0.2), Transaction("deposit", 105, 0.3))
+        self.assertRaises(AssertionError, Transaction, "deposit", 105, Cents(-1))
+
+    # Tests that a transaction can be rebuilt from its String representation
+    def test_parseTransaction(self):
+        print("\nTesting parsing a transaction from its String representation")
+        parsed = parseTransaction(str(self.transaction2))
+        self.assertEqual(parsed, self.transaction2)
+        self.assertEqual(parsed.getTType(), "withdrawal")
+        self.assertEqual(parsed.getDate(), TestTransaction.currentDate)
+
+    # Tests that the date of a recorded transaction can be passed in
+    def test_constructorWithDate(self):
+        print("\nTesting the constructor with a recorded date")
+        transaction = Transaction("deposit", 105, 1.0, "2024-12-06")
+        self.assertEqual(transaction.getDate(), "2024-12-06")
+        self.assertEqual(transaction.getMonth(), "12")
+
 if __name__ == '__main__':
     unittest.main()
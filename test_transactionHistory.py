@@ -0,0 +1,53 @@
+"""
+This module defines the tester for the TransactionHistory class.
+@author: Hunter Peacock and Anna Pitt
+@date: December 15, 2024
+
+Import the unittest module and the TransactionHistory module
+Test each method with at least one unit test
+"""
+
+import unittest
+from money import Cents
+from transaction import Transaction
+from transactionHistory import TransactionHistory
+
+class TestTransactionHistory(unittest.TestCase):
+
+    def setUp(self):
+        print("\nSetting up a transaction history...")
+        self.history = TransactionHistory()
+        self.transactions = [Transaction("deposit", 100, 25.5, "2024-12-01"),
+                             Transaction("withdrawal", 101, Cents(1999), "2024-12-02"),
+                             Transaction("penalty", 102, 10.0, "2024-12-31")]
+        self.history.extend(self.transactions)
+
+    def test_appendAndIndex(self):
+        print("Testing that transactions are rebuilt from their rows")
+        self.assertEqual(len(self.history), 3)
+        self.assertEqual(self.history[1], self.transactions[1])
+        self.assertEqual(self.history[-1].getTType(), "penalty")
+        self.assertEqual(self.history[0].getAmount(), 25.5)
+        self.assertEqual(self.history[2].getDate(), "2024-12-31")
+        self.assertRaises(IndexError, self.history.__getitem__, 3)
+
+    def test_sliceAndIterate(self):
+        print("Testing slices and iteration over the history")
+        self.assertEqual(self.history[1:], self.transactions[1:])
+        self.assertEqual(list(self.history), self.transactions)
+        self.assertEqual(list(self.history.getCents()), [2550, 1999, 1000])
+
+    def test_appendInvalid(self):
+        print("Testing that a transaction with a bad date leaves the history unchanged")
+        self.assertRaises(AssertionError, self.history.append, "deposit")
+        self.assertRaises(ValueError, self.history.append, Transaction("deposit", 103, 1.0, "2024-2-30"))
+        self.assertEqual(len(self.history), 3)
+
+    def test_memoryUsage(self):
+        print("Testing that each row is held in a few bytes")
+        for tNumber in range(103, 1103):
+            self.history.append(Transaction("interest", tNumber, 1.0, "2024-12-15"))
+        self.assertLess(self.history.getMemoryUsage(), 40 * len(self.history))
+
+if __name__ == "__main__":
+    unittest.main()
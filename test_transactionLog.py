@@ -0,0 +1,198 @@
+"""
+This module defines the tester for the TransactionLog class.
+@author: Hunter Peacock and Boden Kahn
+@date: December 9, 2024
+
+Import the unittest module and the TransactionLog module
+Test each method with at least one unit test
+"""
+
+import os
+import tempfile
+import time
+import unittest
+from transactionLog import TransactionLog, readRecords, mapRecords, listSegments, getLogSize, readManifest
+from checkingAccount import CheckingAccount
+from savingsAccount import SavingsAccount
+
+class TestTransactionLog(unittest.TestCase):
+
+    def setUp(self):
+        # Works inside a temporary directory so the log files do not collect in the project
+        print("\nSetting up a temporary directory for the log files...")
+        self.oldDir = os.getcwd()
+        self.tempDir = tempfile.TemporaryDirectory()
+        os.chdir(self.tempDir.name)
+        self.fileName = "test-log.txt"
+
+    def tearDown(self):
+        os.chdir(self.oldDir)
+        self.tempDir.cleanup()
+
+    def test_ConstructorInvalidFlushEvery(self):
+        print("Testing to ensure the constructor throws an assertion with an invalid flush count")
+        self.assertRaises(AssertionError, TransactionLog, self.fileName, 0)
+
+    def test_appendPerRecord(self):
+        print("Testing that the default policy writes every record immediately")
+        log = TransactionLog(self.fileName)
+        log.append(b"first")
+        log.append(b"second")
+        self.assertEqual(log.getPendingCount(), 0)
+        self.assertEqual(list(readRecords(self.fileName)), [b"first", b"second"])
+        log.close()
+
+    def test_appendEveryNRecords(self):
+        print("Testing that records are buffered until the flush count is reached")
+        log = TransactionLog(self.fileName, flushEvery = 3)
+        log.append(b"one")
+        log.append(b"two")
+        self.assertEqual(log.getPendingCount(), 2)
+        self.assertEqual(list(readRecords(self.fileName)), [])
+        log.append(b"three")
+        self.assertEqual(log.getPendingCount(), 0)
+        self.assertEqual(len(list(readRecords(self.fileName))), 3)
+        log.close()
+
+    def test_appendFlushInterval(self):
+        print("Testing that a record older than the flush interval forces a write")
+        log = TransactionLog(self.fileName, flushEvery = 100, flushInterval = 1)
+        log._lastFlush -= 1.0
+        log.append(b"late")
+        self.assertEqual(log.getPendingCount(), 0)
+        log.close()
+
+    def test_flushIntervalTimer(self):
+        print("Testing that a buffered record is written once the flush interval passes with no more appends")
+        log = TransactionLog(self.fileName, flushEvery = 100, flushInterval = 50)
+        log.append(b"idle")
+        self.assertEqual(log.getPendingCount(), 1)
+        deadline = time.monotonic() + 5
+        while log.getPendingCount() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(list(readRecords(self.fileName)), [b"idle"])
+        # Writing the buffer early stops the timer
+        log.append(b"flushed")
+        log.flush()
+        self.assertIsNone(log._timer)
+        log.close()
+
+    def test_closeFlushesBuffer(self):
+        print("Testing that closing the log writes out buffered records")
+        log = TransactionLog(self.fileName, flushEvery = 10)
+        log.append(b"buffered")
+        log.close()
+        self.assertEqual(list(readRecords(self.fileName)), [b"buffered"])
+        self.assertRaises(AssertionError, log.append, b"closed")
+
+    def test_appendKeepsExistingRecords(self):
+        print("Testing that reopening a log appends instead of truncating")
+        log = TransactionLog(self.fileName)
+        log.append(b"first")
+        log.close()
+        log = TransactionLog(self.fileName)
+        log.append(b"second")
+        log.close()
+        self.assertEqual(list(readRecords(self.fileName)), [b"first", b"second"])
+
+    def test_checkingHistorySurvives(self):
+        print("Testing that a checking account keeps every record in its log")
+        account = CheckingAccount(1000, 100, 100.0)
+        account.deposit(50.0)
+        account.withdraw(20.0)
+        account.flush()
+        self.assertEqual(len(list(readRecords("checking-100-1000.txt"))), 2)
+        self.assertIn("withdrawal", account._readTransactions())
+        account.close()
+
+    def test_savingsBufferedPolicy(self):
+        print("Testing a savings account with a buffered flush policy")
+        account = SavingsAccount(1000, 100, 100.0)
+        account.setFlushPolicy(flushEvery = 5)
+        account.deposit(10.0)
+        account.deposit(10.0)
+        self.assertEqual(account._getStore().getLog().getPendingCount(), 2)
+        self.assertIn("deposit", account._readTransactions())
+        self.assertEqual(account._getStore().getLog().getPendingCount(), 0)
+        account.close()
+
+    def test_mapRecords(self):
+        print("Testing that the memory-mapped reader returns the same records")
+        log = TransactionLog(self.fileName)
+        for record in (b"first", b"with\nnewline", b"", b"x" * 300):
+            log.append(record)
+        log.close()
+        mapped = [bytes(record) for record in mapRecords(self.fileName)]
+        self.assertEqual(mapped, list(readRecords(self.fileName)))
+        self.assertTrue(all(isinstance(record, memoryview) for record in mapRecords(self.fileName)))
+
+    def test_mapRecordsOffset(self):
+        print("Testing the memory-mapped reader from an offset and on an empty file")
+        log = TransactionLog(self.fileName)
+        self.assertEqual(list(mapRecords(self.fileName)), [])
+        log.append(b"first")
+        log.append(b"second")
+        log.close()
+        self.assertEqual([bytes(record) for record in mapRecords(self.fileName, 8)], [b"second"])
+
+    def test_keyedFrames(self):
+        print("Testing that records framed with a key are read back per key")
+        log = TransactionLog(self.fileName)
+        log.append(b"a1", key = "a")
+        log.append(b"b1", key = "b")
+        log.append(b"a2", key = "a")
+        log.close()
+        self.assertEqual(list(readRecords(self.fileName, 0, "a")), [b"a1", b"a2"])
+        self.assertEqual([bytes(record) for record in mapRecords(self.fileName, 0, "b")], [b"b1"])
+        self.assertEqual(len(list(readRecords(self.fileName))), 3)
+        self.assertRaises(AssertionError, log.append, b"x", key = "bad:key")
+
+    def test_appendMany(self):
+        print("Testing that a batch of records is written out together whatever the flush policy")
+        log = TransactionLog(self.fileName, flushEvery = 100)
+        log.appendMany([(b"one", None, None, None, "a"), (b"two", None, None, None, None)])
+        self.assertEqual(log.getPendingCount(), 0)
+        self.assertEqual(list(readRecords(self.fileName)), [b"one", b"two"])
+        self.assertEqual(list(readRecords(self.fileName, 0, "a")), [b"one"])
+        log.close()
+
+    def test_segmentRotation(self):
+        print("Testing that the log rolls over into sealed segments with logical offsets")
+        log = TransactionLog(self.fileName, segmentSize = 20)
+        for record in (b"a" * 10, b"b" * 10, b"c" * 10):
+            log.append(record)
+        self.assertEqual(log.getEndOffset(), 42)
+        log.close()
+        segments = listSegments(self.fileName)
+        self.assertEqual([(base, end, codec) for base, end, codec, path in segments],
+                         [(0, 28, "raw"), (28, 42, None)])
+        self.assertEqual(list(readRecords(segments[0][3])), [b"a" * 10, b"b" * 10])
+        self.assertEqual(getLogSize(self.fileName), 42)
+        log = TransactionLog(self.fileName, segmentSize = 20)
+        self.assertEqual(log.getEndOffset(), 42)
+        log.close()
+
+    def test_truncateRemovesSegments(self):
+        print("Testing that truncating a segmented log removes its archived segments")
+        log = TransactionLog(self.fileName, segmentSize = 5)
+        log.append(b"sealed")
+        log.close()
+        path = listSegments(self.fileName)[0][3]
+        TransactionLog(self.fileName, truncate = True).close()
+        self.assertFalse(os.path.exists(path))
+        self.assertEqual(readManifest(self.fileName), (0, []))
+
+    def test_interruptedRotation(self):
+        print("Testing that a rotation interrupted before the manifest was written is finished on open")
+        log = TransactionLog(self.fileName)
+        log.append(b"sealed")
+        log.close()
+        os.replace(self.fileName, self.fileName + ".sealing")
+        log = TransactionLog(self.fileName)
+        self.assertEqual(log.getEndOffset(), 9)
+        log.close()
+        self.assertFalse(os.path.exists(self.fileName + ".sealing"))
+        self.assertEqual(listSegments(self.fileName)[0][:3], (0, 9, "raw"))
+
+if __name__ == "__main__":
+    unittest.main()
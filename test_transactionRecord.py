@@ -0,0 +1,108 @@
+"""
+This module defines the tester for the binary transaction record format.
+@author: Hunter Peacock and Boden Kahn
+@date: December 9, 2024
+
+Import the unittest module and the transactionRecord module
+Test each method with at least one unit test
+"""
+
+import os
+import tempfile
+import unittest
+from transaction import Transaction
+import struct
+from transactionRecord import (RECORD_SIZE, decodeCheckpoint, encodeCheckpoint, encodeTransaction, decodeTransaction, unpackRecord,
+                               dateToDay, dayToDate, packSegment, unpackSegment, FLAG_POSTED,
+                               encodeTransferIntent, decodeTransferIntent, encodeTransferDone,
+                               decodeTransferDone)
+from transactionLog import readRecords
+from checkingAccount import CheckingAccount
+
+class TestTransactionRecord(unittest.TestCase):
+
+    def setUp(self):
+        self.transaction = Transaction("withdrawal", 101, 20.25, "2024-12-06")
+
+    def test_encodeSize(self):
+        print("\nTesting that an encoded record has the fixed size")
+        self.assertEqual(len(encodeTransaction(self.transaction)), RECORD_SIZE)
+
+    def test_roundTrip(self):
+        print("\nTesting that a record decodes back to the same transaction")
+        decoded = decodeTransaction(encodeTransaction(self.transaction))
+        self.assertEqual(decoded, self.transaction)
+        self.assertEqual(decoded.getTType(), "withdrawal")
+        self.assertEqual(decoded.getAmount(), 20.25)
+
+    def test_unpackFields(self):
+        print("\nTesting the fields stored in a record")
+        fields = unpackRecord(encodeTransaction(self.transaction, flags = 1))
+        self.assertEqual(fields, (101, "withdrawal", 2025, dateToDay("2024-12-06"), 1))
+
+    def test_decodeTextRecord(self):
+        print("\nTesting the compatibility path for records in the text format")
+        decoded = decodeTransaction(str(self.transaction).encode())
+        self.assertEqual(decoded, self.transaction)
+
+    def test_decodeInvalidRecord(self):
+        print("\nTesting that a truncated record throws an assertion")
+        self.assertRaises(AssertionError, decodeTransaction, encodeTransaction(self.transaction)[:-1])
+
+    def test_dayConversion(self):
+        print("\nTesting the conversion between dates and day numbers")
+        self.assertEqual(dayToDate(dateToDay("2024-02-29")), "2024-02-29")
+
+    def test_migrateTextLog(self):
+        print("\nTesting reading and migrating a log that holds text records")
+        oldDir = os.getcwd()
+        with tempfile.TemporaryDirectory() as tempDir:
+            os.chdir(tempDir)
+            try:
+                account = CheckingAccount(1000, 100, 100.0)
+                account.deposit(5.0)
+                # Appends a record in the older text format
+                account._getStore().getLog().append(account._encryptRecord(str(self.transaction).encode()))
+                self.assertEqual(list(account.iter_transactions())[1], self.transaction)
+                textSize = os.path.getsize(account._getLogFileName())
+
+                account.migrateLog()
+                self.assertLess(os.path.getsize(account._getLogFileName()), textSize)
+                self.assertEqual(len(list(readRecords(account._getLogFileName()))), 2)
+                self.assertEqual(list(account.iter_transactions())[1], self.transaction)
+                account.close()
+            finally:
+                os.chdir(oldDir)
+
+    def test_packSegment(self):
+        print("Testing that archived segment blocks round-trip with both codecs")
+        frames = [(0, 30, b"x" * 19), (30, 31, b""), (61, 40, b"record")]
+        for codec in ("zlib", "lzma"):
+            self.assertEqual(unpackSegment(packSegment(frames, codec), codec), frames)
+        self.assertRaises(AssertionError, packSegment, frames, "gzip")
+
+    def test_checkpointCents(self):
+        print("Testing that checkpoints hold the balance in cents and older ones are still read")
+        self.assertEqual(decodeCheckpoint(encodeCheckpoint(-1234, 105, 1, 80)), (-1234, 105, 1, 80))
+        older = struct.pack("<BdIIQ", 1, 20.25, 101, 0, 40)
+        self.assertEqual(decodeCheckpoint(older), (2025, 101, 0, 40))
+
+    def test_flags(self):
+        print("Testing that record flags are stored with the record")
+        self.assertEqual(unpackRecord(encodeTransaction(self.transaction, FLAG_POSTED))[4], FLAG_POSTED)
+
+    def test_transferIntent(self):
+        print("Testing that transfer intents and completion markers round-trip")
+        intent = encodeTransferIntent("checking-100-1000", b"debit\n", "savings-100-1001", b"credit")
+        self.assertEqual(decodeTransferIntent(intent), ("checking-100-1000", b"debit\n", "savings-100-1001", b"credit", None))
+        self.assertRaises(AssertionError, decodeTransferIntent, intent[:-1])
+        intent = encodeTransferIntent("savings-100-1001", b"debit", "checking-100-1000", b"credit", b"fee")
+        self.assertEqual(decodeTransferIntent(intent)[4], b"fee")
+        # Intents written before the fee record are still read
+        legacy = struct.pack("<BHHHH", 1, 1, 1, 1, 1) + b"adbc"
+        self.assertEqual(decodeTransferIntent(legacy), ("a", b"d", "b", b"c", None))
+        done = encodeTransferDone(42, ["checking-100-1000", "savings-100-1001"])
+        self.assertEqual(decodeTransferDone(done), (42, ["checking-100-1000", "savings-100-1001"]))
+
+if __name__ == "__main__":
+    unittest.main()
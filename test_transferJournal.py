@@ -0,0 +1,81 @@
+"""
+This module defines the tester for the TransferJournal class.
+@author: Boden Kahn and Anna Pitt
+@date: December 13, 2024
+
+Import the unittest module and the TransferJournal module
+Test each method with at least one unit test
+"""
+
+import os
+import tempfile
+import unittest
+from transferJournal import TransferJournal
+
+class TestTransferJournal(unittest.TestCase):
+
+    def setUp(self):
+        print("\nSetting up a transfer journal in a temporary directory...")
+        self.tempDir = tempfile.TemporaryDirectory()
+        self.fileName = os.path.join(self.tempDir.name, "transfers.log")
+        self.journal = TransferJournal(self.fileName)
+
+    def tearDown(self):
+        self.journal.close()
+        self.tempDir.cleanup()
+
+    def test_ConstructorInvalidFileName(self):
+        print("Testing to ensure the constructor throws an assertion with an empty file name")
+        self.assertRaises(AssertionError, TransferJournal, "")
+
+    def test_pendingLegs(self):
+        print("Testing that each account sees its own leg until the leg is marked complete")
+        first = self.journal.begin("checking-100-1000", b"debit", "savings-100-1001", b"credit")
+        second = self.journal.begin("savings-100-1001", b"debit2", "checking-100-1002", b"credit2")
+        self.assertLess(first, second)
+        self.assertEqual(self.journal.getPending("savings-100-1001"), [(first, b"credit"), (second, b"debit2")])
+        self.journal.complete(first, "savings-100-1001")
+        self.assertEqual(self.journal.getPending("savings-100-1001"), [(second, b"debit2")])
+        self.assertEqual(self.journal.getPending("checking-100-1000"), [(first, b"debit")])
+        self.journal.complete(second, "savings-100-1001", "checking-100-1002")
+        self.assertEqual(self.journal.getPending("checking-100-1002"), [])
+
+    def test_tornIntentRemoved(self):
+        print("Testing that an intent torn by a crash is cut off when the journal is reopened")
+        first = self.journal.begin("checking-100-1000", b"debit", "savings-100-1001", b"credit")
+        self.journal.close()
+        size = os.path.getsize(self.fileName)
+        with open(self.fileName, "ab") as outfile:
+            outfile.write(b"intent:80\n" + b"x" * 20)
+        self.journal = TransferJournal(self.fileName)
+        self.assertEqual(os.path.getsize(self.fileName), size)
+        self.assertEqual(self.journal.getPending("checking-100-1000"), [(first, b"debit")])
+        second = self.journal.begin("checking-100-1000", b"debit2", "savings-100-1001", b"credit2")
+        self.assertEqual(second, size)
+
+    def test_completedJournalEmptied(self):
+        print("Testing that the journal file is emptied once every transfer is complete")
+        first = self.journal.begin("checking-100-1000", b"debit", "savings-100-1001", b"credit")
+        second = self.journal.begin("savings-100-1001", b"debit2", "checking-100-1002", b"credit2")
+        self.journal.complete(first, "checking-100-1000", "savings-100-1001")
+        self.assertEqual(self.journal.getOpenCount(), 1)
+        self.assertGreater(os.path.getsize(self.fileName), 0)
+        self.journal.complete(second, "savings-100-1001", "checking-100-1002")
+        self.assertEqual(self.journal.getOpenCount(), 0)
+        self.assertEqual(os.path.getsize(self.fileName), 0)
+        self.assertEqual(self.journal.begin("checking-100-1000", b"debit3", "savings-100-1001", b"credit3"), 0)
+
+    def test_openIntentsReloaded(self):
+        print("Testing that a reopened journal holds only the intents that are not complete")
+        first = self.journal.begin("checking-100-1000", b"debit", "savings-100-1001", b"credit")
+        second = self.journal.begin("savings-100-1001", b"debit2", "checking-100-1002", b"credit2")
+        self.journal.complete(first, "checking-100-1000")
+        self.journal.complete(second, "savings-100-1001", "checking-100-1002")
+        self.journal.close()
+        self.journal = TransferJournal(self.fileName)
+        self.assertEqual(self.journal.getOpenCount(), 1)
+        self.assertEqual(self.journal.getPending("checking-100-1000"), [])
+        self.assertEqual(self.journal.getPending("savings-100-1001"), [(first, b"credit")])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -10,6 +10,8 @@ A class to represent the data elements and methods required to implement a back
 
 # import the datetime class used to get today's date
 import datetime
+import re
+from money import Cents, isAmount, toCents, toDollars
 
 class Transaction:
    
@@ -19,15 +21,16 @@ class Transaction:
    # Constructs a transaction.
    #  @param tType: the type of this transaction (String)
    #  @param tNumber: The transaction number of the transaction (int; received from BankAccount object)
-   #  @param amount: the amount of this transaction (Floating point: default is 0.0, must be a positive float)
+   #  @param amount: the amount of this transaction (Floating point or Cents: default is 0.0, must be positive)
+   #  @param date: the date of this transaction (String "YYYY-MM-DD": default is today's date)
    #
-   #  @ensure self._amount >= 0
+   #  @ensure self._cents >= 0
    #  @ensure tType is in the set {"deposit", "withdrawl", "interest", "transfer", "penalty"}
    #  @ensure date is a valid date
    # Boden
-   def __init__(self, tType, tNumber, amount = 0.0) :
+   def __init__(self, tType, tNumber, amount = 0.0, date = None) :
       # Assert statements for preconditions
-      assert(isinstance(amount, float)), "The amount must be a floating-point value."
+      assert(isAmount(amount)), "The amount must be a floating-point value."
       assert amount >= 0, "The amount must be a positive numerical value."
       assert(isinstance(tType, str)), "The transaction type must be a String value."
       assert tType in Transaction._typeSet, "The transaction type must be a valid type."
@@ -41,11 +44,11 @@ class Transaction:
       # Set the tType 
       self._tType = tType
 
-      # set the amount
-      self._amount = amount
+      # set the amount, held as an integer number of cents
+      self._cents = toCents(amount)
    
-      # Set the date to today's date
-      self._setDate()
+      # Set the date to today's date, or the date the transaction was recorded on
+      self._setDate(date)
 
       return
 
@@ -56,7 +59,7 @@ class Transaction:
    #  @return result: True if the two transaction have the same amount, date, and tNumber and False if not
    def __eq__(self, other) :
       # Compares the immutable values of the transactions to check for equality
-      result = (self._amount == other._amount) and (self._date == other._date) and (self._tNumber == other._tNumber)
+      result = (self._cents == other._cents) and (self._date == other._date) and (self._tNumber == other._tNumber)
       return result 
     
    # Checks a transaction to see if it is not equal to the second transaction.
@@ -64,7 +67,7 @@ class Transaction:
    #  @return result: True if these two transactions do not have the same amount, dates, and tNumber and False if they do
    def __ne__(self, other) :
     # Compares the immutable values of the transactions to check inequality
-      result = (self._amount != other._amount) or (self._date != other._date) or (self._tNumber != other._tNumber)
+      result = (self._cents != other._cents) or (self._date != other._date) or (self._tNumber != other._tNumber)
       return result 
   
    # adds an transaction to the second transaction.
@@ -72,21 +75,21 @@ class Transaction:
    #  @return result: the sum of the two transaction prices
    def __add__(self, other) :
       # Adds the two transaction amounts and returns the resulting floating-point value
-      return (self._amount + other._amount)
+      return toDollars(self._cents + other._cents)
    
    #  Subtracts a second transaction from the first transaction
    #  @param other: the transaction you are subtracting from the first transaction
    #  @return result: the subtraction of the two transaction amounts
    def __sub__(self, other) :
       # Subtracts the floating-point value of other from self and returns the resulting floating-point value
-      return (self._amount - other._amount)
+      return toDollars(self._cents - other._cents)
 
    # implements the sum() function that will sum a list of the Transactions
    #  @param other: the transaction your are adding to the sum
    #  @return: the sum of the transaction amounts in the list
    def __radd__(self, other):
       # Adds each amount to a running total in succession
-      return other + self._amount
+      return other + self.getAmount()
 
    # Define the accessor methods
    
@@ -108,7 +111,12 @@ class Transaction:
    # getAmount returns the amount of the transaction.
    # @return: The amount of the transaction 
    def getAmount(self) :
-      return self._amount
+      return toDollars(self._cents)
+
+   # getCents returns the amount of the transaction in cents.
+   # @return: The amount of the transaction (Cents)
+   def getCents(self) :
+      return Cents(self._cents)
 
    # getDate returns the date of the transaction.
    # @return: The date of the transaction
@@ -127,25 +135,27 @@ class Transaction:
    
    # Prints all of the transaction instance variables.
    def printTransaction(self):
-      print("Transaction # %d, amount $%.2f, date %s type: %s" % (self._tNumber, self._amount, self._date, self._tType))
+      print("Transaction # %d, amount $%.2f, date %s type: %s" % (self._tNumber, self.getAmount(), self._date, self._tType))
 
    # Prints all of the transaction instance variables.
    # @return: The formatted, human readable string of the transaction   
    def __str__ (self):
-      return ("Transaction # %d, amount = $%.2f, date %s, type: %s" % (self._tNumber, self._amount, self._date, self._tType))
+      return ("Transaction # %d, amount = $%.2f, date %s, type: %s" % (self._tNumber, self.getAmount(), self._date, self._tType))
 
    # Prints all of the transaction instance variables.
    # @return: The formatted, machine readable string of the transaction   
    def __repr__ (self):
-      return ("Transaction(tNumber = %d, amount = $%.2f, date = %s, tType = %s)" % (self._tNumber, self._amount, self._date, self._tType))
+      return ("Transaction(tNumber = %d, amount = $%.2f, date = %s, tType = %s)" % (self._tNumber, self.getAmount(), self._date, self._tType))
 
    # Define the mutator methods
    # @require year: Must be greater than or equal to 2024
    # @require month: Must be between 1 and 12 inclusive
    # @require day: Must be between 1 and 31 inclusive
    # Helper method that sets the date for a transaction
-   def _setDate(self):
-      date = str(datetime.date.today())
+   #  @param date: the date to use (String "YYYY-MM-DD": default is today's date)
+   def _setDate(self, date = None):
+      if date is None:
+         date = str(datetime.date.today())
       self._date = date
       date = date.split("-")
       assert(int(date[0]) >= 2024)
@@ -157,3 +167,15 @@ class Transaction:
       self._month = date[1]
       self._day = date[2]
       return 
+
+# The pattern matching the String representation produced by Transaction.__str__
+_TEXT_PATTERN = re.compile(r"Transaction # (\d+), amount = \$([\d.]+), date (\d{4}-\d{2}-\d{2}), type: (\w+)")
+
+# Rebuilds a Transaction from the String representation produced by Transaction.__str__
+#  @param text: the String representation of a transaction
+#  @require text was produced by Transaction.__str__
+#  @return: the Transaction described by the text
+def parseTransaction(text):
+   match = _TEXT_PATTERN.fullmatch(text)
+   assert match is not None, "The text must be a String representation of a transaction."
+   return Transaction(match.group(4), int(match.group(1)), float(match.group(2)), match.group(3))
@@ -0,0 +1,105 @@
+"""
+This module defines the TransactionHistory class.
+@author: Hunter Peacock, Boden Kahn, and Anna Pitt
+@date: December 15, 2024
+
+A class to represent the in-memory history of an account's transactions.
+Instead of a list of Transaction objects, each holding its date both whole and split
+into year, month and day Strings, the history keeps four parallel typed arrays: the
+transaction number, the type code, the amount in cents and the day number of the date.
+A row takes 21 bytes, and a Transaction is only rebuilt from its row when it is read.
+"""
+
+# Import statements
+from array import array
+from money import Cents
+from transaction import Transaction
+from transactionRecord import _TYPE_CODES, _TYPE_NAMES, dateToDay, dayToDate
+
+class TransactionHistory:
+
+    # Constructs an empty TransactionHistory object.
+    #
+    #  @ensure TransactionHistory object successfully created
+    def __init__(self):
+        self._tNumbers = array("q")
+        self._typeCodes = array("B")
+        self._cents = array("q")
+        self._days = array("i")
+
+    # Adds a transaction to the end of the history
+    #
+    #  @param transaction: The transaction to add (Transaction)
+    #
+    #  @require: transaction is an instance of the Transaction class
+    def append(self, transaction):
+        assert isinstance(transaction, Transaction), "The transaction must be of the Transaction type."
+        # Converted before any column grows, so a bad date leaves the history unchanged
+        day = dateToDay(transaction.getDate())
+        self._tNumbers.append(transaction.getTNumber())
+        self._typeCodes.append(_TYPE_CODES[transaction.getTType()])
+        self._cents.append(transaction.getCents())
+        self._days.append(day)
+
+    # Adds several transactions to the end of the history
+    #
+    #  @param transactions: The transactions to add, oldest first (iterable of Transaction)
+    def extend(self, transactions):
+        for transaction in transactions:
+            self.append(transaction)
+
+    # Returns the number of transactions in the history
+    #
+    #  @return: The number of transactions (int)
+    def __len__(self):
+        return len(self._tNumbers)
+
+    # Rebuilds the transactions at a position or a slice of positions
+    #
+    #  @param index: The position of the transaction, negative from the end (int or slice)
+    #
+    #  @return: The transaction at the position (Transaction), or the list of transactions in the slice
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._build(row) for row in range(*index.indices(len(self)))]
+        assert isinstance(index, int), "The index must be an integer value or a slice."
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("transaction history index out of range")
+        return self._build(index)
+
+    # Rebuilds the transactions one at a time, oldest first
+    #
+    #  @return: An iterator over the history (iterator of Transaction)
+    def __iter__(self):
+        for row in range(len(self)):
+            yield self._build(row)
+
+    # Returns the amounts of every transaction without rebuilding them
+    #
+    #  @return: The amount of each transaction in cents, oldest first (array of int)
+    def getCents(self):
+        return array("q", self._cents)
+
+    # Returns the memory held by the columns of the history
+    #
+    #  @return: The number of bytes allocated to the rows (int)
+    def getMemoryUsage(self):
+        return sum(column.buffer_info()[1] * column.itemsize
+                   for column in (self._tNumbers, self._typeCodes, self._cents, self._days))
+
+    # Returns a String representation of the history
+    #
+    #  @return: The number of transactions held (String)
+    def __repr__(self):
+        return f"TransactionHistory({len(self)} transactions)"
+
+    # A private helper method that rebuilds the transaction held by a row
+    #
+    #  @param row: The position of the row (int)
+    #
+    #  @return: The transaction held by the row (Transaction)
+    def _build(self, row):
+        return Transaction(_TYPE_NAMES[self._typeCodes[row]], self._tNumbers[row], Cents(self._cents[row]),
+                           dayToDate(self._days[row]))
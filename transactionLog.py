@@ -0,0 +1,471 @@
+"""
+This module defines the TransactionLog class.
+@author: Hunter Peacock, Boden Kahn, and Anna Pitt
+@date: December 9, 2024
+
+A class to represent an append-only, buffered log of encrypted transaction records.
+The file handle is kept open for the life of the log and records are written out
+according to a configurable flush policy instead of reopening the file per record.
+With a flush interval, a timer thread writes out a buffered record once the interval
+has passed even if nothing else is appended.
+A log can also roll over to a new active file once it reaches a size threshold. The
+sealed segment is handed to an archiver, or moved to the archive directory as it is,
+and listed in a manifest next to the log:
+    active <base offset of the active file>
+    <base offset> <end offset> <codec> <archive path relative to the log's directory>
+Offsets into the log are logical: they keep counting across segments, so an offset
+taken before a rotation still points at the same record after it.
+"""
+
+# Import statements
+import atexit
+import mmap
+import os
+import threading
+import time
+import weakref
+
+class TransactionLog:
+    # A private class variable that tracks every open log so they can be flushed at exit
+    _openLogs = weakref.WeakSet()
+
+    # Constructs a TransactionLog object.
+    #
+    #  @param fileName: The name of the file that holds the log (String)
+    #  @param flushEvery: The number of records to buffer before writing them out (int; default is 1)
+    #  @param flushInterval: The maximum number of milliseconds a record may stay buffered (int; default is 0, no limit)
+    #  @param truncate: Whether an existing file should be emptied when the log is opened (bool; default is False)
+    #  @param index: The sidecar index of records appended without one of their own (LogIndex; default is None)
+    #  @param segmentSize: The number of bytes the active file may reach before it is sealed (int; default is None, no rotation)
+    #  @param archiver: The function that archives a sealed segment, given its file name and base offset, and
+    #                   returns the archive path and codec (default is None, the segment is moved as it is)
+    #
+    #  @require: fileName is a non-empty String
+    #  @require: flushEvery is an int >= 1
+    #  @require: flushInterval is a number >= 0
+    #  @require: segmentSize is None or an int >= 1
+    #
+    #  @ensure TransactionLog object successfully created and the file is open for appending
+    def __init__(self, fileName, flushEvery = 1, flushInterval = 0, truncate = False, index = None,
+                 segmentSize = None, archiver = None):
+        # Assert statements for preconditions
+        assert isinstance(fileName, str) and len(fileName) > 0, "The file name must be a non-empty String."
+        assert isinstance(flushEvery, int) and flushEvery >= 1, "The flush count must be an integer >= 1."
+        assert isinstance(flushInterval, (int, float)) and flushInterval >= 0, "The flush interval must be >= 0."
+        assert segmentSize is None or (isinstance(segmentSize, int) and segmentSize >= 1), "The segment size must be an integer >= 1."
+
+        self._fileName = fileName
+        self._flushEvery = flushEvery
+        self._flushInterval = flushInterval
+        self._pending = []  # (framed record, transaction number, day number, index) not written to the file yet
+        self._index = index
+        self._segmentSize = segmentSize
+        self._archiver = archiver
+        self._lastFlush = time.monotonic()
+        self._timer = None  # Writes out the buffer once the flush interval has passed
+        self._lock = threading.RLock()
+        if truncate:
+            removeSegments(fileName)
+        elif os.path.exists(fileName + ".sealing"):
+            # Finishes a rotation that was interrupted before the manifest listed the segment
+            self._archive(readManifest(fileName)[0])
+        self._file = open(fileName, "wb" if truncate else "ab")
+        self._base = readManifest(fileName)[0]  # The logical offset of the first byte of the active file
+        self._size = self._base + self._file.seek(0, os.SEEK_END)  # The offset the next record is written at
+        TransactionLog._openLogs.add(self)
+
+    # Accessor/getter to retrieve the name of the log file
+    #
+    #  @return: The name of the file that holds the log (String)
+    def getFileName(self):
+        return self._fileName
+
+    # Accessor/getter to retrieve the number of records waiting in the buffer
+    #
+    #  @return: The number of buffered records (int)
+    def getPendingCount(self):
+        return len(self._pending)
+
+    # Accessor/getter to retrieve the offset the next appended record will be written at,
+    # counting records still waiting in the buffer
+    #
+    #  @return: The end offset of the log (int)
+    def getEndOffset(self):
+        with self._lock:
+            return self._size + sum(len(entry[0]) for entry in self._pending)
+
+    # Accessor/getter to retrieve the log offset the active file starts at, which moves
+    # each time the log is rotated
+    #
+    #  @return: The base offset of the active file (int)
+    def getBaseOffset(self):
+        with self._lock:
+            return self._base
+
+    # Accessor/getter to retrieve the default sidecar index of the log
+    #
+    #  @return: The index kept with the log (LogIndex or None)
+    def getIndex(self):
+        return self._index
+
+    # Mutator/setter to change the segment policy of the open log. The active file is
+    # sealed on the next flush once it has reached the new size
+    #
+    #  @param segmentSize: The number of bytes the active file may reach (int; default is None, no rotation)
+    #
+    #  @require: segmentSize is None or an int >= 1
+    def setSegmentSize(self, segmentSize = None):
+        assert segmentSize is None or (isinstance(segmentSize, int) and segmentSize >= 1), "The segment size must be an integer >= 1."
+        with self._lock:
+            self._segmentSize = segmentSize
+
+    # Adds an encrypted record to the end of the log. The record is framed with its
+    # length, and with the key of its account in a log shared by several accounts, then
+    # buffered; the buffer is written out once the flush policy is met
+    #
+    #  @param data: The encrypted record to append (bytes)
+    #  @param tNumber: The transaction number of the record, for the index (int; default is None)
+    #  @param day: The day number of the record, for the index (int; default is None)
+    #  @param index: The index the record is added to (LogIndex; default is None, the log's own index)
+    #  @param key: The key of the account the record belongs to (String; default is None, no key)
+    #
+    #  @require: data is a bytes type
+    #  @require: key is None or a String without ':' or newlines
+    #  @require: the log has not been closed
+    #
+    #  @return: The log offset the record is written at (int)
+    def append(self, data, tNumber = None, day = None, index = None, key = None):
+        assert isinstance(data, bytes), "The record must be of the bytes type."
+        assert key is None or (isinstance(key, str) and ":" not in key and "\n" not in key), "Invalid record key."
+        assert self._file is not None, "Cannot append to a closed log."
+
+        header = str(len(data)).encode() if key is None else f"{key}:{len(data)}".encode()
+        with self._lock:
+            offset = self.getEndOffset()
+            self._pending.append((header + b"\n" + data + b"\n", tNumber, day, index or self._index))
+            if self._flushDue():
+                self.flush()
+            elif self._flushInterval > 0 and self._timer is None:
+                self._startTimer()
+            return offset
+
+    # Adds many encrypted records to the end of the log and writes them out together,
+    # whatever the flush policy
+    #
+    #  @param entries: The data, transaction number, day number, index and key of each record,
+    #                  as they are passed to append (iterable of tuples)
+    #  @param flush: Whether the records are written out now (bool; default is True; False buffers
+    #                them, so the batches of several accounts in a shared log are written together)
+    #
+    #  @require: the log has not been closed
+    def appendMany(self, entries, flush = True):
+        assert self._file is not None, "Cannot append to a closed log."
+        with self._lock:
+            for data, tNumber, day, index, key in entries:
+                assert isinstance(data, bytes), "The record must be of the bytes type."
+                header = str(len(data)).encode() if key is None else f"{key}:{len(data)}".encode()
+                self._pending.append((header + b"\n" + data + b"\n", tNumber, day, index or self._index))
+            if flush:
+                self.flush()
+            elif self._flushInterval > 0 and self._pending and self._timer is None:
+                self._startTimer()
+
+    # Determines if the buffered records should be written out based on the flush policy
+    #
+    #  @return: True if the buffer should be flushed, False if not
+    def _flushDue(self):
+        if len(self._pending) >= self._flushEvery:
+            return True
+        elapsed = (time.monotonic() - self._lastFlush) * 1000
+        return self._flushInterval > 0 and elapsed >= self._flushInterval
+
+    # A private helper method that starts the timer that writes out the buffer when the
+    # flush interval has passed. Called with the lock held
+    def _startTimer(self):
+        remaining = self._flushInterval / 1000 - (time.monotonic() - self._lastFlush)
+        self._timer = threading.Timer(max(remaining, 0), self._flushOnTimer)
+        self._timer.daemon = True
+        self._timer.start()
+
+    # A private helper method run by the timer that writes out any records still buffered
+    def _flushOnTimer(self):
+        with self._lock:
+            self._timer = None
+            if self._pending:
+                self.flush()
+
+    # Writes every buffered record to the file and hands it to the operating system
+    def flush(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self._file is None:
+                return
+            indexes = []
+            if self._pending:
+                self._file.write(b"".join(entry[0] for entry in self._pending))
+                for framed, tNumber, day, index in self._pending:
+                    if index is not None:
+                        index.add(tNumber, day, self._size, len(framed))
+                        if index not in indexes:
+                            indexes.append(index)
+                    self._size += len(framed)
+                self._pending = []
+            self._file.flush()
+            # The indexes are written after the log so they never point past the end of the file
+            for index in indexes:
+                index.flush()
+            self._lastFlush = time.monotonic()
+            if self._segmentSize is not None and self._size - self._base >= self._segmentSize:
+                self._rotate()
+
+    # Seals the active file and starts a new one at the current end offset
+    # The active file is renamed before it is archived, so a rotation interrupted by a
+    # crash is finished the next time the log is opened
+    def _rotate(self):
+        self._file.close()
+        os.replace(self._fileName, self._fileName + ".sealing")
+        self._file = open(self._fileName, "wb")
+        self._archive(self._base)
+        self._base = self._size
+
+    # A private helper method that archives the sealed segment and lists it in the manifest
+    #
+    #  @param base: The logical offset of the first byte of the sealed segment (int)
+    def _archive(self, base):
+        sealed = self._fileName + ".sealing"
+        end = base + os.path.getsize(sealed)
+        if self._archiver is not None:
+            path, codec = self._archiver(sealed, base)
+        else:
+            path, codec = getArchivePath(self._fileName, base, "raw"), "raw"
+            os.replace(sealed, path)
+        activeBase, segments = readManifest(self._fileName)
+        segments.append((base, end, codec, path))
+        _writeManifest(self._fileName, end, segments)
+        if os.path.exists(sealed):
+            os.remove(sealed)
+
+    # Flushes the buffer and forces the file contents to stable storage
+    def sync(self):
+        with self._lock:
+            self.flush()
+            if self._file is not None:
+                os.fsync(self._file.fileno())
+
+    # Flushes any buffered records and closes the file
+    def close(self):
+        with self._lock:
+            if self._file is None:
+                return
+            self.flush()
+            self._file.close()
+            self._file = None
+            if self._index is not None:
+                self._index.close()
+        TransactionLog._openLogs.discard(self)
+
+# Reads the manifest of a segmented log
+#
+#  @param fileName: The name of the active log file (String)
+#
+#  @return: The base offset of the active file, and the (base offset, end offset, codec, archive path)
+#           of every sealed segment, oldest first (tuple)
+def readManifest(fileName):
+    if not os.path.exists(fileName + ".manifest"):
+        return (0, [])
+    directory = os.path.dirname(fileName)
+    with open(fileName + ".manifest", "r") as infile:
+        activeBase = int(infile.readline().split()[1])
+        segments = []
+        for line in infile:
+            base, end, codec, path = line.rstrip("\n").split(" ", 3)
+            segments.append((int(base), int(end), codec, os.path.join(directory, path)))
+    return (activeBase, segments)
+
+# A private helper function that replaces the manifest of a segmented log in one step
+#
+#  @param fileName: The name of the active log file (String)
+#  @param activeBase: The base offset of the active file (int)
+#  @param segments: The (base offset, end offset, codec, archive path) of every sealed segment (list)
+def _writeManifest(fileName, activeBase, segments):
+    directory = os.path.dirname(fileName)
+    with open(fileName + ".manifest.new", "w") as outfile:
+        outfile.write(f"active {activeBase}\n")
+        for base, end, codec, path in segments:
+            outfile.write(f"{base} {end} {codec} {os.path.relpath(path, directory or '.')}\n")
+        outfile.flush()
+        os.fsync(outfile.fileno())
+    os.replace(fileName + ".manifest.new", fileName + ".manifest")
+
+# Names the archive file of a sealed segment
+#
+#  @param fileName: The name of the active log file (String)
+#  @param base: The base offset of the segment (int)
+#  @param codec: The codec the segment is stored with (String)
+#
+#  @return: The path of the archive file, inside an archive directory next to the log (String)
+def getArchivePath(fileName, base, codec):
+    directory = os.path.join(os.path.dirname(fileName), "archive")
+    os.makedirs(directory, exist_ok = True)
+    return os.path.join(directory, f"{os.path.basename(fileName)}.{base:012d}.{codec}")
+
+# Lists every segment of a log, sealed segments first and the active file last
+#
+#  @param fileName: The name of the active log file (String)
+#
+#  @return: The (base offset, end offset, codec, path) of each segment; the codec of the active file is None (list)
+def listSegments(fileName):
+    activeBase, segments = readManifest(fileName)
+    size = os.path.getsize(fileName) if os.path.exists(fileName) else 0
+    return segments + [(activeBase, activeBase + size, None, fileName)]
+
+# Returns the logical size of a log, counting its sealed segments
+#
+#  @param fileName: The name of the active log file (String)
+#
+#  @return: The offset just past the last record written to the log (int)
+def getLogSize(fileName):
+    return listSegments(fileName)[-1][1]
+
+# Removes the manifest and every archived segment of a log
+#
+#  @param fileName: The name of the active log file (String)
+def removeSegments(fileName):
+    for base, end, codec, path in readManifest(fileName)[1]:
+        if os.path.exists(path):
+            os.remove(path)
+    for name in (fileName + ".manifest", fileName + ".sealing"):
+        if os.path.exists(name):
+            os.remove(name)
+
+# A private helper function that splits the header line of a frame
+#
+#  @param header: The header line, with or without its newline (bytes)
+#
+#  @return: The key of the record, or None if it has none, and the record length (tuple)
+def _splitHeader(header):
+    key, colon, length = bytes(header).rstrip().rpartition(b":")
+    return (key.decode() if colon else None, int(length))
+
+# Reads the framed records stored in a log file, one at a time, in the order they
+# were appended. In a shared log, the frames of other accounts are skipped unread
+#
+#  @param fileName: The name of the log file to read (String)
+#  @param offset: The byte offset of the first record to read (int; default is 0)
+#  @param key: The key of the account to read (String; default is None, every record)
+#
+#  @return: A generator of the offset, framed size and encrypted record of each record (tuple)
+def readFrames(fileName, offset = 0, key = None):
+    with open(fileName, "rb") as infile:
+        infile.seek(offset)
+        header = infile.readline()
+
+        while header.rstrip() != b"":
+            recordKey, length = _splitHeader(header)
+            size = len(header) + length + 1
+            if key is None or recordKey == key:
+                data = infile.read(length)
+                infile.readline()  # Skip the newline
+                yield (offset, size, data)
+            else:
+                infile.seek(length + 1, os.SEEK_CUR)
+            offset += size
+            header = infile.readline()
+
+# Reads every framed record stored in a log file together with the key it was framed
+# with, one at a time, in the order they were appended
+#
+#  @param fileName: The name of the log file to read (String)
+#  @param offset: The byte offset of the first record to read (int; default is 0)
+#
+#  @return: A generator of the offset, framed size, key (String or None) and encrypted record of each record (tuple)
+def readKeyedFrames(fileName, offset = 0):
+    with open(fileName, "rb") as infile:
+        infile.seek(offset)
+        header = infile.readline()
+
+        while header.rstrip() != b"":
+            recordKey, length = _splitHeader(header)
+            size = len(header) + length + 1
+            data = infile.read(length)
+            infile.readline()  # Skip the newline
+            yield (offset, size, recordKey, data)
+            offset += size
+            header = infile.readline()
+
+# Reads the encrypted records stored in a log file, one at a time, in the order they
+# were appended
+#
+#  @param fileName: The name of the log file to read (String)
+#  @param offset: The byte offset of the first record to read (int; default is 0)
+#  @param key: The key of the account to read (String; default is None, every record)
+#
+#  @return: A generator of the encrypted records in the file (bytes)
+def readRecords(fileName, offset = 0, key = None):
+    for offset, size, data in readFrames(fileName, offset, key):
+        yield data
+
+# Reads the single encrypted record that starts at a byte offset of a log file
+#
+#  @param fileName: The name of the log file to read (String)
+#  @param offset: The byte offset of the record (int)
+#
+#  @return: The encrypted record (bytes)
+def readRecordAt(fileName, offset):
+    with open(fileName, "rb") as infile:
+        return readRecordFrom(infile, offset)
+
+# Reads the single encrypted record that starts at a byte offset of a log file that is
+# already open, so repeated lookups do not reopen the file
+#
+#  @param infile: The log file, open for reading in binary mode (file)
+#  @param offset: The byte offset of the record (int)
+#
+#  @return: The encrypted record (bytes)
+def readRecordFrom(infile, offset):
+    infile.seek(offset)
+    key, length = _splitHeader(infile.readline())
+    return infile.read(length)
+
+# Reads the encrypted records stored in a log file by memory-mapping it. Each record is
+# returned as a memoryview slice of the mapping, so no copy of the record is made; the
+# slices stay valid until the generator is exhausted or closed
+#
+#  @param fileName: The name of the log file to read (String)
+#  @param offset: The byte offset of the first record to read (int; default is 0)
+#  @param key: The key of the account to read (String; default is None, every record)
+#
+#  @return: A generator of the encrypted records in the file (memoryview)
+def mapRecords(fileName, offset = 0, key = None):
+    with open(fileName, "rb") as infile:
+        if os.fstat(infile.fileno()).st_size <= offset:
+            return
+        mapping = mmap.mmap(infile.fileno(), 0, access = mmap.ACCESS_READ)
+    view = memoryview(mapping)
+    try:
+        end = len(mapping)
+        while offset < end:
+            newline = mapping.find(b"\n", offset)
+            if newline <= offset:
+                break
+            start = newline + 1
+            recordKey, length = _splitHeader(view[offset:newline])
+            if key is None or recordKey == key:
+                yield view[start:start + length]
+            offset = start + length + 1
+    finally:
+        view.release()
+        try:
+            mapping.close()
+        except BufferError:
+            # A caller still holds a slice; the mapping is released once it is dropped
+            pass
+
+# A private helper function that flushes every log still open when the interpreter exits
+def _closeOpenLogs():
+    for log in list(TransactionLog._openLogs):
+        log.close()
+
+atexit.register(_closeOpenLogs)
@@ -0,0 +1,236 @@
+"""
+This module defines the binary record format used to persist transactions.
+@author: Hunter Peacock, Boden Kahn, and Anna Pitt
+@date: December 9, 2024
+
+Each record has a fixed layout packed with struct (little-endian, 19 bytes):
+    version (1 byte), flags (1 byte), transaction number (4 bytes), type code (1 byte),
+    amount in cents (8 bytes, signed), date as a proleptic Gregorian day number (4 bytes)
+Records written before the binary format hold the String representation of the
+transaction and are still read through a compatibility path.
+Record flags mark transfer legs that move money themselves: a posted leg is applied on
+replay instead of being informational, as a credit if the credit flag is set and as a
+debit otherwise.
+A transfer intent names both accounts and holds the encrypted record of each leg, and
+of the overdraft fee the transfer charges the source account if there is one; a
+completion marker names the intent by its journal offset and lists the accounts whose
+legs are in their logs.
+Archived log segments hold their decrypted records, each prefixed with its log offset,
+framed size and length, compressed as one block before the block is encrypted.
+"""
+
+# Import statements
+import datetime
+import lzma
+import struct
+import zlib
+from transaction import Transaction, parseTransaction
+from money import Cents
+
+# The version written into every new record
+RECORD_VERSION = 1
+
+# The fixed layout of a record
+_RECORD = struct.Struct("<BBIBqI")
+RECORD_SIZE = _RECORD.size
+
+# The codes used to store each transaction type
+_TYPE_CODES = {"deposit": 1, "withdrawal": 2, "interest": 3, "transfer": 4, "penalty": 5}
+_TYPE_NAMES = {code: tType for tType, code in _TYPE_CODES.items()}
+
+# The record flags
+FLAG_POSTED = 0x01  # The record moves money itself instead of describing another record
+FLAG_CREDIT = 0x02  # A posted record adds its amount to the balance instead of subtracting it
+
+# The layout of a checkpoint record: version, balance in cents, next transaction number,
+# overdraft count, and the log offset the checkpoint was taken at. Version 1 checkpoints
+# held the balance as a floating-point number of dollars in the same 8 bytes
+CHECKPOINT_VERSION = 2
+_CHECKPOINT = struct.Struct("<BqIIQ")
+_CHECKPOINT_V1 = struct.Struct("<BdIIQ")
+
+# The header of a transfer intent: version, then the lengths of the source key, the source
+# record, the destination key, the destination record and the fee record that follow it.
+# Version 1 intents had no fee record
+TRANSFER_VERSION = 2
+_INTENT = struct.Struct("<BHHHHH")
+_INTENT_V1 = struct.Struct("<BHHHH")
+# The header of a transfer completion marker: version and the journal offset of the intent
+_DONE = struct.Struct("<BQ")
+
+# The header of each record in an archived segment: log offset, framed size and record length
+_SEGMENT_ENTRY = struct.Struct("<QII")
+# The compression modules archived segments can be stored with
+SEGMENT_CODECS = {"zlib": zlib, "lzma": lzma}
+
+# The prefix of records stored in the older text format
+_TEXT_PREFIX = b"Transaction # "
+
+# Converts a date String to the day number stored in a record
+#
+#  @param date: The date to convert (String "YYYY-MM-DD")
+#
+#  @return: The proleptic Gregorian day number of the date (int)
+def dateToDay(date):
+    return datetime.date.fromisoformat(date).toordinal()
+
+# Converts a day number stored in a record back to a date String
+#
+#  @param day: The proleptic Gregorian day number (int)
+#
+#  @return: The date (String "YYYY-MM-DD")
+def dayToDate(day):
+    return datetime.date.fromordinal(day).isoformat()
+
+# Packs a transaction into a binary record
+#
+#  @param transaction: The transaction to pack (Transaction)
+#  @param flags: The record flags (int; default is 0)
+#
+#  @require: transaction is an instance of the Transaction class
+#
+#  @return: The binary record (bytes)
+def encodeTransaction(transaction, flags = 0):
+    assert isinstance(transaction, Transaction), "The transaction must be of the Transaction type."
+    return _RECORD.pack(RECORD_VERSION, flags, transaction.getTNumber(), _TYPE_CODES[transaction.getTType()],
+                        transaction.getCents(), dateToDay(transaction.getDate()))
+
+# Unpacks a record into its fields. Records in the older text format are parsed and
+# reported with flags 0
+#
+#  @param data: The decrypted record (bytes)
+#
+#  @return: The transaction number, type, amount in cents, day number and flags (tuple)
+def unpackRecord(data):
+    if data.startswith(_TEXT_PREFIX):
+        transaction = parseTransaction(bytes(data).decode("utf-8"))
+        return (transaction.getTNumber(), transaction.getTType(), int(transaction.getCents()),
+                dateToDay(transaction.getDate()), 0)
+
+    assert len(data) == RECORD_SIZE, "The record has an invalid length."
+    version, flags, tNumber, typeCode, cents, day = _RECORD.unpack(data)
+    assert version == RECORD_VERSION, "The record has an unsupported version."
+    return (tNumber, _TYPE_NAMES[typeCode], cents, day, flags)
+
+# Rebuilds the transaction stored in a record
+#
+#  @param data: The decrypted record, binary or text (bytes)
+#
+#  @return: The transaction held by the record (Transaction)
+def decodeTransaction(data):
+    tNumber, tType, cents, day, flags = unpackRecord(data)
+    return Transaction(tType, tNumber, Cents(cents), dayToDate(day))
+
+# Packs the state of an account into a checkpoint record
+#
+#  @param balance: The balance of the account in cents (int)
+#  @param nextTransaction: The next transaction number of the account (int)
+#  @param overdrawnCount: The overdraft count of the account (int)
+#  @param logOffset: The offset in the log of the first record not covered by the checkpoint (int)
+#
+#  @return: The checkpoint record (bytes)
+def encodeCheckpoint(balance, nextTransaction, overdrawnCount, logOffset):
+    return _CHECKPOINT.pack(CHECKPOINT_VERSION, balance, nextTransaction, overdrawnCount, logOffset)
+
+# Unpacks a checkpoint record
+#
+#  @param data: The decrypted checkpoint record (bytes)
+#
+#  @return: The balance in cents, next transaction number, overdraft count and log offset (tuple)
+def decodeCheckpoint(data):
+    assert len(data) == _CHECKPOINT.size, "The checkpoint has an invalid length."
+    if data[0] == 1:
+        version, balance, nextTransaction, overdrawnCount, logOffset = _CHECKPOINT_V1.unpack(data)
+        return (round(balance * 100), nextTransaction, overdrawnCount, logOffset)
+    version, balance, nextTransaction, overdrawnCount, logOffset = _CHECKPOINT.unpack(data)
+    assert version == CHECKPOINT_VERSION, "The checkpoint has an unsupported version."
+    return (balance, nextTransaction, overdrawnCount, logOffset)
+
+# Packs the two legs of a transfer into an intent record
+#
+#  @param sourceKey: The key of the account the money leaves (String)
+#  @param sourceRecord: The encrypted record of the debit leg (bytes)
+#  @param destKey: The key of the account the money goes to (String)
+#  @param destRecord: The encrypted record of the credit leg (bytes)
+#  @param feeRecord: The encrypted record of the source account's overdraft fee (bytes; default is None, no fee)
+#
+#  @return: The intent record (bytes)
+def encodeTransferIntent(sourceKey, sourceRecord, destKey, destRecord, feeRecord = None):
+    sourceKey = sourceKey.encode()
+    destKey = destKey.encode()
+    feeRecord = b"" if feeRecord is None else feeRecord
+    header = _INTENT.pack(TRANSFER_VERSION, len(sourceKey), len(sourceRecord), len(destKey), len(destRecord),
+                          len(feeRecord))
+    return header + sourceKey + sourceRecord + destKey + destRecord + feeRecord
+
+# Unpacks a transfer intent record
+#
+#  @param data: The intent record (bytes)
+#
+#  @return: The source key, source record, destination key, destination record and fee
+#           record, or None if the transfer charges no fee (tuple)
+def decodeTransferIntent(data):
+    assert len(data) >= 1, "The transfer intent is too short."
+    header = _INTENT_V1 if data[0] == 1 else _INTENT
+    assert len(data) >= header.size, "The transfer intent is too short."
+    version, *lengths = header.unpack_from(data)
+    assert version in (1, TRANSFER_VERSION), "The transfer intent has an unsupported version."
+    assert len(data) == header.size + sum(lengths), "The transfer intent has an invalid length."
+    fields = []
+    position = header.size
+    for length in lengths:
+        fields.append(bytes(data[position:position + length]))
+        position += length
+    feeRecord = fields[4] if len(fields) > 4 and fields[4] else None
+    return (fields[0].decode(), fields[1], fields[2].decode(), fields[3], feeRecord)
+
+# Packs a transfer completion marker
+#
+#  @param intentOffset: The journal offset of the completed intent (int)
+#  @param keys: The keys of the accounts whose legs are in their logs (iterable of String)
+#
+#  @return: The completion marker (bytes)
+def encodeTransferDone(intentOffset, keys):
+    return _DONE.pack(TRANSFER_VERSION, intentOffset) + "\n".join(keys).encode()
+
+# Unpacks a transfer completion marker
+#
+#  @param data: The completion marker (bytes)
+#
+#  @return: The journal offset of the intent and the keys of the completed legs (tuple)
+def decodeTransferDone(data):
+    assert len(data) >= _DONE.size, "The transfer completion marker is too short."
+    version, intentOffset = _DONE.unpack_from(data)
+    assert version in (1, TRANSFER_VERSION), "The transfer completion marker has an unsupported version."
+    return (intentOffset, bytes(data[_DONE.size:]).decode().split("\n"))
+
+# Packs the decrypted records of a sealed log segment into one compressed block
+#
+#  @param frames: The (log offset, framed size, decrypted record) of each record in the segment (iterable)
+#  @param codec: The compression to use, 'zlib' or 'lzma' (String; default is 'zlib')
+#
+#  @require: codec is a key of SEGMENT_CODECS
+#
+#  @return: The compressed block (bytes)
+def packSegment(frames, codec = "zlib"):
+    assert codec in SEGMENT_CODECS, "The codec must be 'zlib' or 'lzma'."
+    block = b"".join(_SEGMENT_ENTRY.pack(offset, size, len(data)) + bytes(data) for offset, size, data in frames)
+    return SEGMENT_CODECS[codec].compress(block)
+
+# Unpacks a compressed block of archived records
+#
+#  @param data: The compressed block (bytes)
+#  @param codec: The compression the block was stored with (String)
+#
+#  @return: The (log offset, framed size, decrypted record) of each record, in log order (list)
+def unpackSegment(data, codec):
+    assert codec in SEGMENT_CODECS, "The codec must be 'zlib' or 'lzma'."
+    block = memoryview(SEGMENT_CODECS[codec].decompress(data))
+    frames = []
+    position = 0
+    while position < len(block):
+        offset, size, length = _SEGMENT_ENTRY.unpack_from(block, position)
+        position += _SEGMENT_ENTRY.size
+        frames.append((offset, size, bytes(block[position:position + length])))
+        position += length
+    return frames
@@ -0,0 +1,167 @@
+"""
+This module defines the TransferJournal class.
+@author: Hunter Peacock, Boden Kahn, and Anna Pitt
+@date: December 13, 2024
+
+A class to represent the write-ahead journal of transfers between accounts.
+Before either leg of a transfer is logged, one intent record holding the encrypted
+record of both legs, and of any overdraft fee the transfer charges, is appended and forced to stable storage; that single durable write
+is the commit point of the transfer. Each leg is then appended to its account's log,
+and once both logs are forced to stable storage a completion marker is appended without
+forcing it. An intent left without a marker is rolled forward when each account
+recovers, and an intent torn by a crash was never committed, so it is cut off when the
+journal is opened. The journal keeps its open intents in memory, so looking up the
+pending legs of an account does not read the file, and the file is emptied whenever
+every intent in it is complete.
+"""
+
+# Import statements
+import os
+import threading
+from transactionLog import TransactionLog, readFrames
+from transactionRecord import (encodeTransferIntent, decodeTransferIntent, encodeTransferDone,
+                               decodeTransferDone)
+
+class TransferJournal:
+    # The keys the two kinds of journal frames are stored under
+    _INTENT = "intent"
+    _DONE = "done"
+
+    # Constructs a TransferJournal object.
+    #
+    #  @param fileName: The name of the journal file (String)
+    #
+    #  @require: fileName is a non-empty String
+    #
+    #  @ensure TransferJournal object successfully created and any torn intent is removed
+    def __init__(self, fileName):
+        # Assert statements for preconditions
+        assert isinstance(fileName, str) and len(fileName) > 0, "The file name must be a non-empty String."
+
+        self._fileName = fileName
+        self._lock = threading.Lock()
+        _truncateTornTail(fileName)
+        # The keys, leg records, fee record and completed keys of each open intent, by journal offset
+        self._intents = _readOpenIntents(fileName)
+        self._log = TransactionLog(fileName, truncate = not self._intents)
+
+    # Accessor/getter to retrieve the name of the journal file
+    #
+    #  @return: The name of the file that holds the journal (String)
+    def getFileName(self):
+        return self._fileName
+
+    # Accessor/getter to retrieve the number of transfers that are not complete
+    #
+    #  @return: The number of open intents (int)
+    def getOpenCount(self):
+        with self._lock:
+            return len(self._intents)
+
+    # Appends the intent of a transfer and forces it to stable storage
+    #
+    #  @param sourceKey: The key of the account the money leaves (String)
+    #  @param sourceRecord: The encrypted record of the debit leg (bytes)
+    #  @param destKey: The key of the account the money goes to (String)
+    #  @param destRecord: The encrypted record of the credit leg (bytes)
+    #  @param feeRecord: The encrypted record of the overdraft fee charged to the source account,
+    #                    logged after the debit leg (bytes; default is None, no fee)
+    #
+    #  @return: The journal offset of the intent, which identifies the transfer (int)
+    def begin(self, sourceKey, sourceRecord, destKey, destRecord, feeRecord = None):
+        with self._lock:
+            intentOffset = self._log.getEndOffset()
+            self._log.append(encodeTransferIntent(sourceKey, sourceRecord, destKey, destRecord, feeRecord),
+                             key = TransferJournal._INTENT)
+            self._log.sync()
+            self._intents[intentOffset] = (sourceKey, sourceRecord, destKey, destRecord, feeRecord, set())
+            return intentOffset
+
+    # Marks the legs of a transfer as logged by their accounts. Once no intent is open,
+    # the journal file is emptied instead
+    #
+    #  @param intentOffset: The journal offset of the intent (int)
+    #  @param keys: The keys of the accounts whose legs are in their logs (String)
+    def complete(self, intentOffset, *keys):
+        with self._lock:
+            intent = self._intents.get(intentOffset)
+            if intent is None:
+                return
+            sourceKey, sourceRecord, destKey, destRecord, feeRecord, done = intent
+            done.update(keys)
+            if sourceKey in done and destKey in done:
+                del self._intents[intentOffset]
+                if not self._intents:
+                    # Every leg is in its account's log, so no intent needs to be kept
+                    self._log.close()
+                    self._log = TransactionLog(self._fileName, truncate = True)
+                    return
+            self._log.append(encodeTransferDone(intentOffset, keys), key = TransferJournal._DONE)
+
+    # Finds the committed transfers whose leg of an account was not marked as logged
+    # The source account's leg is followed by its overdraft fee, if the transfer charged one
+    #
+    #  @param key: The key of the account (String)
+    #
+    #  @return: The journal offset of each intent and each encrypted record of the account's leg,
+    #           oldest first (list of tuples)
+    def getPending(self, key):
+        with self._lock:
+            legs = []
+            for offset, (sourceKey, sourceRecord, destKey, destRecord, feeRecord, done) in self._intents.items():
+                if key in done:
+                    continue
+                if sourceKey == key:
+                    legs.append((offset, sourceRecord))
+                    if feeRecord is not None:
+                        legs.append((offset, feeRecord))
+                elif destKey == key:
+                    legs.append((offset, destRecord))
+            # The sort is stable, so a fee stays after its debit
+            return sorted(legs, key = lambda leg: leg[0])
+
+    # Flushes any completion markers and closes the journal file
+    def close(self):
+        with self._lock:
+            self._log.close()
+
+# A private helper function that reads the intents of a journal file that are not complete
+#
+#  @param fileName: The name of the journal file (String)
+#
+#  @return: The source key, source record, destination key, destination record, fee record
+#           and completed keys of each open intent, by journal offset (dict)
+def _readOpenIntents(fileName):
+    intents = {}
+    if not os.path.exists(fileName):
+        return intents
+    for offset, size, data in readFrames(fileName, 0, TransferJournal._INTENT):
+        intents[offset] = decodeTransferIntent(data) + (set(),)
+    for offset, size, data in readFrames(fileName, 0, TransferJournal._DONE):
+        intentOffset, keys = decodeTransferDone(data)
+        if intentOffset in intents:
+            intents[intentOffset][5].update(keys)
+    for intentOffset in [offset for offset, intent in intents.items() if {intent[0], intent[2]} <= intent[5]]:
+        del intents[intentOffset]
+    return intents
+
+# A private helper function that cuts a journal file off at its first torn frame
+# A frame cut short by a crash was never forced to stable storage, so its transfer never
+# committed and neither of its legs was logged
+#
+#  @param fileName: The name of the journal file (String)
+def _truncateTornTail(fileName):
+    if not os.path.exists(fileName):
+        return
+    fileSize = os.path.getsize(fileName)
+    end = 0
+    try:
+        for offset, size, data in readFrames(fileName):
+            if offset + size > fileSize:
+                break
+            end = offset + size
+    except ValueError:
+        # A header cut short before its length
+        pass
+    if end < fileSize:
+        os.truncate(fileName, end)